@@ -1,3 +1,4 @@
+import asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -16,17 +17,29 @@ from api.routes.interview_routes import router as InterviewRouter
 from api.routes.stream_routes import router as StreamRouter
 from api.routes.multi_rag_routes import router as MultiRagRouter
 from src.graphs.interview_graph_builder import close_checkpointer
-from db import Base, engine
+from api.helper.sandbox_pool import sandbox_pool
+from api.helper.question_search import question_search
+from api.helper.password_hasher import password_hasher
+from api.middlewares.query_metrics_middleware import track_db_queries
+from config.app_config import app_config
+from db import engine, async_engine, run_migrations
 
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create database tables and migrate existing ones (serialized across workers)
+run_migrations(engine)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup logic can go here if needed
+    if app_config.sandbox_mode == "pool":
+        sandbox_pool.start()
+    # Blocking DB work (a full index build when the questions changed)
+    await asyncio.to_thread(question_search.start)
     yield
     # Shutdown logic
+    sandbox_pool.close()
+    password_hasher.close()
+    await async_engine.dispose()
     await close_checkpointer()
 
 tags_metadata = [
@@ -101,6 +114,8 @@ async def validation_exception_handler(request, exc):
         content={"message": "Validation Error", "errors": errors}
     )
 
+app.middleware("http")(track_db_queries)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173","http://localhost:8081", "http://localhost:5174", "https://www.mlearner.tech", "www.mlearner.tech"],
@@ -1 +1,11 @@
-from .code_runner import code_runner
+from .code_runner import code_runner, result_cache, invalidate_question
+from .sandbox_pool import sandbox_pool, subprocess_sandbox, SandboxBusyError
+from .sandbox_metrics import sandbox_metrics
+from .coding_progress import mark_questions_solved, coding_snapshot, lock_coding, record_visits, replace_solved_history, RECENTLY_VISITED_LIMIT
+from .batch_grader import grade_submissions, batch_route_concurrency
+from .question_catalogue import cached_payload, etag_matches, encode_cursor, decode_cursor, invalidate_catalogue
+from .question_search import question_search
+from .question_seeder import seed_questions
+from .question_facets import question_facets
+from .password_hasher import password_hasher, PasswordHasherBusyError
+from .query_metrics import query_metrics, current_query_stats, RequestQueryStats
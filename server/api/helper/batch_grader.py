@@ -0,0 +1,182 @@
+"""
+Batch re-grading of coding submissions.
+
+Grades many (question_id, code) pairs concurrently through `code_runner`, so
+the sandbox pool executes them in parallel, and records every accepted
+submission in the owner's coding progress with one transaction per user.
+
+Also usable from the command line, one JSON submission per input line:
+
+    python -m api.helper.batch_grader submissions.jsonl --mode fail_fast
+"""
+import argparse
+import asyncio
+import json
+import logging
+import subprocess
+import sys
+from collections import defaultdict
+from typing import AsyncIterator, Iterable, Optional
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+from api.models.coding_models import RunCode
+from api.helper.code_runner import code_runner
+from api.helper.coding_progress import mark_questions_solved
+from api.helper.sandbox_pool import SandboxBusyError
+from config.app_config import app_config
+
+
+def batch_route_concurrency() -> int:
+    """
+    Submissions a batch posted over HTTP grades at once. It shares the
+    sandbox pool with interactive run/submit requests, so it only gets a
+    quarter of it by default; the CLI uses the whole pool.
+    """
+    return app_config.sandbox_batch_concurrency or max(1, app_config.sandbox_pool_size // 4)
+
+
+async def grade_submission(submission: dict, db: Session, mode: str = "full") -> dict:
+    """Grades one submission. Failures are reported in the record, never raised."""
+    record = {
+        "index": submission.get("index"),
+        "user_id": submission.get("user_id"),
+        "question_id": submission["question_id"],
+    }
+    body = RunCode(language="python", code=submission["code"], question_id=submission["question_id"])
+    try:
+        status, passed, total, _, stats = await code_runner(body, db, mode=mode)
+        record.update({"status": status, "passed": passed, "total": total, "stats": stats})
+    except HTTPException as e:
+        record.update({"status": "Error", "error": str(e.detail)})
+    except SandboxBusyError:
+        record.update({"status": "Error", "error": "Sandbox is busy"})
+    except subprocess.TimeoutExpired:
+        record.update({"status": "Time Limit Exceeded"})
+    except RuntimeError as e:
+        record.update({"status": "Runtime Error", "error": str(e)})
+    except Exception as e:
+        # e.g. a worker that stopped responding or unparsable sandbox output:
+        # one bad submission must not abort the rest of the batch
+        logging.exception(f"Could not grade submission {record['index']} (question {record['question_id']})")
+        record.update({"status": "Error", "error": str(e) or type(e).__name__})
+    return record
+
+
+async def grade_submissions(
+    submissions: Iterable[dict],
+    db: Session,
+    mode: str = "full",
+    concurrency: Optional[int] = None,
+    update_progress: bool = True,
+) -> AsyncIterator[dict]:
+    """
+    Grades `submissions` ({user_id, question_id, code} dicts) and yields one
+    {"type": "result"} record per submission as soon as it finishes, then one
+    {"type": "progress"} record per user whose progress was updated and a
+    final {"type": "summary"}.
+
+    At most `concurrency` submissions (default: the sandbox pool size) are
+    in flight at once so a large batch queues here instead of overflowing
+    the sandbox job queue.
+    """
+    semaphore = asyncio.Semaphore(concurrency or app_config.sandbox_pool_size)
+
+    async def _bounded(submission: dict) -> dict:
+        async with semaphore:
+            return await grade_submission(submission, db, mode=mode)
+
+    tasks = [
+        asyncio.ensure_future(_bounded({**submission, "index": index}))
+        for index, submission in enumerate(submissions)
+    ]
+
+    solved_by_user = defaultdict(list)
+    counts = {"total": len(tasks), "accepted": 0, "failed": 0, "errors": 0}
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            record = await next_done
+            if record["status"] == "Accepted":
+                counts["accepted"] += 1
+                if record["user_id"] is not None:
+                    solved_by_user[record["user_id"]].append(record["question_id"])
+            elif record["status"] == "Failed":
+                counts["failed"] += 1
+            else:
+                counts["errors"] += 1
+            yield {"type": "result", **record}
+    finally:
+        # The consumer went away (e.g. client disconnected): stop grading
+        for task in tasks:
+            task.cancel()
+
+    if update_progress:
+        for user_id, question_ids in solved_by_user.items():
+            try:
+                newly_solved = mark_questions_solved(db, user_id, question_ids)
+            except Exception as e:
+                db.rollback()
+                logging.exception(f"Could not update coding progress for user {user_id}")
+                yield {"type": "progress", "user_id": user_id, "error": str(e)}
+                continue
+            yield {"type": "progress", "user_id": user_id, "newly_solved": newly_solved}
+
+    yield {"type": "summary", **counts}
+
+
+# =========================== Command line =====================================
+def _read_submissions(stream) -> list:
+    submissions = []
+    for line_no, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        submission = json.loads(line)
+        if "question_id" not in submission or "code" not in submission:
+            raise ValueError(f"line {line_no}: 'question_id' and 'code' are required")
+        submissions.append(submission)
+    return submissions
+
+
+async def _run_cli(args) -> int:
+    from db import SessionLocal
+    from api.helper.sandbox_pool import sandbox_pool
+
+    if args.input == "-":
+        submissions = _read_submissions(sys.stdin)
+    else:
+        with open(args.input, encoding="utf-8") as f:
+            submissions = _read_submissions(f)
+
+    if app_config.sandbox_mode == "pool":
+        sandbox_pool.start()
+    db = SessionLocal()
+    exit_code = 0
+    try:
+        async for record in grade_submissions(
+            submissions,
+            db,
+            mode=args.mode,
+            concurrency=args.concurrency,
+            update_progress=not args.dry_run,
+        ):
+            print(json.dumps(record), flush=True)
+            if record["type"] == "summary" and record["errors"]:
+                exit_code = 1
+    finally:
+        db.close()
+        sandbox_pool.close()
+    return exit_code
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-grade coding submissions in bulk")
+    parser.add_argument("input", help="JSON lines file of {user_id, question_id, code} submissions, or - for stdin")
+    parser.add_argument("--mode", choices=["full", "fail_fast", "sharded"], default="full")
+    parser.add_argument("--concurrency", type=int, default=None, help="Submissions graded at once (default: sandbox pool size)")
+    parser.add_argument("--dry-run", action="store_true", help="Grade only, do not update user progress")
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(_run_cli(args)))
+
+
+if __name__ == "__main__":
+    main()
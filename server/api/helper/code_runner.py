@@ -1,14 +1,214 @@
 import subprocess
+import asyncio
+import hashlib
 import json
+from dataclasses import dataclass, field
+from typing import Optional, List, Tuple
 from fastapi import HTTPException
+from sqlalchemy import cast, Text, event
 from sqlalchemy.orm import Session
 from db import Question
 from api.models.coding_models import RunCode
+from api.helper.sandbox_pool import sandbox_pool, subprocess_sandbox, SandboxResult
+from api.helper.sandbox_harness import SUBMISSION_ERROR_EXIT
+from config.app_config import app_config
+from src.utils.cache_utils import LRUCache
+
+
+class SubmissionError(RuntimeError):
+    """The submitted code itself failed to load or run (syntax error, missing entry point...)."""
+
+
+# =========================== Sandbox execution ================================
+async def execute_payload(payload: str) -> SandboxResult:
+    """
+    Runs a harness payload either on the pre-warmed worker pool or, when the
+    pool is disabled, in a fresh `python sandbox_harness.py` subprocess fed
+    through stdin. Neither path blocks the event loop.
+    """
+    if app_config.sandbox_mode == "pool" and sandbox_pool.available:
+        result = await sandbox_pool.run(payload)
+    else:
+        result = await subprocess_sandbox.run(payload)
+
+    if result.timed_out:
+        raise subprocess.TimeoutExpired(cmd="sandbox", timeout=app_config.sandbox_timeout_seconds)
+    if result.output_exceeded:
+        raise RuntimeError(f"Output limit exceeded ({app_config.sandbox_output_limit_kb} KB)")
+    return result
+
+
+# =========================== Test suite payloads ==============================
+@dataclass
+class CompiledTestSuite:
+    digest: str
+    encoded: str  # JSON array of test cases, spliced as-is into harness payloads
+    count: int
+    _shards: dict = field(default_factory=dict, repr=False)
+
+    def shards(self, n: int) -> List[Tuple[int, str]]:
+        """
+        Splits the suite into `n` contiguous (offset, encoded) slices whose
+        sizes differ by at most one, so no shard is left with a short tail.
+        """
+        if n not in self._shards:
+            test_cases = json.loads(self.encoded)
+            count = max(1, min(n, len(test_cases)))
+            size, extra = divmod(len(test_cases), count)
+            shards = []
+            start = 0
+            for i in range(count):
+                end = start + size + (1 if i < extra else 0)
+                shards.append((start, json.dumps(test_cases[start:end])))
+                start = end
+            self._shards[n] = shards
+        return self._shards[n]
+
+
+_test_suite_cache = LRUCache(maxsize=512)
+
+
+def compile_test_suite(question_id: int, raw_test_cases: Optional[str]) -> CompiledTestSuite:
+    """
+    Returns the serialized test cases of a question, cached by question id and
+    the hash of the stored JSON so edited test cases are picked up at once.
+    """
+    raw = raw_test_cases or "[]"
+    digest = hashlib.sha256(raw.encode("utf-8")).hexdigest()
+    key = (question_id, digest)
+
+    suite = _test_suite_cache.get(key)
+    if suite is None:
+        test_cases = json.loads(raw) or []
+        suite = CompiledTestSuite(digest=digest, encoded=json.dumps(test_cases), count=len(test_cases))
+        _test_suite_cache.set(key, suite)
+    return suite
+
+
+def build_payload(
+    code: str,
+    function_name: str,
+    encoded_test_cases: str,
+    fail_fast: bool = False,
+    offset: int = 0,
+    budgets: Optional[dict] = None,
+) -> str:
+    budgets = budgets or {}
+    return '{"code": %s, "function_name": %s, "fail_fast": %s, "offset": %d, "time_limit_ms": %s, "memory_limit_mb": %s, "test_cases": %s}' % (
+        json.dumps(code),
+        json.dumps(function_name),
+        json.dumps(fail_fast),
+        offset,
+        json.dumps(budgets.get("time_limit_ms")),
+        json.dumps(budgets.get("memory_limit_mb")),
+        encoded_test_cases,
+    )
+
+
+def _parse_output(res: SandboxResult) -> dict:
+    if res.returncode == SUBMISSION_ERROR_EXIT:
+        raise SubmissionError(res.stderr or res.stdout)
+    if res.returncode != 0:
+        raise RuntimeError(res.stderr or res.stdout)
+    if not res.stdout:
+        # Exited cleanly without a verdict from the harness (e.g. os._exit(0))
+        raise RuntimeError(res.stderr or "Sandbox returned no results")
+    return json.loads(res.stdout)
+
+
+def _shard_count(suite: CompiledTestSuite) -> int:
+    workers = app_config.sandbox_pool_size
+    return max(1, min(workers, suite.count // max(1, app_config.sandbox_shard_size)))
+
+
+async def _run_sharded(code: str, function_name: str, suite: CompiledTestSuite, budgets: dict) -> dict:
+    """Runs slices of the suite on several sandbox workers and merges the results."""
+    shards = suite.shards(_shard_count(suite))
+    outcomes = await asyncio.gather(
+        *[
+            execute_payload(build_payload(code, function_name, encoded, offset=offset, budgets=budgets))
+            for offset, encoded in shards
+        ],
+        return_exceptions=True
+    )
+
+    results = []
+    shard_stats = []
+    for outcome in outcomes:
+        if isinstance(outcome, BaseException):
+            raise outcome
+        output = _parse_output(outcome)
+        results.extend(output["results"])
+        shard_stats.append(output["stats"])
+
+    # Shards run in parallel: wall time is the slowest shard, CPU time adds up
+    stats = {
+        "wall_ms": max(s["wall_ms"] for s in shard_stats),
+        "cpu_ms": round(sum(s["cpu_ms"] for s in shard_stats), 3),
+        "peak_rss_kb": max(s["peak_rss_kb"] for s in shard_stats),
+    }
+    return {"results": results, "stats": stats}
+
+
+# =========================== Result cache =====================================
+# Identical submissions (same question, same code modulo line endings and
+# trailing blank lines, same test cases, budgets and mode) reuse the previous verdict instead of
+# running again. Only deterministic verdicts are stored: worker crashes,
+# timeouts and results decided by a time or memory budget are not.
+result_cache = LRUCache(
+    maxsize=app_config.sandbox_result_cache_size,
+    ttl=app_config.sandbox_result_cache_ttl_seconds
+)
+
+
+def normalize_code(code: str) -> str:
+    # Only what cannot change behaviour: compile() reads every line ending as
+    # "\n", and blank lines after the last statement are ignored. Trailing
+    # spaces stay (they may sit in a string literal or after a backslash), and
+    # so do leading blank lines, which shift the line numbers of cached errors.
+    lines = code.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    while lines and not lines[-1].strip():
+        lines.pop()
+    return "\n".join(lines)
+
+
+def _result_key(question_id: int, code: str, suite: CompiledTestSuite, mode: str, budgets: dict) -> tuple:
+    code_digest = hashlib.sha256(normalize_code(code).encode("utf-8")).hexdigest()
+    return (question_id, code_digest, suite.digest, mode, budgets["time_limit_ms"], budgets["memory_limit_mb"])
+
+
+def invalidate_question(question_id: int) -> int:
+    """Drops cached test suites and results for a question."""
+    _test_suite_cache.invalidate(lambda key: key[0] == question_id)
+    return result_cache.invalidate(lambda key: key[0] == question_id)
+
+
+@event.listens_for(Question, "after_insert")
+@event.listens_for(Question, "after_update")
+@event.listens_for(Question, "after_delete")
+def _invalidate_on_question_write(mapper, connection, target):
+    invalidate_question(target.id)
+
 
 # =========================== Helper function to run user code =================
-async def code_runner(body: RunCode, db: Session):
+async def code_runner(body: RunCode, db: Session, mode: str = "full"):
+    """
+    Evaluates `body.code` against the question's test cases.
+
+    `mode` is "full" (every test case, one process), "fail_fast" (stop at the
+    first failing case) or "sharded" (split across several sandbox workers).
+    Returns (status, passed, total, results, stats) where `stats` holds the
+    run's wall time, CPU time and peak RSS.
+    """
+    # Test cases are fetched as raw JSON text: it is hashed for the suite cache
+    # and only decoded on a cache miss.
     question = (
-        db.query(Question)
+        db.query(
+            Question.function_name,
+            Question.time_limit_ms,
+            Question.memory_limit_mb,
+            cast(Question.test_cases, Text).label("test_cases")
+        )
         .filter(Question.id == body.question_id)
         .first()
     )
@@ -19,122 +219,40 @@ async def code_runner(body: RunCode, db: Session):
             detail="Question not found"
         )
 
-    test_cases = question.test_cases
-    function_name = question.function_name
+    suite = compile_test_suite(body.question_id, question.test_cases)
 
-    runner_code = body.code + "\n\n"
+    budgets = {"time_limit_ms": question.time_limit_ms, "memory_limit_mb": question.memory_limit_mb}
+    cache_key = _result_key(body.question_id, body.code, suite, mode, budgets)
+    cached = result_cache.get(cache_key)
+    if cached is not None:
+        if isinstance(cached, SubmissionError):
+            raise cached
+        return cached
 
-    runner_code += """
-import json
-import inspect
-
-# Helper to recursively convert PyTorch Tensors, NumPy arrays, etc. to clean Python structures
-def to_list_recursive(val):
-    if hasattr(val, "tolist"):
-        return to_list_recursive(val.tolist())
-    if isinstance(val, tuple):
-        return [to_list_recursive(x) for x in val]
-    if isinstance(val, list):
-        return [to_list_recursive(x) for x in val]
-    if isinstance(val, dict):
-        return {k: to_list_recursive(v) for k, v in val.items()}
-    if hasattr(val, "item") and callable(getattr(val, "item")):
-        try:
-            return val.item()
-        except:
-            pass
-    return val
-
-# Helper to automatically cast input list arguments based on function type hints
-def prepare_args(func, raw_args):
     try:
-        sig = inspect.signature(func)
-        params = list(sig.parameters.values())
-    except Exception:
-        return raw_args
-
-    prepared = []
-    for i, arg in enumerate(raw_args):
-        if i < len(params):
-            param = params[i]
-            annotation = param.annotation
-            annotation_str = str(annotation)
-            
-            if "Tensor" in annotation_str or "tensor" in annotation_str:
-                try:
-                    import torch
-                    if isinstance(arg, (list, tuple)):
-                        arg = torch.tensor(arg)
-                except Exception:
-                    pass
-            elif "ndarray" in annotation_str or "array" in annotation_str:
-                try:
-                    import numpy as np
-                    if isinstance(arg, (list, tuple)):
-                        arg = np.array(arg)
-                except Exception:
-                    pass
-        prepared.append(arg)
-    return prepared
-
-sol = Solution()
-results = []
-"""
-
-    for idx, tc in enumerate(test_cases):
-
-        args = repr(tc["test"])
-        expected = repr(tc["expected_output"])
-
-        runner_code += f"""
-try:
-    test_input = {args}
-    prepared_input = prepare_args(sol.{function_name}, test_input)
-
-    output = sol.{function_name}(*prepared_input)
-
-    # Convert output recursively (handles single values, lists, and tuples of Tensors/Arrays)
-    converted_output = to_list_recursive(output)
-
-    passed = converted_output == {expected}
-
-    results.append({{
-        "test_case": {idx + 1},
-        "input": test_input,
-        "passed": passed,
-        "expected": {expected},
-        "got": converted_output
-    }})
-
-except Exception as e:
-    results.append({{
-        "test_case": {idx + 1},
-        "input": {args},
-        "passed": False,
-        "error": str(e)
-    }})
-"""
-
-    runner_code += """
-print(json.dumps(results))
-"""
-
-    with open("public/run.py", "w", encoding="utf-8") as f:
-        f.write(runner_code)
-
-    res = subprocess.run(
-        ["python", "public/run.py"],
-        capture_output=True,
-        text=True,
-        timeout=10
-    )
-
-    if res.returncode != 0:
-        raise RuntimeError(res.stderr or res.stdout)
+        if mode == "sharded" and _shard_count(suite) > 1:
+            output = await _run_sharded(body.code, question.function_name, suite, budgets)
+        else:
+            res = await execute_payload(
+                build_payload(
+                    body.code,
+                    question.function_name,
+                    suite.encoded,
+                    fail_fast=mode == "fail_fast",
+                    budgets=budgets
+                )
+            )
+            output = _parse_output(res)
+    except SubmissionError as e:
+        result_cache.set(cache_key, e)
+        raise
 
-    results = json.loads(res.stdout)
-    total = len(results)
+    results = output["results"]
+    total = suite.count
     passed = sum(1 for r in results if r.get("passed") is True)
     status = "Accepted" if passed == total else "Failed"
 
-    return status, passed, total, results
+    outcome = (status, passed, total, results, output["stats"])
+    if not any(r.get("limit_exceeded") for r in results):
+        result_cache.set(cache_key, outcome)
+    return outcome
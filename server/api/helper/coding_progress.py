@@ -0,0 +1,207 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Optional
+from sqlalchemy import insert, func
+from sqlalchemy.orm import Session
+from db import Coding, Question, UserSolvedQuestion, UserVisitedQuestion
+
+RECENTLY_VISITED_LIMIT = 5
+
+
+# =========================== Upserts ==========================================
+def _dialect_insert(db: Session):
+    """The dialect's INSERT construct if it supports ON CONFLICT, else None."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        return dialect_insert
+    if dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        return dialect_insert
+    return None
+
+
+def _insert_solved(db: Session, user_id: int, question_ids: List[int]) -> List[int]:
+    """
+    Inserts (user_id, question_id) solve rows, skipping ones that already
+    exist, and returns the question ids that were actually inserted. The
+    unique constraint, not a prior read, decides what is new.
+    """
+    rows = [{"user_id": user_id, "question_id": question_id} for question_id in question_ids]
+    dialect_insert = _dialect_insert(db)
+
+    if dialect_insert is not None:
+        stmt = (
+            dialect_insert(UserSolvedQuestion)
+            .values(rows)
+            .on_conflict_do_nothing(index_elements=["user_id", "question_id"])
+            .returning(UserSolvedQuestion.question_id)
+        )
+        return [row.question_id for row in db.execute(stmt)]
+
+    # Other backends: the coding row lock taken by the caller serializes this
+    existing = set(solved_question_ids(db, user_id, question_ids))
+    new_rows = [row for row in rows if row["question_id"] not in existing]
+    if new_rows:
+        db.execute(insert(UserSolvedQuestion), new_rows)
+    return [row["question_id"] for row in new_rows]
+
+
+def _touch(db: Session, model, timestamp_column: str, user_id: int, question_ids: List[int]):
+    """
+    Upserts one row per question with the timestamp moved to "now", keeping
+    the given order (first id = most recent).
+    """
+    now = datetime.now(timezone.utc)
+    rows = [
+        {"user_id": user_id, "question_id": question_id, timestamp_column: now - timedelta(microseconds=position)}
+        for position, question_id in enumerate(question_ids)
+    ]
+    dialect_insert = _dialect_insert(db)
+
+    if dialect_insert is not None:
+        stmt = dialect_insert(model).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "question_id"],
+            set_={timestamp_column: getattr(stmt.excluded, timestamp_column)}
+        )
+        db.execute(stmt)
+        return
+
+    existing = {
+        row.question_id: row for row in
+        db.query(model).filter(model.user_id == user_id, model.question_id.in_(question_ids))
+    }
+    for row in rows:
+        if row["question_id"] in existing:
+            setattr(existing[row["question_id"]], timestamp_column, row[timestamp_column])
+        else:
+            db.add(model(**row))
+
+
+def _existing_question_ids(db: Session, question_ids: Iterable[int]) -> dict:
+    """Maps the ids that exist to their difficulty, dropping unknown ids."""
+    question_ids = list(dict.fromkeys(question_ids))
+    if not question_ids:
+        return {}
+    return dict(db.query(Question.id, Question.difficulty).filter(Question.id.in_(question_ids)).all())
+
+
+def lock_coding(db: Session, user_id: int) -> Coding:
+    """Locks (creating if needed) the user's coding row for this transaction."""
+    coding = db.query(Coding).filter(Coding.user_id == user_id).with_for_update().first()
+    if not coding:
+        logging.info(f"Coding schema not found for user {user_id}, creating a new one")
+        coding = Coding(user_id=user_id, easy=0, medium=0, hard=0)
+        db.add(coding)
+        db.flush()
+    return coding
+
+
+# =========================== Reads ============================================
+def solved_question_ids(db: Session, user_id: int, question_ids: Optional[Iterable[int]] = None) -> List[int]:
+    """Solved question ids, most recent first, optionally limited to `question_ids`."""
+    query = db.query(UserSolvedQuestion.question_id).filter(UserSolvedQuestion.user_id == user_id)
+    if question_ids is not None:
+        query = query.filter(UserSolvedQuestion.question_id.in_(list(question_ids)))
+    return [
+        question_id for (question_id,) in
+        query.order_by(UserSolvedQuestion.solved_at.desc(), UserSolvedQuestion.id.desc())
+    ]
+
+
+def recently_visited_ids(db: Session, user_id: int, limit: int = RECENTLY_VISITED_LIMIT) -> List[int]:
+    return [
+        question_id for (question_id,) in
+        db.query(UserVisitedQuestion.question_id)
+        .filter(UserVisitedQuestion.user_id == user_id)
+        .order_by(UserVisitedQuestion.visited_at.desc(), UserVisitedQuestion.id.desc())
+        .limit(limit)
+    ]
+
+
+def coding_snapshot(db: Session, user_id: int) -> dict:
+    """
+    The user's coding record in the API shape: counters from `coding` plus the
+    solve/visit history lists read from their event tables.
+    """
+    coding = db.query(Coding).filter(Coding.user_id == user_id).first()
+    recently_solved = solved_question_ids(db, user_id) if coding else []
+    return {
+        "id": coding.id if coding else None,
+        "user_id": user_id,
+        "easy": (coding.easy or 0) if coding else 0,
+        "medium": (coding.medium or 0) if coding else 0,
+        "hard": (coding.hard or 0) if coding else 0,
+        "recently_solved": recently_solved,
+        "recently_visited": recently_visited_ids(db, user_id),
+        "all_questions_solved": list(reversed(recently_solved)),
+    }
+
+
+# =========================== Writes ===========================================
+def mark_questions_solved(db: Session, user_id: int, question_ids: Iterable[int]) -> List[int]:
+    """
+    Records `question_ids` as solved for the user and bumps the easy / medium /
+    hard counters, in a single transaction. Already solved questions are
+    ignored. Returns the ids that were newly solved.
+    """
+    question_ids = list(question_ids)
+    difficulties = _existing_question_ids(db, question_ids)
+    question_ids = [question_id for question_id in dict.fromkeys(question_ids) if question_id in difficulties]
+    if not question_ids:
+        return []
+
+    # Lock the user's row so concurrent solves update the counters one at a time
+    coding = lock_coding(db, user_id)
+
+    inserted = set(_insert_solved(db, user_id, question_ids))
+    new_ids = [question_id for question_id in question_ids if question_id in inserted]
+
+    # Counters are incremented in SQL rather than recomputed from the history
+    for difficulty in ("easy", "medium", "hard"):
+        solved = sum(1 for question_id in new_ids if difficulties[question_id] == difficulty)
+        if solved:
+            column = getattr(Coding, difficulty)
+            setattr(coding, difficulty, func.coalesce(column, 0) + solved)
+
+    db.commit()
+    return new_ids
+
+
+def record_visits(db: Session, user_id: int, question_ids: Iterable[int]):
+    """Marks questions as visited now, the first id being the most recent visit. The caller commits."""
+    question_ids = list(question_ids)
+    known = _existing_question_ids(db, question_ids)
+    question_ids = [question_id for question_id in dict.fromkeys(question_ids) if question_id in known]
+    if question_ids:
+        _touch(db, UserVisitedQuestion, "visited_at", user_id, question_ids)
+
+
+def replace_solved_history(
+    db: Session,
+    user_id: int,
+    all_questions_solved: Optional[List[int]] = None,
+    recently_solved: Optional[List[int]] = None,
+):
+    """
+    Applies a manual history edit. `all_questions_solved` replaces the solved
+    set; `recently_solved` ids (most recent first) are marked solved and moved
+    to the top of the history. Counters and the commit are left to the caller.
+    """
+    lock_coding(db, user_id)
+
+    if all_questions_solved is not None:
+        keep = list(_existing_question_ids(db, all_questions_solved))
+        stale = db.query(UserSolvedQuestion).filter(UserSolvedQuestion.user_id == user_id)
+        if keep:
+            stale = stale.filter(UserSolvedQuestion.question_id.notin_(keep))
+        stale.delete(synchronize_session=False)
+        if keep:
+            _insert_solved(db, user_id, keep)
+
+    if recently_solved is not None:
+        known = _existing_question_ids(db, recently_solved)
+        recent = [question_id for question_id in dict.fromkeys(recently_solved) if question_id in known]
+        if recent:
+            _touch(db, UserSolvedQuestion, "solved_at", user_id, recent)
@@ -0,0 +1,66 @@
+import threading
+from collections import deque
+
+
+def _summarize(samples) -> dict:
+    if not samples:
+        return {"avg": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return {
+        "avg": round(sum(ordered) / len(ordered), 2),
+        "p50": round(ordered[int(last * 0.50)], 2),
+        "p95": round(ordered[int(last * 0.95)], 2),
+        "max": round(ordered[last], 2),
+    }
+
+
+class JobMetrics:
+    """
+    Thread-safe counters and rolling queue wait / execution time windows for
+    any bounded job pool. Subclasses add their own counters under `_lock` and
+    extend `snapshot`.
+    """
+
+    def __init__(self, window: int = 1000):
+        self._lock = threading.Lock()
+        self._queue_wait_ms = deque(maxlen=window)
+        self._execution_ms = deque(maxlen=window)
+        self.jobs = 0
+        self.errors = 0
+        self.rejected = 0
+        self.in_flight = 0
+
+    def job_started(self, queue_wait: float):
+        with self._lock:
+            self.in_flight += 1
+            self._queue_wait_ms.append(queue_wait * 1000)
+
+    def job_finished(self, execution_time: float, failed: bool = False):
+        with self._lock:
+            self._record_finished(execution_time, failed)
+
+    def _record_finished(self, execution_time: float, failed: bool):
+        self.in_flight -= 1
+        self.jobs += 1
+        self._execution_ms.append(execution_time * 1000)
+        if failed:
+            self.errors += 1
+
+    def job_rejected(self):
+        with self._lock:
+            self.rejected += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return self._snapshot()
+
+    def _snapshot(self) -> dict:
+        return {
+            "jobs": self.jobs,
+            "in_flight": self.in_flight,
+            "errors": self.errors,
+            "rejected": self.rejected,
+            "queue_wait_ms": _summarize(self._queue_wait_ms),
+            "execution_ms": _summarize(self._execution_ms),
+        }
@@ -5,6 +5,7 @@ import logging
 import asyncio
 
 from src.graphs.multi_rag_graph_builder import deleteThread as GraphThreadDeletor
+from src.retrievers.create_retreivers import invalidate_thread_retrievers
 
 async def delete_thread(thread_id: str, delay_seconds: int):
     """Utility function to delete a thread after a specific delay."""
@@ -15,6 +16,7 @@ async def delete_thread(thread_id: str, delay_seconds: int):
     logging.info(f"Starting deletion of thread data for thread_id: {thread_id}")
     
     try:
+        invalidate_thread_retrievers(thread_id)
         path1 = os.path.join(ARTIFACT_DIR, thread_id)
         path2 = os.path.join(PUBLIC_FOLDER_FILE_PATH, thread_id)
         
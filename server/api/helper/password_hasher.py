@@ -0,0 +1,92 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+from config.app_config import app_config
+from api.helper.job_metrics import JobMetrics
+
+
+class PasswordHasherBusyError(Exception):
+    """Raised when too many hashing jobs are already queued."""
+
+
+def hash_password(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=rounds)).decode('utf-8')
+
+
+def check_password(password: str, hashed: str) -> bool:
+    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+
+def hash_rounds(hashed: str) -> int:
+    # "$2b$<cost>$<salt+digest>"
+    try:
+        return int(hashed.split("$")[2])
+    except (IndexError, ValueError):
+        return 0
+
+
+class PasswordHasher:
+    """
+    Runs bcrypt on a small dedicated thread pool so hashing never blocks the
+    event loop. bcrypt releases the GIL, so `workers` hashes run in parallel
+    while at most `queue_limit` more wait; anything beyond that is rejected
+    with PasswordHasherBusyError instead of piling up.
+    """
+
+    def __init__(self, rounds: int, workers: int, queue_limit: int):
+        self.rounds = rounds
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.metrics = JobMetrics()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password, self.rounds)
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run(check_password, password, hashed)
+
+    def needs_rehash(self, hashed: str) -> bool:
+        return hash_rounds(hashed) != self.rounds
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.workers + self.queue_limit:
+                self.metrics.job_rejected()
+                raise PasswordHasherBusyError("Password hashing queue is full")
+            self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._run_blocking, fn, args, time.perf_counter())
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _run_blocking(self, fn, args, queued_at: float):
+        self.metrics.job_started(time.perf_counter() - queued_at)
+        started = time.perf_counter()
+        failed = False
+        try:
+            return fn(*args)
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.metrics.job_finished(time.perf_counter() - started, failed=failed)
+
+    def stats(self) -> dict:
+        return {"rounds": self.rounds, "workers": self.workers, **self.metrics.snapshot()}
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+
+password_hasher = PasswordHasher(
+    rounds=app_config.password_hash_rounds,
+    workers=app_config.password_hash_workers,
+    queue_limit=app_config.password_hash_queue_limit
+)
@@ -0,0 +1,129 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from db import engine, async_engine
+from config.app_config import app_config
+
+SLOW_QUERY_HISTORY = 50
+STATEMENT_PREVIEW = 500
+
+
+def _preview(statement: str) -> str:
+    statement = " ".join(statement.split())
+    return statement if len(statement) <= STATEMENT_PREVIEW else statement[:STATEMENT_PREVIEW] + "..."
+
+
+class RequestQueryStats:
+    """Queries issued while serving one request, including from threadpool dependencies."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total_ms = 0.0
+        self.slow = []
+
+    def record(self, statement: str, elapsed_ms: float):
+        with self._lock:
+            self.count += 1
+            self.total_ms += elapsed_ms
+            if elapsed_ms >= app_config.db_slow_query_ms:
+                self.slow.append({"statement": _preview(statement), "ms": round(elapsed_ms, 2)})
+
+
+# Set by the query metrics middleware for the duration of a request
+current_query_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("current_query_stats", default=None)
+
+
+class QueryMetrics:
+    """Per-route query counts and DB time, plus the most recent slow statements."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._slow = deque(maxlen=SLOW_QUERY_HISTORY)
+        self.queries = 0
+        self.slow_queries = 0
+
+    def query_finished(self, statement: str, elapsed_ms: float):
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.record(statement, elapsed_ms)
+        with self._lock:
+            self.queries += 1
+            if elapsed_ms >= app_config.db_slow_query_ms:
+                self.slow_queries += 1
+        if elapsed_ms >= app_config.db_slow_query_ms and stats is None:
+            # Slow statements of a request are reported with their route once it finishes
+            self._add_slow(None, {"statement": _preview(statement), "ms": round(elapsed_ms, 2)})
+
+    def request_finished(self, route: str, stats: RequestQueryStats):
+        with self._lock:
+            entry = self._routes.setdefault(route, {"requests": 0, "queries": 0, "db_ms": 0.0, "max_queries": 0})
+            entry["requests"] += 1
+            entry["queries"] += stats.count
+            entry["db_ms"] += stats.total_ms
+            entry["max_queries"] = max(entry["max_queries"], stats.count)
+        for slow in stats.slow:
+            self._add_slow(route, slow)
+
+    def _add_slow(self, route: Optional[str], slow: dict):
+        logging.warning(f"Slow query ({slow['ms']} ms) in {route or 'background task'}: {slow['statement']}")
+        with self._lock:
+            self._slow.append({"route": route, **slow})
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            routes = [
+                {
+                    "route": route,
+                    "requests": entry["requests"],
+                    "queries_per_request": round(entry["queries"] / entry["requests"], 2),
+                    "max_queries": entry["max_queries"],
+                    "db_ms_per_request": round(entry["db_ms"] / entry["requests"], 2),
+                }
+                for route, entry in self._routes.items()
+            ]
+            return {
+                "queries": self.queries,
+                "slow_queries": self.slow_queries,
+                "slow_query_ms": app_config.db_slow_query_ms,
+                "routes": sorted(routes, key=lambda r: r["queries_per_request"], reverse=True),
+                "recent_slow": list(self._slow),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+            self._slow.clear()
+            self.queries = 0
+            self.slow_queries = 0
+
+
+query_metrics = QueryMetrics()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    if started is not None:
+        query_metrics.query_finished(statement, (time.perf_counter() - started) * 1000)
+
+
+def instrument_engine(target: Engine):
+    """Times every statement `target` executes. Idempotent."""
+    if not event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        event.listen(target, "before_cursor_execute", _before_cursor_execute)
+        event.listen(target, "after_cursor_execute", _after_cursor_execute)
+
+
+if app_config.db_metrics_enabled:
+    instrument_engine(engine)
+    instrument_engine(async_engine.sync_engine)
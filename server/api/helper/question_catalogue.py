@@ -0,0 +1,113 @@
+import base64
+import hashlib
+import json
+import threading
+from typing import Awaitable, Callable, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from db import Question
+from config.app_config import app_config
+from src.utils.cache_utils import LRUCache
+
+
+# =========================== Catalogue version ================================
+class _CatalogueVersion:
+    """Monotonic counter bumped after every committed write to `questions`."""
+
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def bump(self) -> int:
+        with self._lock:
+            self._value += 1
+            return self._value
+
+
+catalogue_version = _CatalogueVersion()
+
+# (version, *request key) -> (body bytes, etag). Entries of older versions are
+# never read again and age out of the LRU; the TTL bounds staleness when
+# another process wrote to the table.
+_catalogue_cache = LRUCache(
+    maxsize=app_config.question_cache_size,
+    ttl=app_config.question_cache_ttl_seconds
+)
+
+
+def invalidate_catalogue():
+    """Makes every cached catalogue response stale. Call after bulk/core writes."""
+    catalogue_version.bump()
+    _catalogue_cache.clear()
+
+
+@event.listens_for(Session, "after_flush")
+def _track_question_writes(session, flush_context):
+    if any(isinstance(obj, Question) for obj in (*session.new, *session.dirty, *session.deleted)):
+        session.info["questions_changed"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_question_commit(session):
+    # Bumped after the commit so a concurrent reader can never cache
+    # pre-commit rows under the new version
+    if session.info.pop("questions_changed", False):
+        invalidate_catalogue()
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_question_writes(session):
+    session.info.pop("questions_changed", None)
+
+
+# =========================== Cursors ==========================================
+def encode_cursor(last_id: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps({"after": last_id}).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Returns the id to continue after. Raises ValueError for malformed cursors."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(json.loads(base64.urlsafe_b64decode(padded))["after"])
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+
+
+# =========================== Cached responses =================================
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+async def cached_payload(key: tuple, build: Callable[[], Awaitable[dict]]) -> Tuple[bytes, str]:
+    """
+    Returns the serialized response body and its ETag for `key` under the
+    current catalogue version, awaiting `build()` only on a miss.
+    """
+    version = catalogue_version.value
+    cache_key = (version, *key)
+    cached = _catalogue_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    body = json.dumps(await build(), separators=(",", ":"), default=str).encode("utf-8")
+    entry = (body, make_etag(body))
+    # Skip caching if a write landed while building
+    if catalogue_version.value == version:
+        _catalogue_cache.set(cache_key, entry)
+    return entry
+
+
+def catalogue_cache_stats() -> dict:
+    return {"version": catalogue_version.value, **_catalogue_cache.stats()}
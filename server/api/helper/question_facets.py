@@ -0,0 +1,72 @@
+import time
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from db import Question
+from config.app_config import app_config
+from api.helper.question_catalogue import catalogue_version
+
+DIFFICULTIES = ("easy", "medium", "hard")
+
+
+class QuestionFacets:
+    """
+    Question counts per category × difficulty, kept in memory.
+
+    Rebuilt with a single GROUP BY when the catalogue version moves (i.e. after
+    a committed question write) or the TTL runs out, so browsing the catalogue
+    never scans the questions table.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._facets = None
+        self._version = None
+        self._built_at = 0.0
+
+    async def get(self, db: AsyncSession) -> dict:
+        version = catalogue_version.value
+        if not self._is_fresh(version):
+            # Concurrent rebuilds on a miss are harmless, they store the same counts
+            facets = await self._build(db)
+            self._facets, self._version, self._built_at = facets, version, time.monotonic()
+        return self._facets
+
+    def _is_fresh(self, version: int) -> bool:
+        return (
+            self._facets is not None
+            and self._version == version
+            and time.monotonic() - self._built_at < self.ttl
+        )
+
+    async def _build(self, db: AsyncSession) -> dict:
+        result = await db.execute(
+            select(
+                Question.category_key,
+                Question.difficulty_key,
+                func.min(Question.category).label("category"),
+                func.count(Question.id).label("count")
+            )
+            .group_by(Question.category_key, Question.difficulty_key)
+        )
+        rows = result.all()
+
+        categories = {}
+        difficulties = {difficulty: 0 for difficulty in DIFFICULTIES}
+        for row in rows:
+            entry = categories.setdefault(row.category_key, {
+                "category": row.category,
+                "count": 0,
+                "difficulties": {difficulty: 0 for difficulty in DIFFICULTIES},
+            })
+            entry["count"] += row.count
+            entry["difficulties"][row.difficulty_key] = entry["difficulties"].get(row.difficulty_key, 0) + row.count
+            difficulties[row.difficulty_key] = difficulties.get(row.difficulty_key, 0) + row.count
+
+        return {
+            "total": sum(entry["count"] for entry in categories.values()),
+            "difficulties": difficulties,
+            "categories": sorted(categories.values(), key=lambda entry: entry["category"] or ""),
+        }
+
+
+question_facets = QuestionFacets(ttl=app_config.question_cache_ttl_seconds)
@@ -0,0 +1,567 @@
+"""
+Full-text search over coding questions.
+
+Indexes each question's title, problem_description and learn_content (the
+latter two are stored base64 encoded, so the index is fed from Python rather
+than by database triggers). Three interchangeable backends:
+
+* ``fts5``     - SQLite FTS5 virtual table ranked with bm25()
+* ``postgres`` - weighted tsvector column with a GIN index, ts_rank/ts_headline
+* ``memory``   - in-process inverted index with BM25 scoring, built at startup
+
+The backend is picked from `question_search_backend` ("auto" chooses by the
+database dialect and falls back to memory). The index is kept in sync from
+Session commit hooks; bulk/core writes must call `question_search.reindex`.
+All of it is blocking I/O on the sync engine: async callers go through
+`asyncio.to_thread`, and commits made on the event loop hand the index update
+to a background thread.
+
+The persistent backends record a fingerprint of the indexed questions, so a
+restart only rebuilds the index when the questions table changed meanwhile.
+It is the XOR of one hash per question: a full rebuild and the startup check
+hash every question, while an incremental update swaps the hashes of just the
+questions it touches, read back from the index, in the same transaction.
+"""
+import asyncio
+import base64
+import binascii
+import hashlib
+import logging
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import bindparam, event, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from db import Question, engine
+from config.app_config import app_config
+
+FIELDS = ("title", "problem_description", "learn_content")
+FIELD_WEIGHTS = {"title": 3.0, "problem_description": 1.5, "learn_content": 1.0}
+MARK_START, MARK_END = "<mark>", "</mark>"
+MAX_QUERY_TERMS = 10
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(value: str) -> List[str]:
+    return _TOKEN_RE.findall((value or "").lower())
+
+
+def query_terms(query: str) -> List[str]:
+    return list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+
+
+def decode_text(value: Optional[str]) -> str:
+    """Question bodies are base64 encoded; plain text is returned unchanged."""
+    if not value:
+        return ""
+    try:
+        return base64.b64decode(value, validate=True).decode("utf-8")
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        return value
+
+
+def _load_documents(conn, question_ids: Optional[Iterable[int]] = None) -> List[dict]:
+    table = Question.__table__
+    stmt = select(
+        table.c.id, table.c.title, table.c.category, table.c.difficulty,
+        table.c.category_key, table.c.difficulty_key,
+        table.c.problem_description, table.c.learn_content
+    )
+    if question_ids is not None:
+        stmt = stmt.where(table.c.id.in_(list(question_ids)))
+    return [
+        {
+            "id": row.id,
+            "title": row.title or "",
+            "category": row.category,
+            "difficulty": row.difficulty,
+            "category_key": row.category_key,
+            "difficulty_key": row.difficulty_key,
+            "problem_description": decode_text(row.problem_description),
+            "learn_content": decode_text(row.learn_content),
+        }
+        for row in conn.execute(stmt)
+    ]
+
+
+def _fingerprint(documents: Iterable[dict], start: int = 0) -> int:
+    """Order independent hash of the indexed fields of `documents`, XORed into `start`."""
+    value = start
+    for document in documents:
+        key = repr((document["id"], *(document[field] for field in FIELDS))).encode("utf-8")
+        value ^= int.from_bytes(hashlib.sha256(key).digest(), "big")
+    return value
+
+
+def _create_state_table(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS question_search_state "
+        "(backend VARCHAR(32) PRIMARY KEY, fingerprint VARCHAR(64) NOT NULL)"
+    ))
+
+
+def _stored_fingerprint(conn, backend: str) -> Optional[int]:
+    sql = "SELECT fingerprint FROM question_search_state WHERE backend = :backend"
+    if conn.dialect.name == "postgresql":
+        # Concurrent incremental updates from other workers apply one at a time
+        sql += " FOR UPDATE"
+    stored = conn.execute(text(sql), {"backend": backend}).scalar()
+    return None if stored is None else int(stored, 16)
+
+
+def _store_fingerprint(conn, backend: str, value: int):
+    conn.execute(text("DELETE FROM question_search_state WHERE backend = :backend"), {"backend": backend})
+    conn.execute(
+        text("INSERT INTO question_search_state (backend, fingerprint) VALUES (:backend, :fingerprint)"),
+        {"backend": backend, "fingerprint": f"{value:064x}"}
+    )
+
+
+def _shift_fingerprint(conn, backend: str, stored: Optional[int], old: List[dict], new: List[dict]):
+    """Replaces the hashes of `old` with those of `new`; an unrecorded index stays unrecorded."""
+    if stored is not None:
+        _store_fingerprint(conn, backend, _fingerprint(new, _fingerprint(old, stored)))
+
+
+def _sql_filters(category_key: Optional[str], difficulty_key: Optional[str]) -> str:
+    clauses = []
+    if category_key is not None:
+        clauses.append("AND q.category_key = :category_key")
+    if difficulty_key is not None:
+        clauses.append("AND q.difficulty_key = :difficulty_key")
+    return " ".join(clauses)
+
+
+def _result(row, highlights: Dict[str, str], score: float) -> dict:
+    return {
+        "id": row["id"],
+        "title": row["title"],
+        "difficulty": row["difficulty"],
+        "category": row["category"],
+        "score": round(score, 4),
+        "highlights": {field: value for field, value in highlights.items() if value and MARK_START in value},
+    }
+
+
+# =========================== SQLite FTS5 ======================================
+class Fts5SearchBackend:
+    name = "fts5"
+    persistent = True
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+    def setup(self):
+        # Raises OperationalError when SQLite was built without FTS5
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS question_search_fts "
+                "USING fts5(title, problem_description, learn_content, tokenize='porter unicode61')"
+            ))
+            _create_state_table(conn)
+
+    def rebuild(self):
+        with self.engine.begin() as conn:
+            documents = _load_documents(conn)
+            conn.execute(text("DELETE FROM question_search_fts"))
+            self._insert(conn, documents)
+            _store_fingerprint(conn, self.name, _fingerprint(documents))
+
+    def reindex(self, question_ids: List[int]):
+        with self.engine.begin() as conn:
+            stored = _stored_fingerprint(conn, self.name)
+            old = self._indexed(conn, question_ids)
+            documents = _load_documents(conn, question_ids)
+            self._delete(conn, question_ids)
+            self._insert(conn, documents)
+            _shift_fingerprint(conn, self.name, stored, old, documents)
+
+    def remove(self, question_ids: List[int]):
+        with self.engine.begin() as conn:
+            stored = _stored_fingerprint(conn, self.name)
+            old = self._indexed(conn, question_ids)
+            self._delete(conn, question_ids)
+            _shift_fingerprint(conn, self.name, stored, old, [])
+
+    def _indexed(self, conn, question_ids) -> List[dict]:
+        """The indexed fields of the given questions, as they are in the index."""
+        stmt = text(
+            "SELECT rowid AS id, title, problem_description, learn_content "
+            "FROM question_search_fts WHERE rowid IN :ids"
+        ).bindparams(bindparam("ids", expanding=True))
+        rows = conn.execute(stmt, {"ids": list(question_ids)}).mappings().all()
+        return [dict(row) for row in rows]
+
+    def _delete(self, conn, question_ids):
+        for question_id in question_ids:
+            conn.execute(text("DELETE FROM question_search_fts WHERE rowid = :id"), {"id": question_id})
+
+    def _insert(self, conn, documents):
+        if documents:
+            conn.execute(
+                text(
+                    "INSERT INTO question_search_fts (rowid, title, problem_description, learn_content) "
+                    "VALUES (:id, :title, :problem_description, :learn_content)"
+                ),
+                documents
+            )
+
+    def search(self, terms, limit, category_key=None, difficulty_key=None) -> List[dict]:
+        # Quoted prefix terms, implicitly ANDed; quoting neutralises FTS5 syntax
+        match = " ".join(f'"{term}"*' for term in terms)
+        weights = ", ".join(str(FIELD_WEIGHTS[field]) for field in FIELDS)
+        sql = text(
+            "SELECT q.id, q.title, q.difficulty, q.category, "
+            f"bm25(question_search_fts, {weights}) AS rank, "
+            f"highlight(question_search_fts, 0, '{MARK_START}', '{MARK_END}') AS title_hl, "
+            f"snippet(question_search_fts, 1, '{MARK_START}', '{MARK_END}', '…', 24) AS description_hl, "
+            f"snippet(question_search_fts, 2, '{MARK_START}', '{MARK_END}', '…', 24) AS learn_hl "
+            "FROM question_search_fts JOIN questions q ON q.id = question_search_fts.rowid "
+            f"WHERE question_search_fts MATCH :match {_sql_filters(category_key, difficulty_key)} "
+            "ORDER BY rank LIMIT :limit"
+        )
+        params = {"match": match, "limit": limit, "category_key": category_key, "difficulty_key": difficulty_key}
+        with self.engine.connect() as conn:
+            rows = conn.execute(sql, params).mappings().all()
+        return [
+            _result(row, {"title": row["title_hl"], "problem_description": row["description_hl"], "learn_content": row["learn_hl"]}, -row["rank"])
+            for row in rows
+        ]
+
+
+# =========================== Postgres tsvector ================================
+class PostgresSearchBackend:
+    name = "postgres"
+    persistent = True
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+
+    def setup(self):
+        with self.engine.begin() as conn:
+            conn.execute(text(
+                "CREATE TABLE IF NOT EXISTS question_search ("
+                "question_id INTEGER PRIMARY KEY REFERENCES questions(id) ON DELETE CASCADE, "
+                "title TEXT, problem_description TEXT, learn_content TEXT, document TSVECTOR)"
+            ))
+            conn.execute(text(
+                "CREATE INDEX IF NOT EXISTS ix_question_search_document ON question_search USING GIN (document)"
+            ))
+            _create_state_table(conn)
+
+    def rebuild(self):
+        with self.engine.begin() as conn:
+            documents = _load_documents(conn)
+            conn.execute(text("DELETE FROM question_search"))
+            self._upsert(conn, documents)
+            _store_fingerprint(conn, self.name, _fingerprint(documents))
+
+    def reindex(self, question_ids: List[int]):
+        with self.engine.begin() as conn:
+            stored = _stored_fingerprint(conn, self.name)
+            old = self._indexed(conn, question_ids)
+            documents = _load_documents(conn, question_ids)
+            self._upsert(conn, documents)
+            _shift_fingerprint(conn, self.name, stored, old, documents)
+
+    def remove(self, question_ids: List[int]):
+        with self.engine.begin() as conn:
+            stored = _stored_fingerprint(conn, self.name)
+            old = self._indexed(conn, question_ids)
+            conn.execute(text("DELETE FROM question_search WHERE question_id = ANY(:ids)"), {"ids": list(question_ids)})
+            _shift_fingerprint(conn, self.name, stored, old, [])
+
+    def _indexed(self, conn, question_ids) -> List[dict]:
+        """The indexed fields of the given questions, as they are in the index."""
+        rows = conn.execute(
+            text(
+                "SELECT question_id AS id, title, problem_description, learn_content "
+                "FROM question_search WHERE question_id = ANY(:ids)"
+            ),
+            {"ids": list(question_ids)}
+        ).mappings().all()
+        return [dict(row) for row in rows]
+
+    def _upsert(self, conn, documents):
+        if not documents:
+            return
+        conn.execute(
+            text(
+                "INSERT INTO question_search (question_id, title, problem_description, learn_content, document) "
+                "VALUES (:id, :title, :problem_description, :learn_content, "
+                "setweight(to_tsvector('english', :title), 'A') || "
+                "setweight(to_tsvector('english', :problem_description), 'B') || "
+                "setweight(to_tsvector('english', :learn_content), 'C')) "
+                "ON CONFLICT (question_id) DO UPDATE SET "
+                "title = EXCLUDED.title, problem_description = EXCLUDED.problem_description, "
+                "learn_content = EXCLUDED.learn_content, document = EXCLUDED.document"
+            ),
+            documents
+        )
+
+    def search(self, terms, limit, category_key=None, difficulty_key=None) -> List[dict]:
+        options = f"StartSel={MARK_START}, StopSel={MARK_END}"
+        sql = text(
+            "SELECT q.id, q.title, q.difficulty, q.category, ts_rank(s.document, query) AS score, "
+            f"ts_headline('english', s.title, query, '{options}, HighlightAll=true') AS title_hl, "
+            f"ts_headline('english', s.problem_description, query, '{options}, MaxWords=35, MinWords=15') AS description_hl, "
+            f"ts_headline('english', s.learn_content, query, '{options}, MaxWords=35, MinWords=15') AS learn_hl "
+            "FROM question_search s JOIN questions q ON q.id = s.question_id, "
+            "to_tsquery('english', :tsquery) query "
+            f"WHERE s.document @@ query {_sql_filters(category_key, difficulty_key)} "
+            "ORDER BY score DESC, q.id LIMIT :limit"
+        )
+        params = {
+            "tsquery": " & ".join(f"{term}:*" for term in terms),
+            "limit": limit,
+            "category_key": category_key,
+            "difficulty_key": difficulty_key,
+        }
+        with self.engine.connect() as conn:
+            rows = conn.execute(sql, params).mappings().all()
+        return [
+            _result(row, {"title": row["title_hl"], "problem_description": row["description_hl"], "learn_content": row["learn_hl"]}, row["score"])
+            for row in rows
+        ]
+
+
+# =========================== In-memory fallback ===============================
+class MemorySearchBackend:
+    """Inverted index with field-weighted BM25 and prefix matching on query terms."""
+    name = "memory"
+    persistent = False
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self._lock = threading.Lock()
+        self._docs: Dict[int, dict] = {}
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+
+    def setup(self):
+        pass
+
+    def rebuild(self):
+        with self.engine.connect() as conn:
+            documents = _load_documents(conn)
+        with self._lock:
+            self._docs.clear()
+            self._postings.clear()
+            for document in documents:
+                self._add(document)
+
+    def reindex(self, question_ids: List[int]):
+        with self.engine.connect() as conn:
+            documents = _load_documents(conn, question_ids)
+        with self._lock:
+            for question_id in question_ids:
+                self._discard(question_id)
+            for document in documents:
+                self._add(document)
+
+    def remove(self, question_ids: List[int]):
+        with self._lock:
+            for question_id in question_ids:
+                self._discard(question_id)
+
+    def _add(self, document: dict):
+        weighted = Counter()
+        for field in FIELDS:
+            for token in tokenize(document[field]):
+                weighted[token] += FIELD_WEIGHTS[field]
+        document["length"] = sum(weighted.values())
+        self._docs[document["id"]] = document
+        for token, weight in weighted.items():
+            self._postings[token][document["id"]] = weight
+
+    def _discard(self, question_id: int):
+        if self._docs.pop(question_id, None) is None:
+            return
+        for token in [t for t, docs in self._postings.items() if question_id in docs]:
+            del self._postings[token][question_id]
+            if not self._postings[token]:
+                del self._postings[token]
+
+    def search(self, terms, limit, category_key=None, difficulty_key=None) -> List[dict]:
+        with self._lock:
+            total = len(self._docs)
+            if not total:
+                return []
+            avg_length = sum(d["length"] for d in self._docs.values()) / total or 1.0
+
+            scores: Optional[Dict[int, float]] = None
+            for term in terms:
+                term_scores: Dict[int, float] = defaultdict(float)
+                for token in (t for t in self._postings if t.startswith(term)):
+                    postings = self._postings[token]
+                    idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+                    for question_id, tf in postings.items():
+                        norm = self.k1 * (1 - self.b + self.b * self._docs[question_id]["length"] / avg_length)
+                        term_scores[question_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+                # Every term must match, as with the SQL backends
+                scores = dict(term_scores) if scores is None else {
+                    question_id: score + term_scores[question_id]
+                    for question_id, score in scores.items() if question_id in term_scores
+                }
+                if not scores:
+                    return []
+
+            matches = [
+                (score, self._docs[question_id]) for question_id, score in scores.items()
+                if (category_key is None or self._docs[question_id]["category_key"] == category_key)
+                and (difficulty_key is None or self._docs[question_id]["difficulty_key"] == difficulty_key)
+            ]
+        matches.sort(key=lambda match: (-match[0], match[1]["id"]))
+
+        pattern = re.compile(r"\b(" + "|".join(re.escape(term) + r"\w*" for term in terms) + r")", re.IGNORECASE)
+        return [
+            _result(document, {
+                "title": pattern.sub(rf"{MARK_START}\1{MARK_END}", document["title"]),
+                "problem_description": _snippet(document["problem_description"], pattern),
+                "learn_content": _snippet(document["learn_content"], pattern),
+            }, score)
+            for score, document in matches[:limit]
+        ]
+
+
+def _snippet(value: str, pattern: re.Pattern, radius: int = 120) -> str:
+    found = pattern.search(value)
+    if not found:
+        return ""
+    start, end = max(0, found.start() - radius), min(len(value), found.end() + radius)
+    fragment = pattern.sub(rf"{MARK_START}\1{MARK_END}", " ".join(value[start:end].split()))
+    return ("…" if start else "") + fragment + ("…" if end < len(value) else "")
+
+
+# =========================== Facade ===========================================
+class QuestionSearch:
+    def __init__(self, engine: Engine):
+        self.engine = engine
+        self.backend = None
+        self._lock = threading.Lock()
+
+    def _candidates(self):
+        choice = app_config.question_search_backend
+        dialect = self.engine.dialect.name
+        if choice == "auto":
+            choice = {"sqlite": "fts5", "postgresql": "postgres"}.get(dialect, "memory")
+        backends = {"fts5": Fts5SearchBackend, "postgres": PostgresSearchBackend, "memory": MemorySearchBackend}
+        if choice not in backends:
+            raise ValueError(f"Unknown question_search_backend: {choice}")
+        return [backends[choice]] if choice == "memory" else [backends[choice], MemorySearchBackend]
+
+    def start(self):
+        """
+        Picks a backend and builds the index from the questions table, unless
+        a persistent index already matches it. Blocking.
+        """
+        with self._lock:
+            for backend_cls in self._candidates():
+                backend = backend_cls(self.engine)
+                try:
+                    backend.setup()
+                    if backend.persistent and self._is_current(backend):
+                        logging.info(f"Question search index ({backend.name}) is up to date, skipping rebuild")
+                    else:
+                        backend.rebuild()
+                        logging.info(f"Question search index built with the {backend.name} backend")
+                except OperationalError as e:
+                    logging.warning(f"Question search backend {backend.name} unavailable: {e}")
+                    continue
+                self.backend = backend
+                return
+
+    def _is_current(self, backend) -> bool:
+        """Whether the persistent index reflects every question. Hashes the whole table."""
+        with self.engine.connect() as conn:
+            stored = _stored_fingerprint(conn, backend.name)
+            return stored is not None and stored == _fingerprint(_load_documents(conn))
+
+    def _ready(self):
+        if self.backend is None:
+            self.start()
+        return self.backend
+
+    def reindex(self, question_ids: Optional[Iterable[int]] = None):
+        """Re-reads the given questions (all of them when None) into the index. Blocking."""
+        if self.backend is None:
+            return
+        if question_ids is None:
+            self.backend.rebuild()
+        else:
+            self.backend.reindex(list(question_ids))
+
+    def remove(self, question_ids: Iterable[int]):
+        if self.backend is not None:
+            self.backend.remove(list(question_ids))
+
+    def search(self, query: str, limit: int = 20, category_key: Optional[str] = None, difficulty_key: Optional[str] = None) -> List[dict]:
+        """Blocking; async callers should run it with `asyncio.to_thread`."""
+        terms = query_terms(query)
+        if not terms:
+            return []
+        return self._ready().search(terms, limit, category_key, difficulty_key)
+
+    @property
+    def backend_name(self) -> Optional[str]:
+        return self.backend.name if self.backend else None
+
+
+question_search = QuestionSearch(engine)
+
+
+@event.listens_for(Session, "after_flush")
+def _track_search_writes(session, flush_context):
+    changed = session.info.setdefault("search_changed", set())
+    removed = session.info.setdefault("search_removed", set())
+    for obj in (*session.new, *session.dirty):
+        if isinstance(obj, Question):
+            changed.add(obj.id)
+    for obj in session.deleted:
+        if isinstance(obj, Question):
+            removed.add(obj.id)
+
+
+# One thread, so index updates are applied in commit order
+_sync_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="question-search")
+
+
+def _apply_search_writes(changed: set, removed: set):
+    try:
+        if removed:
+            question_search.remove(removed)
+        if changed - removed:
+            question_search.reindex(changed - removed)
+    except Exception:
+        # A stale search index must never fail the write that triggered it
+        logging.exception("Could not update the question search index")
+
+
+@event.listens_for(Session, "after_commit")
+def _sync_search_index(session):
+    changed = session.info.pop("search_changed", set())
+    removed = session.info.pop("search_removed", set())
+    if not (changed or removed):
+        return
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        # Threadpool route, seeder or script: index before returning
+        _apply_search_writes(changed, removed)
+        return
+    # Committed on the event loop (an AsyncSession, or a sync Session in an
+    # async route): the index queries would block it, so run them behind
+    _sync_executor.submit(_apply_search_writes, changed, removed)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_search_writes(session):
+    session.info.pop("search_changed", None)
+    session.info.pop("search_removed", None)
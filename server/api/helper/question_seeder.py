@@ -0,0 +1,135 @@
+import hashlib
+import logging
+import os
+from collections import defaultdict
+from itertools import islice
+from typing import Iterator, List
+import ijson
+from sqlalchemy import insert, update, text, func, null
+from sqlalchemy.orm import Session
+from db import Question, QuestionSeedFile
+from db.schema.question_schema import normalize_key
+from api.helper.code_runner import invalidate_question
+from api.helper.question_catalogue import invalidate_catalogue
+from api.helper.question_search import question_search
+
+JSONError = ijson.JSONError
+
+SEED_BATCH_SIZE = 500
+
+SEED_FIELDS = (
+    "id", "title", "difficulty", "category", "problem_description", "starter_code",
+    "example_input", "example_output", "example_reasoning", "learn_content",
+    "solution_code", "test_cases", "function_name", "time_limit_ms", "memory_limit_mb",
+)
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def iter_problems(path: str) -> Iterator[dict]:
+    """Yields the problems of a JSON array file incrementally, without loading it whole."""
+    with open(path, "rb") as f:
+        yield from ijson.items(f, "item", use_float=True)
+
+
+def _row(problem: dict) -> dict:
+    row = {field: problem.get(field) for field in SEED_FIELDS}
+    # Core inserts bypass the ORM hook that fills these
+    row["category_key"] = normalize_key(row["category"])
+    row["difficulty_key"] = normalize_key(row["difficulty"])
+    return row
+
+
+def _upsert(db: Session, rows: List[dict], existing: set):
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        if dialect == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        # A JSON column binds None as the JSON 'null', which coalesce would keep
+        rows = [{**row, "test_cases": null()} if row["test_cases"] is None else row for row in rows]
+        stmt = dialect_insert(Question).values(rows)
+        # Fields missing from the file never erase what is already stored
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["id"],
+            set_={
+                field: func.coalesce(getattr(stmt.excluded, field), getattr(Question, field))
+                for field in rows[0] if field != "id"
+            }
+        )
+        db.execute(stmt)
+        return
+
+    new_rows = [row for row in rows if row["id"] not in existing]
+    if new_rows:
+        db.execute(insert(Question), new_rows)
+    # As above, fields missing from the file keep their stored value. A bulk
+    # UPDATE by primary key needs the same columns in every row, so rows are
+    # grouped by the fields they set
+    updates = defaultdict(list)
+    for row in rows:
+        if row["id"] in existing:
+            values = {field: value for field, value in row.items() if value is not None}
+            updates[tuple(values)].append(values)
+    for group in updates.values():
+        if len(group[0]) > 1:
+            db.execute(update(Question), group)
+
+
+def seed_questions(db: Session, path: str, force: bool = False) -> dict:
+    """
+    Upserts every problem of `path` into `questions` in batches of
+    SEED_BATCH_SIZE, with one id lookup and one INSERT ... ON CONFLICT per
+    batch. Skipped entirely when the file's content hash matches the last
+    successful seed, unless `force` is set.
+    """
+    name = os.path.basename(path)
+    content_hash = file_hash(path)
+    seeded = db.get(QuestionSeedFile, name)
+    if seeded and seeded.content_hash == content_hash and not force:
+        logging.info(f"{name} unchanged since last seed, skipping")
+        return {"skipped": True, "inserted": 0, "updated": 0}
+
+    inserted = updated = 0
+    seeded_ids = []
+    problems = (p for p in iter_problems(path) if p.get("id") is not None)
+    while True:
+        batch = list(islice(problems, SEED_BATCH_SIZE))
+        if not batch:
+            break
+        # Last occurrence wins when an id repeats within a batch
+        rows = list({problem["id"]: _row(problem) for problem in batch}.values())
+        ids = [row["id"] for row in rows]
+        existing = {question_id for (question_id,) in db.query(Question.id).filter(Question.id.in_(ids))}
+
+        _upsert(db, rows, existing)
+        inserted += len(ids) - len(existing)
+        updated += len(existing)
+        seeded_ids.extend(ids)
+
+    if seeded:
+        seeded.content_hash = content_hash
+        seeded.questions = len(seeded_ids)
+    else:
+        db.add(QuestionSeedFile(name=name, content_hash=content_hash, questions=len(seeded_ids)))
+
+    if db.get_bind().dialect.name == "postgresql" and seeded_ids:
+        # Explicit ids do not advance the serial sequence used by /question/add
+        db.execute(text("SELECT setval(pg_get_serial_sequence('questions', 'id'), (SELECT MAX(id) FROM questions))"))
+    db.commit()
+
+    # Core statements skip the ORM/session hooks that keep these in sync
+    for question_id in seeded_ids:
+        invalidate_question(question_id)
+    invalidate_catalogue()
+    question_search.reindex(seeded_ids)
+
+    logging.info(f"Seeded {name}: {inserted} inserted, {updated} updated")
+    return {"skipped": False, "inserted": inserted, "updated": updated}
@@ -0,0 +1,21 @@
+from api.helper.job_metrics import JobMetrics
+
+
+class SandboxMetrics(JobMetrics):
+    """Job metrics for sandbox runs, which also count jobs killed by the timeout."""
+
+    def __init__(self, window: int = 1000):
+        super().__init__(window)
+        self.timeouts = 0
+
+    def job_finished(self, execution_time: float, timed_out: bool = False, failed: bool = False):
+        with self._lock:
+            self._record_finished(execution_time, failed)
+            if timed_out:
+                self.timeouts += 1
+
+    def _snapshot(self) -> dict:
+        return {**super()._snapshot(), "timeouts": self.timeouts}
+
+
+sandbox_metrics = SandboxMetrics()
@@ -0,0 +1,415 @@
+import os
+import sys
+import json
+import time
+import queue
+import select
+import secrets
+import signal
+import asyncio
+import logging
+import threading
+import subprocess
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List
+
+from config.app_config import app_config
+from api.helper.sandbox_metrics import sandbox_metrics
+from api.helper.sandbox_harness import read_result
+
+HELPER_DIR = os.path.dirname(os.path.abspath(__file__))
+WORKER_SCRIPT = os.path.join(HELPER_DIR, "sandbox_worker.py")
+HARNESS_SCRIPT = os.path.join(HELPER_DIR, "sandbox_harness.py")
+WORKER_STARTUP_TIMEOUT = 60
+WORKER_RESPONSE_GRACE = 5
+
+# Sandboxed interpreters get a minimal environment (no server secrets) and
+# single-threaded math libraries so one job cannot grab every core.
+SANDBOX_ENV = {
+    "PATH": os.environ.get("PATH", ""),
+    "LANG": "C.UTF-8",
+    "PYTHONIOENCODING": "utf-8",
+    "PYTHONDONTWRITEBYTECODE": "1",
+    "OMP_NUM_THREADS": "1",
+    "OPENBLAS_NUM_THREADS": "1",
+    "MKL_NUM_THREADS": "1",
+}
+
+
+class SandboxBusyError(Exception):
+    """Raised when the sandbox queue is full and a job cannot be accepted."""
+
+
+@dataclass
+class SandboxResult:
+    returncode: int
+    stdout: str  # the harness verdict, empty unless it carried the job's nonce
+    stderr: str
+    timed_out: bool = False
+    output_exceeded: bool = False
+
+
+# =========================== Single worker process ============================
+class SandboxWorker:
+    """A long-lived `sandbox_worker.py` process talking JSON lines over pipes."""
+
+    def __init__(self, process: subprocess.Popen):
+        self.process = process
+        self.jobs_run = 0
+
+    @classmethod
+    def spawn(cls, preload: List[str]) -> "SandboxWorker":
+        process = subprocess.Popen(
+            [sys.executable, WORKER_SCRIPT, "--preload", ",".join(preload)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+            env=SANDBOX_ENV,
+        )
+        worker = cls(process)
+        handshake = worker._read_line(WORKER_STARTUP_TIMEOUT)
+        if not handshake.get("ready"):
+            worker.terminate()
+            raise RuntimeError("Sandbox worker failed to start")
+        logging.info(f"Sandbox worker started: pid={process.pid}")
+        return worker
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def _read_line(self, timeout: float) -> dict:
+        ready, _, _ = select.select([self.process.stdout], [], [], timeout)
+        if not ready:
+            raise TimeoutError("Sandbox worker did not respond")
+        line = self.process.stdout.readline()
+        if not line:
+            raise RuntimeError("Sandbox worker exited unexpectedly")
+        return json.loads(line)
+
+    def execute(self, job: dict) -> SandboxResult:
+        self.process.stdin.write(json.dumps(job) + "\n")
+        self.process.stdin.flush()
+        response = self._read_line((job.get("timeout") or 0) + WORKER_RESPONSE_GRACE)
+        self.jobs_run += 1
+        return SandboxResult(
+            returncode=response["returncode"],
+            stdout=response["stdout"],
+            stderr=response["stderr"],
+            timed_out=response.get("timed_out", False),
+            output_exceeded=response.get("output_exceeded", False),
+        )
+
+    def terminate(self):
+        try:
+            self.process.stdin.close()
+        except Exception:
+            pass
+        try:
+            self.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+# =========================== Worker pool ======================================
+class SandboxPool:
+    """
+    Fixed-size pool of pre-warmed sandbox workers.
+
+    Jobs are dispatched from a thread pool so the event loop never blocks on
+    the worker pipes. A worker is recycled after `max_jobs_per_worker` runs or
+    as soon as anything goes wrong while talking to it.
+    """
+
+    def __init__(
+        self,
+        size: int,
+        queue_limit: int,
+        max_jobs_per_worker: int,
+        timeout: float,
+        limits: dict,
+        output_limit: int,
+        preload: List[str],
+    ):
+        self.size = size
+        self.queue_limit = queue_limit
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.timeout = timeout
+        self.limits = limits
+        self.output_limit = output_limit
+        self.preload = preload
+
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="sandbox")
+        self._idle: "queue.Queue[Optional[SandboxWorker]]" = queue.Queue()
+        for _ in range(size):
+            self._idle.put(None)
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return hasattr(os, "fork")
+
+    def start(self):
+        """Warms every worker slot in the background."""
+        if not self.available:
+            logging.warning("os.fork is not available, sandbox pool disabled")
+            return
+        for _ in range(self.size):
+            self._executor.submit(self._warm_slot)
+
+    def close(self):
+        """Terminates idle workers. Slots are lazily re-spawned on next use."""
+        for _ in range(self.size):
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if worker is not None:
+                worker.terminate()
+            self._idle.put(None)
+
+    async def run(self, payload: str) -> SandboxResult:
+        with self._lock:
+            if self._pending >= self.size + self.queue_limit:
+                sandbox_metrics.job_rejected()
+                raise SandboxBusyError("Sandbox queue is full")
+            self._pending += 1
+
+        job = {
+            "payload": payload,
+            "timeout": self.timeout,
+            "limits": self.limits,
+            "output_limit": self.output_limit,
+        }
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, self._run_blocking, job, time.perf_counter())
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def _warm_slot(self):
+        worker = self._idle.get()
+        try:
+            if worker is None or not worker.alive:
+                worker = SandboxWorker.spawn(self.preload)
+        except Exception as e:
+            logging.error(f"Failed to warm sandbox worker: {e}")
+            worker = None
+        finally:
+            self._idle.put(worker)
+
+    def _run_blocking(self, job: dict, queued_at: float) -> SandboxResult:
+        worker = self._idle.get()
+        sandbox_metrics.job_started(time.perf_counter() - queued_at)
+        started = time.perf_counter()
+        healthy = False
+        result = None
+        try:
+            if worker is None or not worker.alive:
+                worker = SandboxWorker.spawn(self.preload)
+            result = worker.execute(job)
+            # A child killed by a signal counts as a crash: start over with a fresh worker
+            healthy = result.returncode >= 0
+            return result
+        finally:
+            sandbox_metrics.job_finished(
+                time.perf_counter() - started,
+                timed_out=result is not None and result.timed_out,
+                failed=result is None or result.returncode != 0,
+            )
+            if worker is not None and (not healthy or worker.jobs_run >= self.max_jobs_per_worker):
+                logging.info(f"Recycling sandbox worker pid={worker.process.pid} after {worker.jobs_run} jobs")
+                worker.terminate()
+                worker = None
+            self._idle.put(worker)
+            if worker is None:
+                self._executor.submit(self._warm_slot)
+
+
+# =========================== Subprocess sandbox ===============================
+def _kill_process_group(process: asyncio.subprocess.Process):
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+
+
+class SubprocessSandbox:
+    """
+    Runs every job in a fresh `python sandbox_harness.py` interpreter without
+    blocking the event loop. At most `concurrency` children run at once;
+    further jobs wait on a semaphore, up to `queue_limit` of them.
+    """
+
+    def __init__(self, concurrency: int, queue_limit: int, timeout: float, limits: dict, output_limit: int):
+        self.concurrency = concurrency
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self.limits = limits
+        self.output_limit = output_limit
+        self._waiting = 0
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._loop = None
+
+    def _slots(self) -> asyncio.Semaphore:
+        # asyncio primitives are bound to a loop, so rebuild them if the app
+        # is served from a new one (e.g. successive TestClient sessions)
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+            self._loop = loop
+        return self._semaphore
+
+    async def run(self, payload: str) -> SandboxResult:
+        slots = self._slots()
+        if slots.locked() and self._waiting >= self.queue_limit:
+            sandbox_metrics.job_rejected()
+            raise SandboxBusyError("Sandbox queue is full")
+
+        queued_at = time.perf_counter()
+        self._waiting += 1
+        try:
+            await slots.acquire()
+        finally:
+            self._waiting -= 1
+
+        sandbox_metrics.job_started(time.perf_counter() - queued_at)
+        started = time.perf_counter()
+        result = None
+        nonce = secrets.token_hex(16)
+        result_r, result_w = os.pipe()
+        transport = None
+        try:
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    sys.executable, HARNESS_SCRIPT, "--limits", json.dumps(self.limits), "--result-fd", str(result_w),
+                    stdin=asyncio.subprocess.PIPE,
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE,
+                    pass_fds=(result_w,),
+                    start_new_session=True,
+                    env=SANDBOX_ENV,
+                )
+            finally:
+                os.close(result_w)
+            results, transport = await self._open_result_pipe(result_r)
+            try:
+                raw, stderr, output_exceeded = await asyncio.wait_for(
+                    self._communicate(process, f"{nonce}\n{payload}".encode("utf-8"), results),
+                    timeout=self.timeout
+                )
+            except asyncio.TimeoutError:
+                _kill_process_group(process)
+                await process.wait()
+                result = SandboxResult(returncode=process.returncode, stdout="", stderr="", timed_out=True)
+                return result
+            except BaseException:
+                # Request cancelled (client went away): don't leave the child running
+                _kill_process_group(process)
+                raise
+
+            # Anything on the result fd without the nonce came from the submission
+            verdict = read_result(raw.decode("utf-8", errors="replace"), nonce)
+            result = SandboxResult(
+                returncode=process.returncode,
+                stdout=verdict or "",
+                stderr=stderr.decode("utf-8", errors="replace"),
+                # RLIMIT_CPU delivers SIGXCPU, which we report as a time limit too
+                timed_out=process.returncode == -signal.SIGXCPU,
+                output_exceeded=output_exceeded,
+            )
+            return result
+        finally:
+            # The transport owns the read end once it exists
+            if transport is not None:
+                transport.close()
+            else:
+                os.close(result_r)
+            sandbox_metrics.job_finished(
+                time.perf_counter() - started,
+                timed_out=result is not None and result.timed_out,
+                failed=result is None or result.returncode != 0,
+            )
+            slots.release()
+
+    @staticmethod
+    async def _open_result_pipe(fd: int):
+        """Wraps the read end of the result pipe in a StreamReader; returns (reader, transport)."""
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        transport, _ = await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader), os.fdopen(fd, "rb", buffering=0)
+        )
+        return reader, transport
+
+    async def _communicate(self, process: asyncio.subprocess.Process, payload: bytes, results: asyncio.StreamReader):
+        try:
+            process.stdin.write(payload)
+            await process.stdin.drain()
+            process.stdin.close()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # child died early; its exit code tells the story
+
+        (raw, out_exceeded), (stderr, err_exceeded) = await asyncio.gather(
+            self._read_capped(process, results),
+            self._read_capped(process, process.stderr),
+        )
+        await process.wait()
+        return raw, stderr, out_exceeded or err_exceeded
+
+    async def _read_capped(self, process: asyncio.subprocess.Process, stream: asyncio.StreamReader):
+        """Reads a pipe in chunks, killing the child once it writes more than the cap."""
+        buffer = bytearray()
+        while True:
+            chunk = await stream.read(65536)
+            if not chunk:
+                return bytes(buffer), False
+            buffer.extend(chunk)
+            if len(buffer) > self.output_limit:
+                _kill_process_group(process)
+                return bytes(buffer[:self.output_limit]), True
+
+
+def _sandbox_limits() -> dict:
+    return {
+        "cpu_seconds": app_config.sandbox_cpu_seconds,
+        "memory_mb": app_config.sandbox_memory_limit_mb,
+        "open_files": app_config.sandbox_open_files,
+        "processes": app_config.sandbox_max_processes,
+        "file_size_mb": app_config.sandbox_file_size_mb,
+    }
+
+
+def _preload_modules() -> List[str]:
+    modules = ["numpy"]
+    if app_config.sandbox_preload_torch:
+        modules.append("torch")
+    return modules
+
+
+sandbox_pool = SandboxPool(
+    size=app_config.sandbox_pool_size,
+    queue_limit=app_config.sandbox_queue_limit,
+    max_jobs_per_worker=app_config.sandbox_max_jobs_per_worker,
+    timeout=app_config.sandbox_timeout_seconds,
+    limits=_sandbox_limits(),
+    output_limit=app_config.sandbox_output_limit_kb * 1024,
+    preload=_preload_modules(),
+)
+
+subprocess_sandbox = SubprocessSandbox(
+    concurrency=app_config.sandbox_pool_size,
+    queue_limit=app_config.sandbox_queue_limit,
+    timeout=app_config.sandbox_timeout_seconds,
+    limits=_sandbox_limits(),
+    output_limit=app_config.sandbox_output_limit_kb * 1024,
+)
@@ -0,0 +1,204 @@
+"""
+Pre-warmed sandbox worker.
+
+Started by ``SandboxPool`` as ``python sandbox_worker.py --preload numpy``.
+The harness and the heavy numeric libraries are imported once at start-up,
+then every job received on stdin (one JSON object per line) is executed in a
+forked child so submissions never share interpreter state with each other.
+
+This file is executed as a plain script and must only depend on the stdlib.
+"""
+import argparse
+import json
+import os
+import secrets
+import selectors
+import signal
+import sys
+import time
+import traceback
+
+import sandbox_harness
+
+RESULT_FD = 3
+
+
+# =========================== Child process ====================================
+def _max_fd() -> int:
+    try:
+        return os.sysconf("SC_OPEN_MAX")
+    except (ValueError, OSError):
+        return 4096
+
+
+def _execute_in_child(job: dict, nonce: str, result_w: int, err_w: int):
+    """Runs inside the forked child. Never returns."""
+    exit_code = 0
+    try:
+        os.setpgid(0, 0)
+
+        os.dup2(err_w, 2)
+        os.dup2(result_w, RESULT_FD)
+        sandbox_harness.isolate_stdio()
+        # fork() copies every descriptor regardless of O_CLOEXEC, including the
+        # worker's protocol channel: a submission that found it could write its
+        # own verdict line. Only stdin, stdout, stderr and the result fd survive.
+        os.closerange(RESULT_FD + 1, _max_fd())
+
+        sandbox_harness.apply_limits(job.get("limits") or {})
+        try:
+            output = sandbox_harness.run_payload(job["payload"])
+        except Exception as e:
+            traceback.print_exc()
+            exit_code = sandbox_harness.exit_code_for(e)
+        else:
+            sandbox_harness.write_result(RESULT_FD, nonce, output)
+    except SystemExit as e:
+        if e.code is None:
+            exit_code = 0
+        elif isinstance(e.code, int):
+            exit_code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            exit_code = 1
+    except BaseException:
+        traceback.print_exc()
+        exit_code = 1
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        except Exception:
+            pass
+        os._exit(exit_code)
+
+
+# =========================== Parent side ======================================
+def _collect(pid: int, result_r: int, err_r: int, timeout: float, output_limit: int = None):
+    """
+    Streams the child's result fd and stderr until it exits, the deadline
+    passes or either stream grows beyond `output_limit` bytes.
+    """
+    buffers = {result_r: bytearray(), err_r: bytearray()}
+    selector = selectors.DefaultSelector()
+    selector.register(result_r, selectors.EVENT_READ)
+    selector.register(err_r, selectors.EVENT_READ)
+
+    deadline = time.monotonic() + timeout if timeout else None
+    timed_out = False
+    output_exceeded = False
+    open_fds = 2
+
+    while open_fds and not output_exceeded:
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            timed_out = True
+            break
+        for key, _ in selector.select(remaining):
+            chunk = os.read(key.fd, 65536)
+            if not chunk:
+                selector.unregister(key.fd)
+                open_fds -= 1
+                continue
+            buffers[key.fd].extend(chunk)
+            if output_limit and len(buffers[key.fd]) > output_limit:
+                del buffers[key.fd][output_limit:]
+                output_exceeded = True
+                break
+
+    selector.close()
+
+    if timed_out or output_exceeded:
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    _, status = os.waitpid(pid, 0)
+    returncode = os.waitstatus_to_exitcode(status)
+
+    # RLIMIT_CPU delivers SIGXCPU, which we report as a time limit too
+    if returncode == -signal.SIGXCPU:
+        timed_out = True
+
+    return {
+        "returncode": returncode,
+        "stdout": buffers[result_r].decode("utf-8", errors="replace"),
+        "stderr": buffers[err_r].decode("utf-8", errors="replace"),
+        "timed_out": timed_out,
+        "output_exceeded": output_exceeded,
+    }
+
+
+def run_job(job: dict) -> dict:
+    nonce = secrets.token_hex(16)
+    result_r, result_w = os.pipe()
+    err_r, err_w = os.pipe()
+
+    pid = os.fork()
+    if pid == 0:
+        os.close(result_r)
+        os.close(err_r)
+        _execute_in_child(job, nonce, result_w, err_w)
+
+    os.close(result_w)
+    os.close(err_w)
+    try:
+        result = _collect(pid, result_r, err_r, job.get("timeout"), job.get("output_limit"))
+    finally:
+        os.close(result_r)
+        os.close(err_r)
+
+    # Only the harness knows the nonce: anything else on the result fd was
+    # written by the submission and must not be taken for a verdict
+    verdict = sandbox_harness.read_result(result["stdout"], nonce)
+    if verdict is None and result["stdout"]:
+        result["stderr"] += "\n[sandbox] discarded result output not written by the harness"
+    result["stdout"] = verdict or ""
+    return result
+
+
+def preload(modules):
+    for name in modules:
+        try:
+            __import__(name)
+        except Exception as e:
+            print(f"[sandbox_worker] could not preload {name}: {e}", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-warmed code sandbox worker")
+    parser.add_argument("--preload", default="", help="Comma separated modules to import at start-up")
+    args = parser.parse_args()
+
+    # Keep a private handle on the protocol channel and send any stray prints
+    # (from preloaded libraries or the worker itself) to stderr instead.
+    channel = os.fdopen(os.dup(1), "w", encoding="utf-8")
+    os.dup2(2, 1)
+
+    preload([m for m in args.preload.split(",") if m])
+
+    channel.write(json.dumps({"ready": True}) + "\n")
+    channel.flush()
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            job = json.loads(line)
+            sys.stdout.flush()
+            sys.stderr.flush()
+            result = run_job(job)
+        except Exception:
+            result = {
+                "returncode": 1,
+                "stdout": "",
+                "stderr": traceback.format_exc(),
+                "timed_out": False,
+            }
+        channel.write(json.dumps(result) + "\n")
+        channel.flush()
+
+
+if __name__ == "__main__":
+    main()
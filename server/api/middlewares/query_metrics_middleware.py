@@ -0,0 +1,35 @@
+from fastapi import Request
+import logging
+from api.helper.query_metrics import query_metrics, current_query_stats, RequestQueryStats
+from config.app_config import app_config
+
+
+async def track_db_queries(request: Request, call_next):
+    """
+    Counts the queries and DB time of each request, exposes them on
+    `request.state.db_queries` and in the X-DB-Queries / X-DB-Time-Ms response
+    headers, and feeds the per-route totals of `/db/metrics`. Queries issued
+    while a streaming body is being sent happen after this returns and are
+    not attributed to the route.
+    """
+    stats = RequestQueryStats()
+    request.state.db_queries = stats
+    token = current_query_stats.set(stats)
+    try:
+        response = await call_next(request)
+    finally:
+        current_query_stats.reset(token)
+
+    route = request.scope.get("route")
+    # Route templates rather than raw paths keep the number of entries bounded
+    route_name = f"{request.method} {route.path if route else '<unmatched>'}"
+    query_metrics.request_finished(route_name, stats)
+
+    if stats.count >= app_config.db_query_count_warning:
+        logging.warning(f"{route_name} issued {stats.count} queries ({stats.total_ms:.1f} ms), possible N+1")
+    elif stats.count:
+        logging.debug(f"{route_name}: {stats.count} queries, {stats.total_ms:.1f} ms")
+
+    response.headers["X-DB-Queries"] = str(stats.count)
+    response.headers["X-DB-Time-Ms"] = f"{stats.total_ms:.1f}"
+    return response
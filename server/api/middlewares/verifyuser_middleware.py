@@ -1,11 +1,40 @@
 from fastapi import Request, HTTPException, Depends
+import copy
 import jwt
 import os
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
 from db import User, get_db
 from config.app_config import app_config
+from src.utils.cache_utils import LRUCache
 
 from typing import Optional
+
+# (user_id, token iat) -> column snapshot of the User row
+user_cache = LRUCache(maxsize=app_config.auth_user_cache_size, ttl=app_config.auth_user_cache_ttl_seconds)
+
+
+def invalidate_user(user_id: int) -> int:
+    """Drops every cached snapshot of a user. Call after changing the row."""
+    return user_cache.invalidate(lambda key: key[0] == user_id)
+
+
+def _snapshot(user: User) -> dict:
+    return {attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs}
+
+
+def _attach_cached_user(db: Session, snapshot: dict) -> User:
+    """
+    Rebuilds the User from its snapshot and attaches it to the request session
+    as a persistent row without querying, so routes can still modify and
+    commit `request.state.user`.
+    """
+    user = User(**copy.deepcopy(snapshot))
+    make_transient_to_detached(user)
+    db.add(user)
+    return user
+
+
 async def verify_jwt(request: Request, db: Session = Depends(get_db)) -> Optional[bool]:
     token = request.cookies.get("accessToken") or request.headers.get("Authorization")
     if token and token.startswith("Bearer "):
@@ -18,13 +47,20 @@ async def verify_jwt(request: Request, db: Session = Depends(get_db)) -> Optiona
     try:
         decoded_token = jwt.decode(token, app_config.secret_key, algorithms=[app_config.algorithm])
         user_id = decoded_token.get("id")
-        
+
+        cache_key = (user_id, decoded_token.get("iat"))
+        snapshot = user_cache.get(cache_key)
+        if snapshot is not None:
+            request.state.user = _attach_cached_user(db, snapshot)
+            return True
+
         user = db.query(User).filter(User.id == user_id).first()
 
         if not user:
             print(f"[DEBUG] Token is valid, but User not found in DB for user_id: {user_id}")
             raise HTTPException(status_code=401, detail={"success": False, "message": "Invalid Access Token", "data": None})
 
+        user_cache.set(cache_key, _snapshot(user))
         request.state.user = user
         return True
 
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, Literal
 
 class UpdateCodingSchema(BaseModel):
     """
@@ -70,6 +70,11 @@ class RunCode(BaseModel):
         description="The database identifier of the problem being solved.",
         example=1
     )
+    evaluation_mode: Optional[Literal["full", "fail_fast", "sharded"]] = Field(
+        None,
+        description="How `submit_code` evaluates test cases: 'full' runs all of them, 'fail_fast' stops at the first failure, 'sharded' splits them across several sandbox workers. Defaults to the server setting; `run_code` always runs the full report.",
+        example="fail_fast"
+    )
 
     class Config:
         json_schema_extra = {
@@ -78,4 +83,44 @@ class RunCode(BaseModel):
                 "code": "def twoSum(nums, target):\n    seen = {}\n    for i, num in enumerate(nums):\n        if target - num in seen:\n            return [seen[target - num], i]\n        seen[num] = i\n    return []",
                 "question_id": 1
             }
-        }
\ No newline at end of file
+        }
+
+class BatchGradeItem(BaseModel):
+    """A single submission to re-grade as part of a batch."""
+    question_id: int = Field(
+        ...,
+        description="The database identifier of the problem being solved.",
+        example=1
+    )
+    code: str = Field(
+        ...,
+        description="Raw code string to be evaluated against the question's test cases.",
+        example="class Solution:\n    def twoSum(self, nums, target):\n        return [0, 1]"
+    )
+
+
+class BatchGrade(BaseModel):
+    """
+    Schema for re-evaluating many submissions of the authenticated user at once.
+    """
+    submissions: List[BatchGradeItem] = Field(
+        ...,
+        min_length=1,
+        description="Submissions to grade. Results are streamed back as they finish, not in request order.",
+    )
+    evaluation_mode: Optional[Literal["full", "fail_fast", "sharded"]] = Field(
+        None,
+        description="Evaluation mode used for every submission, see `RunCode.evaluation_mode`. Defaults to the server setting.",
+        example="fail_fast"
+    )
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "submissions": [
+                    {"question_id": 1, "code": "class Solution:\n    def twoSum(self, nums, target):\n        return [0, 1]"},
+                    {"question_id": 2, "code": "class Solution:\n    def isValid(self, s):\n        return True"}
+                ],
+                "evaluation_mode": "fail_fast"
+            }
+        }
@@ -1,8 +1,10 @@
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, Field
 from fastapi import File, UploadFile,File
 
 class ChatRequest(BaseModel):
     message: str
+    sources: Optional[List[str]] = Field(None, description="Uploaded file names to restrict retrieval to. Omit to search every file.")
 
 
 
@@ -70,6 +70,16 @@ class QuestionCreate(BaseModel):
         description="The entrypoint function name used in the evaluation script to test user code.",
         example="twoSum"
     )
+    time_limit_ms: Optional[int] = Field(
+        None,
+        description="Optional wall-clock budget per test case in milliseconds. Passing cases that run longer are marked as failed.",
+        example=500
+    )
+    memory_limit_mb: Optional[int] = Field(
+        None,
+        description="Optional peak memory budget (resident set size of the sandbox process) in megabytes.",
+        example=256
+    )
 
     class Config:
         json_schema_extra = {
@@ -86,7 +96,9 @@ class QuestionCreate(BaseModel):
                 "learn_content": "Use a hash map to reduce time complexity from O(n^2) to O(n).",
                 "solution_code": "def twoSum(nums, target):\n    seen = {}\n    for i, n in enumerate(nums):\n        diff = target - n\n        if diff in seen:\n            return [seen[diff], i]\n        seen[n] = i",
                 "test_cases": [{"input": [[2, 7, 11, 15], 9], "output": [0, 1]}],
-                "function_name": "twoSum"
+                "function_name": "twoSum",
+                "time_limit_ms": 500,
+                "memory_limit_mb": 256
             }
         }
 
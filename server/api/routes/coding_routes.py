@@ -1,16 +1,19 @@
 from sqlalchemy.engine import result
 from transformers.models.canine.tokenization_canine import BOS
 from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 from db import Coding, get_db
 from api.middlewares.verifyuser_middleware import verify_jwt
 from api.models.coding_models import UpdateCodingSchema
-from api.models.coding_models import RunCode
-from db import Question
+from api.models.coding_models import RunCode, BatchGrade
+from db import Question, SessionLocal
 
-from api.helper import code_runner
+from api.helper import code_runner, SandboxBusyError, sandbox_metrics, result_cache
+from api.helper import mark_questions_solved, grade_submissions, batch_route_concurrency
+from api.helper import coding_snapshot, lock_coding, record_visits, replace_solved_history, RECENTLY_VISITED_LIMIT
+from config.app_config import app_config
 import subprocess
 import json
 import logging
@@ -29,7 +32,7 @@ router = APIRouter(
     "/fetch", 
     dependencies=[Depends(verify_jwt)],
     summary="Fetch coding progress schema",
-    description="Retrieves the authenticated user's coding metrics, statistics (easy, medium, hard counts), and lists of recently solved or visited question IDs. Automatically initializes a record if none exists.",
+    description="Retrieves the authenticated user's coding metrics, statistics (easy, medium, hard counts), and lists of recently solved or visited question IDs. Returns an empty record for users without any progress yet; nothing is written.",
     responses={
         200: {
             "description": "Coding progress statistics fetched successfully.",
@@ -63,67 +66,11 @@ async def get_coding_schema(request: Request, db: Session = Depends(get_db)):
         raise HTTPException(status_code=401, detail={"success": False, "message": "Unauthorized", "data": None})
     user_id = user.id
 
-    coding = db.query(Coding).filter(Coding.user_id == user_id).first()
-
-    if not coding:
-        new_coding = Coding(user_id=user_id)
-        db.add(new_coding)
-        db.commit()
-        db.refresh(new_coding)
-        return JSONResponse(
-            status_code=200,
-            content={"success": True, "message": "coding schema created automatically", "data": [jsonable_encoder(new_coding)]}
-        )
-
-    # Auto-heal: de-duplicate array fields and recalculate difficulty counts
-    modified = False
-    
-    if coding.recently_solved:
-        seen = set()
-        deduped = [x for x in coding.recently_solved if not (x in seen or seen.add(x))]
-        if len(deduped) != len(coding.recently_solved):
-            coding.recently_solved = deduped
-            modified = True
-            
-    if coding.recently_visited:
-        seen = set()
-        deduped = [x for x in coding.recently_visited if not (x in seen or seen.add(x))][:5]
-        if len(deduped) != len(coding.recently_visited) or len(coding.recently_visited) > 5:
-            coding.recently_visited = deduped
-            modified = True
-            
-    if coding.all_questions_solved:
-        seen = set()
-        deduped = [x for x in coding.all_questions_solved if not (x in seen or seen.add(x))]
-        if len(deduped) != len(coding.all_questions_solved):
-            coding.all_questions_solved = deduped
-            modified = True
-
-    # Recalculate easy, medium, hard counts based on actual solved questions
-    solved_ids = coding.all_questions_solved or []
-    if solved_ids:
-        solved_questions = db.query(Question).filter(Question.id.in_(solved_ids)).all()
-        easy_count = sum(1 for q in solved_questions if q.difficulty == "easy")
-        medium_count = sum(1 for q in solved_questions if q.difficulty == "medium")
-        hard_count = sum(1 for q in solved_questions if q.difficulty == "hard")
-    else:
-        easy_count = 0
-        medium_count = 0
-        hard_count = 0
-
-    if coding.easy != easy_count or coding.medium != medium_count or coding.hard != hard_count:
-        coding.easy = easy_count
-        coding.medium = medium_count
-        coding.hard = hard_count
-        modified = True
-
-    if modified:
-        db.commit()
-        db.refresh(coding)
-
+    # Counters and history are maintained at solve time, so this is a plain
+    # read that never writes
     return JSONResponse(
         status_code=200,
-        content={"success": True, "message": "coding schema fetched", "data": [jsonable_encoder(coding)]}
+        content={"success": True, "message": "coding schema fetched", "data": [coding_snapshot(db, user_id)]}
     )
 
 @router.put(
@@ -144,7 +91,10 @@ async def get_coding_schema(request: Request, db: Session = Depends(get_db)):
                             "user_id": 10,
                             "easy": 6,
                             "medium": 2,
-                            "hard": 0
+                            "hard": 0,
+                            "recently_solved": [102, 101],
+                            "recently_visited": [103, 102, 101],
+                            "all_questions_solved": [101, 102]
                         }
                     }
                 }
@@ -161,34 +111,22 @@ async def update_coding_schema(request: Request, body: UpdateCodingSchema, db: S
         raise HTTPException(status_code=401, detail={"success": False, "message": "Unauthorized", "data": None})
     user_id = user.id
 
-    coding = db.query(Coding).filter(Coding.user_id == user_id).first()
-    if not coding:
-        logging.info(f"Coding schema not found for user {user_id}, creating a new one")
-        coding = Coding(user_id=user_id)
-        db.add(coding)
-        db.commit()
-        db.refresh(coding)
+    coding = lock_coding(db, user_id)
 
-    if body.recently_solved is not None:
-        seen = set()
-        coding.recently_solved = [x for x in body.recently_solved if not (x in seen or seen.add(x))]
     if body.recently_visited is not None:
-        seen = set()
-        coding.recently_visited = [x for x in body.recently_visited if not (x in seen or seen.add(x))][:5]
-    if body.all_questions_solved is not None:
-        seen = set()
-        coding.all_questions_solved = [x for x in body.all_questions_solved if not (x in seen or seen.add(x))]
-        
+        record_visits(db, user_id, body.recently_visited[:RECENTLY_VISITED_LIMIT])
+    if body.all_questions_solved is not None or body.recently_solved is not None:
+        replace_solved_history(db, user_id, body.all_questions_solved, body.recently_solved)
+
     if body.easy is not None: coding.easy = body.easy
     if body.medium is not None: coding.medium = body.medium
     if body.hard is not None: coding.hard = body.hard
 
     db.commit()
-    db.refresh(coding)
 
     return JSONResponse(
         status_code=200,
-        content={"success": True, "message": "data updated successfully", "data": jsonable_encoder(coding)}
+        content={"success": True, "message": "data updated successfully", "data": coding_snapshot(db, user_id)}
     )
 
 
@@ -200,7 +138,7 @@ async def update_coding_schema(request: Request, body: UpdateCodingSchema, db: S
     "/run_code", 
     dependencies=[Depends(verify_jwt)],
     summary="Run code against sample test cases",
-    description="Compiles and executes the user's code inside a python execution sandbox. Evaluates it against all sample test cases configured for the given question ID. Does not save coding progress in database.",
+    description="Compiles and executes the user's code inside a python execution sandbox. Evaluates it against all sample test cases configured for the given question ID and reports wall time, CPU time and peak memory per test case and for the whole run. Does not save coding progress in database.",
     responses={
         200: {
             "description": "Code completed execution. Returns count of passed test cases and test details.",
@@ -213,7 +151,8 @@ async def update_coding_schema(request: Request, body: UpdateCodingSchema, db: S
                             "status": "passed",
                             "passed": 3,
                             "total": 3,
-                            "results": [{"input": [1, 2], "expected": 3, "actual": 3, "passed": True}]
+                            "results": [{"input": [1, 2], "expected": 3, "got": 3, "passed": True, "wall_ms": 0.12, "cpu_ms": 0.11, "peak_rss_kb": 30512}],
+                            "stats": {"wall_ms": 4.8, "cpu_ms": 4.1, "peak_rss_kb": 30512}
                         }
                     }
                 }
@@ -234,6 +173,18 @@ async def update_coding_schema(request: Request, body: UpdateCodingSchema, db: S
                 }
             }
         },
+        503: {
+            "description": "All sandbox workers are busy and the job queue is full.",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "success": False,
+                        "message": "Sandbox is busy, please retry shortly",
+                        "data": None
+                    }
+                }
+            }
+        },
         408: {
             "description": "Code took too long to run (Execution timeout).",
             "content": {
@@ -256,7 +207,7 @@ async def run_code(
     Executes user's python code on test cases without persisting progress.
     """
     try:
-        status, passed, total, results = await code_runner(body, db)
+        status, passed, total, results, stats = await code_runner(body, db)
         return JSONResponse(
             status_code=200,
             content={
@@ -266,10 +217,22 @@ async def run_code(
                     "status": status,
                     "passed": passed,
                     "total": total,
-                    "results": results
+                    "results": results,
+                    "stats": stats
                 }
             }
         )
+    except HTTPException:
+        raise
+    except SandboxBusyError:
+        return JSONResponse(
+            status_code=503,
+            content={
+                "success": False,
+                "message": "Sandbox is busy, please retry shortly",
+                "data": None
+            }
+        )
     except subprocess.TimeoutExpired:
         return JSONResponse(
             status_code=408,
@@ -308,7 +271,7 @@ async def run_code(
     "/submit_code", 
     dependencies=[Depends(verify_jwt)],
     summary="Submit final coding solution",
-    description="Runs the user's code against all test cases. If all test cases pass, the question ID is marked as solved, and the user's counts (easy, medium, hard) are incremented in the database accordingly.",
+    description="Runs the user's code against all test cases, optionally stopping at the first failure ('fail_fast') or spreading them across several sandbox workers ('sharded'). If all test cases pass, the question ID is marked as solved, and the user's counts (easy, medium, hard) are incremented in the database accordingly.",
     responses={
         200: {
             "description": "Code evaluated. If fully passed, progress is updated in DB.",
@@ -321,7 +284,8 @@ async def run_code(
                             "status": "passed",
                             "passed": 5,
                             "total": 5,
-                            "results": [{"input": [1, 2], "expected": 3, "actual": 3, "passed": True}]
+                            "results": [{"input": [1, 2], "expected": 3, "got": 3, "passed": True, "wall_ms": 0.12, "cpu_ms": 0.11, "peak_rss_kb": 30512}],
+                            "stats": {"wall_ms": 4.8, "cpu_ms": 4.1, "peak_rss_kb": 30512}
                         }
                     }
                 }
@@ -342,6 +306,18 @@ async def run_code(
                 }
             }
         },
+        503: {
+            "description": "All sandbox workers are busy and the job queue is full.",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "success": False,
+                        "message": "Sandbox is busy, please retry shortly",
+                        "data": None
+                    }
+                }
+            }
+        },
         408: {
             "description": "Execution timeout.",
             "content": {
@@ -365,7 +341,8 @@ async def submit_code(
     Submits and evaluates code, committing question solve status to the database.
     """
     try:
-        status, passed, total, results = await code_runner(body, db)
+        mode = body.evaluation_mode or app_config.sandbox_submit_mode
+        status, passed, total, results, stats = await code_runner(body, db, mode=mode)
 
         if passed == total:
             user = getattr(request.state, "user", None)
@@ -374,34 +351,7 @@ async def submit_code(
                     status_code=401,
                     detail={"success": False, "message": "Unauthorized", "data": None}
                 )
-            user_id = user.id
-
-            coding = (
-                db.query(Coding)
-                .filter(Coding.user_id == user_id)
-                .first()
-            )
-            if coding:
-                if body.question_id not in coding.all_questions_solved:
-                    coding.all_questions_solved = coding.all_questions_solved + [body.question_id]
-                    
-                    # Also update recently solved questions list (keep unique, newest first)
-                    if not coding.recently_solved:
-                        coding.recently_solved = []
-                    if body.question_id in coding.recently_solved:
-                        coding.recently_solved.remove(body.question_id)
-                    coding.recently_solved = [body.question_id] + coding.recently_solved
-
-                    # Query difficulty
-                    question = db.query(Question).filter(Question.id == body.question_id).first()
-                    if question:
-                        if question.difficulty == "easy":
-                            coding.easy += 1
-                        elif question.difficulty == "medium":
-                            coding.medium += 1
-                        elif question.difficulty == "hard":
-                            coding.hard += 1
-                    db.commit()
+            mark_questions_solved(db, user.id, [body.question_id])
 
         return JSONResponse(
             status_code=200,
@@ -412,10 +362,22 @@ async def submit_code(
                     "status": status,
                     "passed": passed,
                     "total": total,
-                    "results": results
+                    "results": results,
+                    "stats": stats
                 }
             }
         )
+    except HTTPException:
+        raise
+    except SandboxBusyError:
+        return JSONResponse(
+            status_code=503,
+            content={
+                "success": False,
+                "message": "Sandbox is busy, please retry shortly",
+                "data": None
+            }
+        )
     except subprocess.TimeoutExpired:
         return JSONResponse(
             status_code=408,
@@ -448,3 +410,122 @@ async def submit_code(
             }
         )
 
+
+# =========================== Batch Grading =======================================
+@router.post(
+    "/batch_grade",
+    dependencies=[Depends(verify_jwt)],
+    summary="Re-grade many submissions at once",
+    description="Evaluates a list of (question_id, code) submissions for the authenticated user concurrently on the code sandbox and streams one JSON object per line (`application/x-ndjson`) as each submission finishes. Accepted submissions are then recorded in the user's coding progress in a single transaction, followed by a `progress` line and a final `summary` line.",
+    responses={
+        200: {
+            "description": "Newline delimited JSON stream of grading results.",
+            "content": {
+                "application/x-ndjson": {
+                    "example": "\n".join([
+                        json.dumps({"type": "result", "index": 1, "user_id": 10, "question_id": 2, "status": "Failed", "passed": 1, "total": 3, "stats": {"wall_ms": 3.2, "cpu_ms": 2.9, "peak_rss_kb": 30512}}),
+                        json.dumps({"type": "result", "index": 0, "user_id": 10, "question_id": 1, "status": "Accepted", "passed": 3, "total": 3, "stats": {"wall_ms": 4.8, "cpu_ms": 4.1, "peak_rss_kb": 30512}}),
+                        json.dumps({"type": "progress", "user_id": 10, "newly_solved": [1]}),
+                        json.dumps({"type": "summary", "total": 2, "accepted": 1, "failed": 1, "errors": 0})
+                    ])
+                }
+            }
+        },
+        413: {
+            "description": "Too many submissions in a single batch.",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "success": False,
+                        "message": "A batch can contain at most 500 submissions",
+                        "data": None
+                    }
+                }
+            }
+        }
+    }
+)
+async def batch_grade(
+    request: Request,
+    body: BatchGrade
+):
+    """
+    Re-evaluates many submissions of the current user and streams the verdicts.
+    """
+    if len(body.submissions) > app_config.sandbox_batch_max_items:
+        return JSONResponse(
+            status_code=413,
+            content={
+                "success": False,
+                "message": f"A batch can contain at most {app_config.sandbox_batch_max_items} submissions",
+                "data": None
+            }
+        )
+
+    user_id = request.state.user.id
+    mode = body.evaluation_mode or app_config.sandbox_submit_mode
+    submissions = [
+        {"user_id": user_id, "question_id": item.question_id, "code": item.code}
+        for item in body.submissions
+    ]
+
+    async def stream():
+        # The request scoped session is closed before a streamed body is sent,
+        # so the stream owns its session
+        db = SessionLocal()
+        try:
+            async for record in grade_submissions(submissions, db, mode=mode, concurrency=batch_route_concurrency()):
+                yield json.dumps(record) + "\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+# =========================== Sandbox Metrics =====================================
+@router.get(
+    "/sandbox/metrics",
+    dependencies=[Depends(verify_jwt)],
+    summary="Code sandbox metrics",
+    description="Returns job counters plus queue wait and execution time percentiles (in milliseconds) for the code execution sandbox over a rolling window of recent jobs, along with result cache statistics.",
+    responses={
+        200: {
+            "description": "Sandbox metrics fetched successfully.",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "success": True,
+                        "message": "Sandbox metrics fetched",
+                        "data": {
+                            "mode": "pool",
+                            "jobs": 120,
+                            "in_flight": 2,
+                            "timeouts": 1,
+                            "errors": 4,
+                            "rejected": 0,
+                            "queue_wait_ms": {"avg": 1.2, "p50": 0.4, "p95": 6.1, "max": 40.3},
+                            "execution_ms": {"avg": 85.0, "p50": 60.2, "p95": 210.7, "max": 10004.1},
+                            "result_cache": {"size": 42, "maxsize": 1024, "hits": 310, "misses": 120}
+                        }
+                    }
+                }
+            }
+        }
+    }
+)
+async def get_sandbox_metrics():
+    """
+    Expose sandbox queue wait and execution time statistics.
+    """
+    return JSONResponse(
+        status_code=200,
+        content={
+            "success": True,
+            "message": "Sandbox metrics fetched",
+            "data": {
+                "mode": app_config.sandbox_mode,
+                **sandbox_metrics.snapshot(),
+                "result_cache": result_cache.stats()
+            }
+        }
+    )
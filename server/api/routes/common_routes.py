@@ -1,8 +1,12 @@
 import json
+import asyncio
 import logging
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
-from db import get_db, Question
+from db import get_db
+from api.helper import seed_questions, query_metrics
+from api.helper.question_seeder import JSONError
+from api.middlewares.verifyuser_middleware import verify_jwt
 
 router = APIRouter(tags=["System & Utilities"])
 
@@ -32,60 +36,76 @@ async def _health():
 @router.get(
     "/fit_questions",
     summary="Seed/fit coding problems",
-    description="Parses the `problems.json` file in the project root and populates the database with default coding questions if they do not exist.",
+    description="Streams the `problems.json` file in the project root and bulk upserts its coding questions. The file's content hash is recorded, so calling this again with an unchanged file is a no-op unless `force` is set.",
     responses={
         200: {
             "description": "Db seeding finished successfully.",
             "content": {
                 "application/json": {
-                    "example": {"status": "ok", "message": "Questions inserted: 5"}
+                    "example": {"status": "ok", "message": "Questions inserted: 5, updated: 180"}
                 }
             }
         }
     }
 )
-async def _fit_questions(db: Session = Depends(get_db)):
+async def _fit_questions(
+    force: bool = Query(False, description="Re-seed even if `problems.json` is unchanged since the last run."),
+    db: Session = Depends(get_db)
+):
     """
-    Reads `problems.json` and inserts any missing coding questions into the database.
+    Reads `problems.json` and upserts its coding questions into the database.
     """
     logging.info("Inserting questions in the database")
     try:
-        with open("problems.json", "r") as f:
-            data = json.load(f)
+        # Parsing, upserts and the search reindex are blocking
+        result = await asyncio.to_thread(seed_questions, db, "problems.json", force=force)
     except FileNotFoundError:
         logging.error("problems.json not found")
         return {"status": "error", "message": "problems.json not found"}
-    except json.JSONDecodeError:
+    except (json.JSONDecodeError, JSONError):
+        db.rollback()
         logging.error("Failed to decode JSON from problems.json")
         return {"status": "error", "message": "Failed to decode JSON"}
 
-    inserted_count = 0
-    for q in data:
-        existing = db.query(Question).filter(Question.id == q.get("id")).first()
-        if existing:
-            continue
-        new_question = Question(
-            id=q.get("id"),
-            title=q.get("title"),
-            difficulty=q.get("difficulty"),
-            category=q.get("category"),
-            problem_description=q.get("problem_description"),
-            starter_code=q.get("starter_code"),
-            example_input=q.get("example_input"),
-            example_output=q.get("example_output"),
-            example_reasoning=q.get("example_reasoning"),
-            learn_content=q.get("learn_content"),
-            solution_code=q.get("solution_code"),
-            test_cases=q.get("test_cases"),
-            function_name=q.get("function_name"),
-        )
-        db.add(new_question)
-        inserted_count += 1
+    if result["skipped"]:
+        return {"status": "ok", "message": "problems.json unchanged, nothing to seed"}
+    return {"status": "ok", "message": f"Questions inserted: {result['inserted']}, updated: {result['updated']}"}
 
-    if inserted_count > 0:
-        db.commit()
 
-    return {"status": "ok", "message": f"Questions inserted: {inserted_count}"}
+@router.get(
+    "/db/metrics",
+    dependencies=[Depends(verify_jwt)],
+    summary="Database query metrics",
+    description="Returns per-route query counts and DB time since startup, sorted by queries per request so N+1 patterns surface first, together with the most recent statements slower than `DB_SLOW_QUERY_MS`.",
+    responses={
+        200: {
+            "description": "Query metrics fetched successfully.",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "status": "ok",
+                        "data": {
+                            "queries": 5120,
+                            "slow_queries": 2,
+                            "slow_query_ms": 200,
+                            "routes": [
+                                {"route": "GET /api/v1/coding/fetch", "requests": 310, "queries_per_request": 4.0, "max_queries": 4, "db_ms_per_request": 3.12}
+                            ],
+                            "recent_slow": [
+                                {"route": "GET /fit_questions", "statement": "INSERT INTO questions (id, title, ...) VALUES ...", "ms": 412.5}
+                            ]
+                        }
+                    }
+                }
+            }
+        }
+    }
+)
+async def _db_metrics():
+    """
+    Returns the query instrumentation collected by the DB metrics middleware.
+    """
+    return {"status": "ok", "data": query_metrics.snapshot()}
 
 
 @router.get(
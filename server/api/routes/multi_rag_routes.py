@@ -9,6 +9,7 @@ from langchain_core.messages import HumanMessage
 from src.constants import (
     ARTIFACT_DIR,
     TRANSFORMATION_FOLDER_NAME,
+    SESSION_INDEX_FOLDER_NAME,
     INGESTION_FOLDER_NAME,
     PUBLIC_FOLDER_FILE_PATH,
     DEFAULT_COOKIE_MAX_AGE_SECONDS,
@@ -27,6 +28,7 @@ from src.entity.config_entity import (
 )
 from src.retrievers.create_retreivers import Retreiver
 from api.helper.multi_rag_helper import delete_thread
+from config.app_config import app_config
 
 
 router = APIRouter(tags=['Multi-Rag'])
@@ -113,6 +115,7 @@ async def chat_endpoint(request: Request, chat_request: ChatRequest):
         initial_state = {
             "messages": [HumanMessage(content=chat_request.message)],
             "vector_store_file_paths": vector_store_paths,
+            "sources": chat_request.sources,
             "queries": [],
             "retreived_results": [],
             "ai_response": ""
@@ -154,7 +157,7 @@ async def chat_endpoint(request: Request, chat_request: ChatRequest):
     "/ingest",
     tags=['File'],
     summary="Ingest uploaded files",
-    description="Processes and vectorizes all uploaded files for the active user session. Embeds the content and saves the vector stores to enable retrieval during chat.",
+    description="Processes and vectorizes the uploaded files of the active user session. Only files that are new or changed since the last ingest (by content hash) are partitioned and embedded and merged into the session's index; chunks of changed or deleted files are replaced or removed.",
     responses={
         200: {
             "description": "Ingestion completed successfully.",
@@ -255,11 +258,21 @@ async def ingest_docs(request: Request):
         content_embedder_config = ContentEmbedderConfig(data_ingestion_configs=ingestion_configs)
         
         transformation_configs = [
-            DataTransformationConfig(vector_store_path=f"{ARTIFACT_DIR}/{thread_id}/{TRANSFORMATION_FOLDER_NAME}/{file_name}")
+            DataTransformationConfig(
+                vector_store_path=f"{ARTIFACT_DIR}/{thread_id}/{TRANSFORMATION_FOLDER_NAME}/{file_name}",
+                file_name=file_name
+            )
             for file_name in files
         ]
         
-        content_transformation_config = ContentTransformationConfig(data_transformation_configs=transformation_configs)
+        session_vector_store_path = None
+        if app_config.rag_index_mode == "session":
+            session_vector_store_path = f"{ARTIFACT_DIR}/{thread_id}/{TRANSFORMATION_FOLDER_NAME}/{SESSION_INDEX_FOLDER_NAME}"
+
+        content_transformation_config = ContentTransformationConfig(
+            data_transformation_configs=transformation_configs,
+            session_vector_store_path=session_vector_store_path
+        )
 
         vectorizer_pipeline = VectiorizerPipeline(
             content_embedder_config=content_embedder_config,
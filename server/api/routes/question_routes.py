@@ -1,11 +1,15 @@
+import asyncio
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.responses import JSONResponse
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from db import Question, get_db
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from db import Question, get_async_db
+from db.schema.question_schema import normalize_key
 from api.models.question_models import QuestionCreate
+from api.helper import cached_payload, etag_matches, encode_cursor, decode_cursor, question_search, question_facets
+from config.app_config import app_config
 import logging
 from api.middlewares.verifyuser_middleware import verify_jwt
 
@@ -23,7 +27,7 @@ router = APIRouter(
 @router.get(
     "",
     summary="Get coding questions",
-    description="Queries the list of available coding questions. Allows filtering by specific Question ID, Category, or Difficulty level.",
+    description="Queries the list of available coding questions. Allows filtering by specific Question ID, Category, or Difficulty level. Lists return a lightweight projection (id, title, difficulty, category) ordered by ID; pass `limit` to page through them with the returned `next_cursor`. Responses carry an `ETag`; send it back as `If-None-Match` to get an empty 304 when nothing changed.",
     responses={
         200: {
             "description": "Questions matching query criteria successfully returned.",
@@ -37,22 +41,21 @@ router = APIRouter(
                                 "id": 1,
                                 "title": "Two Sum",
                                 "difficulty": "easy",
-                                "category": "Arrays",
-                                "problem_description": "...",
-                                "starter_code": "...",
-                                "example_input": "...",
-                                "example_output": "...",
-                                "example_reasoning": "...",
-                                "learn_content": "...",
-                                "solution_code": "...",
-                                "test_cases": {},
-                                "function_name": "twoSum"
+                                "category": "Arrays"
                             }
-                        ]
+                        ],
+                        "next_cursor": "eyJhZnRlciI6IDF9"
                     }
                 }
             }
         },
+        304: {
+            "description": "The `If-None-Match` ETag is still current; the body is empty."
+        },
+        400: {
+            "description": "Malformed pagination cursor.",
+            "content": {"application/json": {"example": {"success": False, "message": "Invalid cursor", "data": None}}}
+        },
         404: {
             "description": "Question ID requested was not found.",
             "content": {"application/json": {"example": {"success": False, "message": "Question not found", "data": None}}}
@@ -60,45 +63,129 @@ router = APIRouter(
     }
 )
 async def get_questions(
-    question_id: Optional[int] = Query(None, description="Database ID of a single coding problem to retrieve."),
+    request: Request,
+    question_id: Optional[int] = Query(None, description="Database ID of a single coding problem to retrieve. Returns every column of the question."),
     category: Optional[str] = Query(None, description="Filter problems by category category (case-insensitive)."),
     difficulty: Optional[str] = Query(None, description="Filter problems by difficulty (easy, medium, hard)."),
-    db: Session = Depends(get_db)
+    limit: Optional[int] = Query(None, ge=1, le=app_config.question_page_max_limit, description="Page size. Omit to return every matching question."),
+    cursor: Optional[str] = Query(None, description="`next_cursor` of the previous page."),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Retrieve one or more coding questions based on filter parameters.
     """
-    query = db.query(Question)
-    
     if question_id is not None:
         logging.info(f"Fetching question by ID: {question_id}")
-        question = query.filter(Question.id == question_id).first()
-        if not question:
-            logging.warning(f"Question with ID {question_id} not found")
-            raise HTTPException(status_code=404, detail={"success": False, "message": "Question not found", "data": None})
-        return JSONResponse(
-            status_code=200,
-            content={"success": True, "message": "Question fetched successfully", "data": jsonable_encoder(question)}
-        )
-        
+
+        async def build_question():
+            question = await db.get(Question, question_id)
+            if not question:
+                logging.warning(f"Question with ID {question_id} not found")
+                raise HTTPException(status_code=404, detail={"success": False, "message": "Question not found", "data": None})
+            return {"success": True, "message": "Question fetched successfully", "data": jsonable_encoder(question)}
+
+        body, etag = await cached_payload(("question", question_id), build_question)
+        return _conditional_response(request, body, etag)
+
+    try:
+        after_id = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail={"success": False, "message": "Invalid cursor", "data": None})
+
     if category is not None:
         logging.info(f"Fetching questions by category: {category}")
-        query = query.filter(func.lower(Question.category) == category.lower())
-        
     if difficulty is not None:
         logging.info(f"Fetching questions by difficulty: {difficulty}")
-        query = query.filter(func.lower(Question.difficulty) == difficulty.lower())
-        
-    questions = query.all()
+
+    async def build_list():
+        query = select(Question.id, Question.title, Question.difficulty, Question.category)
+        if category is not None:
+            query = query.where(Question.category_key == normalize_key(category))
+        if difficulty is not None:
+            query = query.where(Question.difficulty_key == normalize_key(difficulty))
+        if after_id is not None:
+            query = query.where(Question.id > after_id)
+        query = query.order_by(Question.id)
+        if limit:
+            query = query.limit(limit + 1)
+
+        rows = (await db.execute(query)).all()
+        has_more = bool(limit) and len(rows) > limit
+        rows = rows[:limit] if limit else rows
+        return {
+            "success": True,
+            "message": "Questions fetched successfully",
+            "data": [
+                {"id": r.id, "title": r.title, "difficulty": r.difficulty, "category": r.category}
+                for r in rows
+            ],
+            "next_cursor": encode_cursor(rows[-1].id) if has_more else None
+        }
+
+    key = ("list", normalize_key(category), normalize_key(difficulty), after_id, limit)
+    body, etag = await cached_payload(key, build_list)
+    return _conditional_response(request, body, etag)
+
+
+def _conditional_response(request: Request, body: bytes, etag: str) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, status_code=200, media_type="application/json", headers=headers)
+
+@router.get(
+    "/search",
+    summary="Search coding questions",
+    description="Full-text search over question titles, problem descriptions and learn content. Every word must match (as a prefix); results are ranked by relevance and carry highlighted fragments where matches are wrapped in `<mark>` tags. Optional category/difficulty filters use the indexed normalized columns.",
+    responses={
+        200: {
+            "description": "Ranked search results.",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "success": True,
+                        "message": "Search results fetched successfully",
+                        "data": [
+                            {
+                                "id": 4,
+                                "title": "Calculate Mean by Row or Column",
+                                "difficulty": "easy",
+                                "category": "linear algebra",
+                                "score": 7.4123,
+                                "highlights": {
+                                    "title": "Calculate <mark>Mean</mark> by Row or Column",
+                                    "problem_description": "…calculates the <mark>mean</mark> of a matrix either by row or by column…"
+                                }
+                            }
+                        ]
+                    }
+                }
+            }
+        }
+    }
+)
+async def search_questions(
+    q: str = Query(..., min_length=1, max_length=200, description="Search text."),
+    category: Optional[str] = Query(None, description="Only return questions of this category (case-insensitive)."),
+    difficulty: Optional[str] = Query(None, description="Only return questions of this difficulty (easy, medium, hard)."),
+    limit: int = Query(20, ge=1, le=app_config.question_search_max_results, description="Maximum number of results."),
+):
+    """
+    Ranked full-text search across coding questions.
+    """
+    logging.info(f"Searching questions: {q!r}")
+    results = await asyncio.to_thread(
+        question_search.search, q, limit=limit, category_key=normalize_key(category), difficulty_key=normalize_key(difficulty)
+    )
     return JSONResponse(
         status_code=200,
-        content={"success": True, "message": "Questions fetched successfully", "data": jsonable_encoder(questions)}
+        content={"success": True, "message": "Search results fetched successfully", "data": results}
     )
 
 @router.get(
     "/categories",
     summary="Get all available question categories",
-    description="Returns a unique list of all categories that are populated in the database questions.",
+    description="Returns a unique list of all categories that are populated in the database questions. Served from the in-memory facet counts.",
     responses={
         200: {
             "description": "Unique categories fetched successfully.",
@@ -114,18 +201,55 @@ async def get_questions(
         }
     }
 )
-async def get_available_categories(db: Session = Depends(get_db)):
+async def get_available_categories(db: AsyncSession = Depends(get_async_db)):
     """
     Retrieve distinct categories present in the current Question table.
     """
     logging.info("Fetching available categories")
-    categories = db.query(Question.category).distinct().all()
-    categories_list = [c[0] for c in categories]
+    categories_list = [entry["category"] for entry in (await question_facets.get(db))["categories"]]
     return JSONResponse(
         status_code=200,
         content={"success": True, "message": "Categories fetched successfully", "data": categories_list}
     )
 
+@router.get(
+    "/facets",
+    summary="Question counts per category and difficulty",
+    description="Returns precomputed question counts for every category × difficulty pair, per difficulty and in total, for the question browser's filters. Served from memory and refreshed after question writes; supports `If-None-Match` revalidation like the question list.",
+    responses={
+        200: {
+            "description": "Facet counts fetched successfully.",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "success": True,
+                        "message": "Facets fetched successfully",
+                        "data": {
+                            "total": 185,
+                            "difficulties": {"easy": 85, "medium": 79, "hard": 21},
+                            "categories": [
+                                {"category": "linear algebra", "count": 40, "difficulties": {"easy": 22, "medium": 15, "hard": 3}}
+                            ]
+                        }
+                    }
+                }
+            }
+        },
+        304: {
+            "description": "The `If-None-Match` ETag is still current; the body is empty."
+        }
+    }
+)
+async def get_question_facets(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Category × difficulty question counts for the browser sidebar.
+    """
+    async def build_facets():
+        return {"success": True, "message": "Facets fetched successfully", "data": await question_facets.get(db)}
+
+    body, etag = await cached_payload(("facets",), build_facets)
+    return _conditional_response(request, body, etag)
+
 @router.post(
     "/add",
     summary="Add a new coding problem",
@@ -157,14 +281,14 @@ async def get_available_categories(db: Session = Depends(get_db)):
         }
     }
 )
-async def add_questions(question_input: QuestionCreate, db: Session = Depends(get_db)):
+async def add_questions(question_input: QuestionCreate, db: AsyncSession = Depends(get_async_db)):
     """
     Inserts a custom question into the database.
     """
     logging.info(f"Adding question: {question_input.title}")
     
     if question_input.id is not None:
-        existing = db.query(Question).filter(Question.id == question_input.id).first()
+        existing = await db.get(Question, question_input.id)
         if existing:
             raise HTTPException(status_code=400, detail={"success": False, "message": f"Question with ID {question_input.id} already exists", "data": None})
             
@@ -181,11 +305,13 @@ async def add_questions(question_input: QuestionCreate, db: Session = Depends(ge
         learn_content=question_input.learn_content,
         solution_code=question_input.solution_code,
         test_cases=question_input.test_cases,
-        function_name=question_input.function_name
+        function_name=question_input.function_name,
+        time_limit_ms=question_input.time_limit_ms,
+        memory_limit_mb=question_input.memory_limit_mb
     )
     db.add(question)
-    db.commit()
-    db.refresh(question)
+    await db.commit()
+    await db.refresh(question)
     
     return JSONResponse(
         status_code=200,
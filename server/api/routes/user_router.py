@@ -1,10 +1,12 @@
 
 from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, File
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from db import User, get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, select
+from db import User, get_db, get_async_db
 from fastapi.responses import JSONResponse
-from api.middlewares.verifyuser_middleware import verify_jwt
+from api.middlewares.verifyuser_middleware import verify_jwt, invalidate_user
+from api.helper import password_hasher, PasswordHasherBusyError
 import logging
 from api.models.user_model import CreateUser, UpdateUser, LoginUser
 from src.utils.cloudinary import upload_avatar_to_cloudinary, delete_avatar_from_cloudinary
@@ -53,12 +55,14 @@ TOKEN_OPTION = {
         }
     }
 )
-async def create_user(user: CreateUser, db: Session = Depends(get_db)):
+async def create_user(user: CreateUser, db: AsyncSession = Depends(get_async_db)):
     """
     Register a new user account in the system.
     """
     logging.info(f"Attempting to register new user: email={user.email}, username={user.username}")
-    existing_user = db.query(User).filter(or_(User.email == user.email, User.username == user.username)).first()
+    existing_user = (await db.execute(
+        select(User).where(or_(User.email == user.email, User.username == user.username))
+    )).scalars().first()
     if existing_user:
         if existing_user.email == user.email:
             logging.warning(f"Registration failed: email {user.email} is already taken")
@@ -66,16 +70,21 @@ async def create_user(user: CreateUser, db: Session = Depends(get_db)):
         logging.warning(f"Registration failed: username {user.username} is already taken")
         raise HTTPException(status_code=400, detail="username already taken")
 
-    db_user = User(fullName=user.fullName, email=user.email, username=user.username)
-    db_user.set_password(user.password)
+    try:
+        hashed_password = await password_hasher.hash(user.password)
+    except PasswordHasherBusyError:
+        logging.warning(f"Registration deferred for email={user.email}: password hashing queue is full")
+        raise HTTPException(status_code=503, detail={"success": False, "message": "Server is busy, please retry shortly", "data": None})
+
+    db_user = User(fullName=user.fullName, email=user.email, username=user.username, password=hashed_password)
     
     access_token = db_user.generate_access_token()
     refresh_token = db_user.generate_refresh_token()
     db_user.refreshToken = refresh_token
     
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
 
     logging.info(f"User registered successfully: id={db_user.id}, username={db_user.username}")
 
@@ -138,21 +147,35 @@ async def create_user(user: CreateUser, db: Session = Depends(get_db)):
         }
     }
 )
-async def login(user: LoginUser, db: Session = Depends(get_db)):
+async def login(user: LoginUser, db: AsyncSession = Depends(get_async_db)):
     """
     Log in an existing user and set session cookies.
     """
     logging.info(f"Attempting login for user: email={user.email}")
-    db_user = db.query(User).filter(or_(User.email == user.email)).first()
+    db_user = (await db.execute(select(User).where(User.email == user.email))).scalars().first()
 
-    if not db_user or not db_user.check_password(user.password):
+    try:
+        valid = db_user is not None and await password_hasher.verify(user.password, db_user.password)
+    except PasswordHasherBusyError:
+        logging.warning(f"Login deferred for email={user.email}: password hashing queue is full")
+        raise HTTPException(status_code=503, detail={"success": False, "message": "Server is busy, please retry shortly", "data": None})
+
+    if not valid:
         logging.warning(f"Login failed for email={user.email}: Invalid credentials")
         raise HTTPException(status_code=401, detail={"success": False, "message": "Invalid credentials", "data": None})
 
+    if password_hasher.needs_rehash(db_user.password):
+        # Upgrade hashes made with another cost factor while the plaintext is at hand
+        try:
+            db_user.password = await password_hasher.hash(user.password)
+            logging.info(f"Rehashed password for user: id={db_user.id} with cost {password_hasher.rounds}")
+        except PasswordHasherBusyError:
+            pass  # retried on the next login
+
     access_token = db_user.generate_access_token()
     refresh_token = db_user.generate_refresh_token()
     db_user.refreshToken = refresh_token
-    db.commit()
+    await db.commit()
 
     logging.info(f"User logged in successfully: id={db_user.id}, username={db_user.username}")
 
@@ -213,6 +236,7 @@ async def logout(request: Request, db: Session = Depends(get_db)):
     if db_user:
         db_user.refreshToken = None
         db.commit()
+    invalidate_user(user.id)
 
     logging.info(f"User logged out successfully from DB: id={user.id}")
 
@@ -336,6 +360,7 @@ async def update_user_data(request: Request, updated_user: UpdateUser, db: Sessi
         db_user.username = updated_user.username
 
     db.commit()
+    invalidate_user(db_user.id)
     db.refresh(db_user)     
     logging.info(f"User updated successfully: id={db_user.id}")
     
@@ -459,6 +484,7 @@ async def upload_avatar(request: Request, file: UploadFile = File(...), db: Sess
         # Update user record 
         user.avatar = avatar_url
         db.commit()
+        invalidate_user(user.id)
         db.refresh(user)
         
         user_data = {
@@ -528,6 +554,7 @@ async def delete_avatar(request: Request, db: Session = Depends(get_db)):
         # Set database field to None
         user.avatar = None
         db.commit()
+        invalidate_user(user.id)
         db.refresh(user)
         
         user_data = {
@@ -544,3 +571,45 @@ async def delete_avatar(request: Request, db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail={"success": False, "message": f"Failed to delete avatar: {str(e)}", "data": None})
 
 
+# ============================ Password Hashing Metrics ===========================
+@router.get(
+    "/password_hash/metrics",
+    dependencies=[Depends(verify_jwt)],
+    summary="Password hashing metrics",
+    description="Returns job counters plus queue wait and hashing time percentiles (in milliseconds) for the bcrypt thread pool used by registration and login, over a rolling window of recent jobs.",
+    responses={
+        200: {
+            "description": "Password hashing metrics fetched successfully.",
+            "content": {
+                "application/json": {
+                    "example": {
+                        "success": True,
+                        "message": "Password hashing metrics fetched",
+                        "data": {
+                            "rounds": 12,
+                            "workers": 2,
+                            "jobs": 48,
+                            "in_flight": 1,
+                            "errors": 0,
+                            "rejected": 0,
+                            "queue_wait_ms": {"avg": 3.1, "p50": 0.2, "p95": 18.4, "max": 240.7},
+                            "execution_ms": {"avg": 231.5, "p50": 228.9, "p95": 252.3, "max": 301.0}
+                        }
+                    }
+                }
+            }
+        }
+    }
+)
+async def get_password_hash_metrics():
+    """
+    Expose bcrypt thread pool queue wait and hashing time statistics.
+    """
+    return JSONResponse(
+        status_code=200,
+        content={
+            "success": True,
+            "message": "Password hashing metrics fetched",
+            "data": password_hasher.stats()
+        }
+    )
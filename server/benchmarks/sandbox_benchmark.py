@@ -0,0 +1,250 @@
+"""
+Throughput / latency benchmark for the code sandbox endpoints.
+
+Seeds a throw-away database from `problems.json`, then fires concurrent
+`run_code` / `submit_code` requests with each question's `solution_code`
+(and optionally its `starter_code`) through the FastAPI app in-process, so
+no server or network is needed. Reports latency percentiles, throughput,
+status codes, peak memory and the sandbox's own queue/execution metrics.
+
+Run from the `server` directory, e.g. to compare execution modes:
+
+    python benchmarks/sandbox_benchmark.py --mode subprocess --requests 200 --concurrency 16
+    python benchmarks/sandbox_benchmark.py --mode pool --requests 200 --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASE = "/api/v1/coding"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the coding sandbox endpoints")
+    parser.add_argument("--mode", choices=["pool", "subprocess"], default="pool", help="Sandbox execution mode (SANDBOX_MODE)")
+    parser.add_argument("--endpoint", choices=["run_code", "submit_code", "both"], default="both")
+    parser.add_argument("--requests", type=int, default=200, help="Total number of requests")
+    parser.add_argument("--concurrency", type=int, default=16, help="Requests in flight at once")
+    parser.add_argument("--warmup", type=int, default=8, help="Untimed requests sent first")
+    parser.add_argument("--questions", type=int, default=None, help="Only use the first N questions")
+    parser.add_argument("--starter-ratio", type=float, default=0.0, help="Share of requests sending starter_code instead of solution_code")
+    parser.add_argument("--pool-size", type=int, default=None, help="Override SANDBOX_POOL_SIZE")
+    parser.add_argument("--use-result-cache", action="store_true", help="Send identical code so repeated submissions hit the result cache")
+    parser.add_argument("--database-url", default=None, help="Database to seed (default: a temporary SQLite file)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", default=None, help="Also write the report to this file")
+    return parser.parse_args()
+
+
+def configure_environment(args) -> str:
+    """Settings are read when the app is imported, so this must run first."""
+    database_url = args.database_url
+    if database_url is None:
+        database_url = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="sandbox-bench-"), "bench.db")
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["SANDBOX_MODE"] = args.mode
+    if args.pool_size:
+        os.environ["SANDBOX_POOL_SIZE"] = str(args.pool_size)
+    os.chdir(SERVER_DIR)
+    sys.path.insert(0, SERVER_DIR)
+    return database_url
+
+
+def seed_database(limit=None):
+    """Loads problems.json into the questions table and creates a bench user."""
+    from db import engine, run_migrations, SessionLocal, Question, User
+    from api.helper.password_hasher import password_hasher, hash_password
+
+    run_migrations(engine)
+
+    with open(os.path.join(SERVER_DIR, "problems.json"), "r") as f:
+        problems = json.load(f)
+    problems = [p for p in problems if p.get("solution_code") and p.get("test_cases")]
+    if limit:
+        problems = problems[:limit]
+
+    db = SessionLocal()
+    try:
+        existing = {row.id for row in db.query(Question.id).all()}
+        for p in problems:
+            if p["id"] in existing:
+                continue
+            db.add(Question(
+                id=p["id"],
+                title=p.get("title"),
+                difficulty=p.get("difficulty"),
+                category=p.get("category"),
+                problem_description=p.get("problem_description"),
+                starter_code=p.get("starter_code"),
+                solution_code=p.get("solution_code"),
+                test_cases=p.get("test_cases"),
+                function_name=p.get("function_name"),
+            ))
+
+        user = db.query(User).filter(User.username == "sandbox_bench").first()
+        if not user:
+            user = User(
+                fullName="Sandbox Bench", email="sandbox_bench@example.com", username="sandbox_bench",
+                password=hash_password("sandbox_bench", password_hasher.rounds)
+            )
+            db.add(user)
+        db.commit()
+        token = user.generate_access_token()
+    finally:
+        db.close()
+    return problems, token
+
+
+def build_requests(args, problems):
+    rng = random.Random(args.seed)
+    endpoints = ["run_code", "submit_code"] if args.endpoint == "both" else [args.endpoint]
+    total = args.warmup + args.requests
+    planned = []
+    for i in range(total):
+        problem = rng.choice(problems)
+        use_starter = problem.get("starter_code") and rng.random() < args.starter_ratio
+        code = problem["starter_code"] if use_starter else problem["solution_code"]
+        if not args.use_result_cache:
+            # A distinct trailing comment defeats the verdict cache
+            code = f"{code}\n# bench request {i}"
+        planned.append((endpoints[i % len(endpoints)], {
+            "language": "python",
+            "code": code,
+            "question_id": problem["id"],
+        }))
+    return planned[:args.warmup], planned[args.warmup:]
+
+
+def percentile(ordered, pct):
+    if not ordered:
+        return 0.0
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb(who) -> float:
+    if resource is None:
+        return 0.0
+    peak = resource.getrusage(who).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+async def fire(client, planned, concurrency, headers):
+    semaphore = asyncio.Semaphore(concurrency)
+    samples = []
+
+    async def one(endpoint, body):
+        async with semaphore:
+            start = time.perf_counter()
+            resp = await client.post(f"{BASE}/{endpoint}", json=body, headers=headers)
+            samples.append((endpoint, resp.status_code, time.perf_counter() - start))
+
+    await asyncio.gather(*(one(endpoint, body) for endpoint, body in planned))
+    return samples
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(latency * 1000 for _, _, latency in samples)
+    return {
+        "requests": len(samples),
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "avg": round(sum(latencies) / len(latencies), 2) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "max": round(latencies[-1], 2) if latencies else 0.0,
+        },
+        "status_codes": dict(Counter(str(status) for _, status, _ in samples)),
+    }
+
+
+async def run_benchmark(args, problems, token):
+    import httpx
+    from api.app import app
+
+    headers = {"Authorization": f"Bearer {token}"}
+    warmup, measured = build_requests(args, problems)
+
+    # ASGITransport does not run the lifespan, which starts the worker pool
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            if warmup:
+                await fire(client, warmup, args.concurrency, headers)
+
+            start = time.perf_counter()
+            samples = await fire(client, measured, args.concurrency, headers)
+            elapsed = time.perf_counter() - start
+
+            sandbox = (await client.get(f"{BASE}/sandbox/metrics")).json()["data"]
+
+    report = {
+        "config": {
+            "mode": args.mode,
+            "endpoint": args.endpoint,
+            "concurrency": args.concurrency,
+            "questions": len(problems),
+            "result_cache": args.use_result_cache,
+        },
+        "overall": summarize(samples, elapsed),
+        "by_endpoint": {
+            endpoint: summarize([s for s in samples if s[0] == endpoint], elapsed)
+            for endpoint in sorted({s[0] for s in samples})
+        },
+        "sandbox": sandbox,
+    }
+    # Children are only accounted for once reaped, i.e. after pool shutdown
+    report["peak_rss_mb"] = {
+        "server": peak_rss_mb(resource.RUSAGE_SELF) if resource else 0.0,
+        "sandbox": peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else 0.0,
+    }
+    return report
+
+
+def print_report(report):
+    overall = report["overall"]
+    print(f"mode={report['config']['mode']} endpoint={report['config']['endpoint']} "
+          f"concurrency={report['config']['concurrency']} questions={report['config']['questions']}")
+    for name, section in [("overall", overall), *report["by_endpoint"].items()]:
+        lat = section["latency_ms"]
+        print(f"  {name:<12} n={section['requests']:<5} {section['throughput_rps']:>8} req/s  "
+              f"p50={lat['p50']}ms p95={lat['p95']}ms p99={lat['p99']}ms max={lat['max']}ms  "
+              f"status={section['status_codes']}")
+    sandbox = report["sandbox"]
+    print(f"  sandbox      queue_wait p95={sandbox['queue_wait_ms']['p95']}ms "
+          f"execution p95={sandbox['execution_ms']['p95']}ms timeouts={sandbox['timeouts']} "
+          f"rejected={sandbox['rejected']}")
+    print(f"  peak rss     server={report['peak_rss_mb']['server']}MB sandbox={report['peak_rss_mb']['sandbox']}MB")
+
+
+def main():
+    args = parse_args()
+    configure_environment(args)
+    problems, token = seed_database(args.questions)
+    if not problems:
+        sys.exit("No questions with solution_code and test_cases found in problems.json")
+
+    report = asyncio.run(run_benchmark(args, problems, token))
+    print_report(report)
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
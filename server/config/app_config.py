@@ -13,12 +13,63 @@ class AppConfig(BaseSettings):
 
     # ── Database ───────────────────────────────────────────────────
     database_url: str = "sqlite:///./interview_cracker.db"
+    async_database_url: Optional[str] = None  # defaults to database_url with its async driver (aiosqlite / asyncpg)
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+    database_pool_timeout_seconds: float = 30
+    database_pool_recycle_seconds: int = 3600
+    database_echo: bool = False
+    db_metrics_enabled: bool = True
+    db_slow_query_ms: float = 200
+    db_query_count_warning: int = 50  # requests issuing more queries are logged as likely N+1
 
     # ── Auth ───────────────────────────────────────────────────────
     secret_key: str = "your-secret-key-at-least-32-characters-long!!"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 60
     refresh_token_expire_days: int = 7
+    auth_user_cache_size: int = 4096
+    auth_user_cache_ttl_seconds: float = 30
+    password_hash_rounds: int = 12  # bcrypt cost; stored hashes with another cost are upgraded on login
+    password_hash_workers: int = 2
+    password_hash_queue_limit: int = 64
+
+    # ── Code Sandbox ───────────────────────────────────────────────
+    sandbox_mode: str = "pool"  # "pool" or "subprocess"
+    sandbox_pool_size: int = 4
+    sandbox_queue_limit: int = 32
+    sandbox_max_jobs_per_worker: int = 100
+    sandbox_timeout_seconds: float = 10
+    sandbox_cpu_seconds: Optional[int] = 10
+    sandbox_memory_limit_mb: Optional[int] = 2048  # address space; must exceed the preloaded libraries
+    sandbox_open_files: Optional[int] = 64
+    sandbox_max_processes: Optional[int] = 512  # RLIMIT_NPROC counts every process/thread of the server's user
+    sandbox_file_size_mb: Optional[int] = 1
+    sandbox_output_limit_kb: int = 1024
+    sandbox_preload_torch: bool = False
+    sandbox_submit_mode: str = "full"  # "full", "fail_fast" or "sharded"
+    sandbox_shard_size: int = 25  # minimum test cases per shard in "sharded" mode
+    sandbox_result_cache_size: int = 1024
+    sandbox_result_cache_ttl_seconds: float = 300
+    sandbox_batch_concurrency: Optional[int] = None  # submissions graded at once by the batch_grade route, defaults to a quarter of the pool
+    sandbox_batch_max_items: int = 500
+
+    # ── Question Catalogue ─────────────────────────────────────────
+    question_cache_size: int = 256
+    question_cache_ttl_seconds: float = 300  # bounds staleness across worker processes
+    question_page_max_limit: int = 500
+    question_search_backend: str = "auto"  # "auto", "fts5", "postgres" or "memory"
+    question_search_max_results: int = 50
+
+    # ── Multi RAG ──────────────────────────────────────────────────
+    rag_index_mode: str = "session"  # "session" (one index per chat thread) or "per_file"
+    rag_retriever_cache_size: int = 64  # chat threads whose loaded indexes and retrievers are kept
+    rag_retriever_cache_ttl_seconds: float = 1800
+    rag_retriever_cache_max_mb: int = 1024  # estimated from vector, text and image payload sizes
+    rag_ingest_workers: Optional[int] = None  # file conversion/partitioning processes, defaults to CPUs - 1
+    rag_ingest_worker_memory_mb: int = 2048  # peak RSS of one hi_res partitioning worker
+    rag_ingest_memory_budget_mb: Optional[int] = None  # defaults to half of physical memory
+    rag_embed_batch_size: int = 256
 
     # ── Cloudinary ─────────────────────────────────────────────────
     cloudinary_cloud_name: Optional[str] = None
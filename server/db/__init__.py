@@ -1,6 +1,7 @@
 from .schema.user_schema import User
 from .schema.template_schema import Template
-from .schema.coding_questions_schema import Coding
+from .schema.coding_questions_schema import Coding, UserSolvedQuestion, UserVisitedQuestion
 from .schema.interview_schema import Interview
-from .schema.question_schema import Question
-from .connection import Base, engine, get_db, SessionLocal
+from .schema.question_schema import Question, QuestionSeedFile
+from .connection import Base, engine, get_db, SessionLocal, async_engine, get_async_db, AsyncSessionLocal
+from .migrations import run_migrations
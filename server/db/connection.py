@@ -1,25 +1,59 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from config.app_config import app_config
 
 SQLALCHEMY_DATABASE_URL = app_config.database_url
 
-if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(
-        SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-    )
-else:
-    engine = create_engine(
-        SQLALCHEMY_DATABASE_URL,
-        pool_pre_ping=True,
-        pool_recycle=3600,
-        pool_size=5,
-        max_overflow=10
-    )
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgres": "postgresql+asyncpg",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Swaps the sync driver of `url` for its asyncio counterpart."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for '{backend}' databases")
+    parsed = parsed.set(drivername=ASYNC_DRIVERS[backend])
+    if "sslmode" in parsed.query:
+        # asyncpg spells libpq's sslmode as ssl
+        parsed = parsed.update_query_dict({"ssl": parsed.query["sslmode"]}).difference_update_query(["sslmode"])
+    return parsed.render_as_string(hide_password=False)
+
+
+def _engine_options(url: str) -> dict:
+    if url.startswith("sqlite"):
+        return {"connect_args": {"check_same_thread": False}, "echo": app_config.database_echo}
+    return {
+        "echo": app_config.database_echo,
+        "pool_pre_ping": True,
+        "pool_recycle": app_config.database_pool_recycle_seconds,
+        "pool_size": app_config.database_pool_size,
+        "max_overflow": app_config.database_max_overflow,
+        "pool_timeout": app_config.database_pool_timeout_seconds,
+    }
+
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **_engine_options(SQLALCHEMY_DATABASE_URL))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+ASYNC_DATABASE_URL = app_config.async_database_url or to_async_url(SQLALCHEMY_DATABASE_URL)
+
+# Shares the database (and the pool settings) with `engine`, but queries are
+# awaited instead of blocking the event loop
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options(ASYNC_DATABASE_URL))
+
+# Objects stay readable after commit, since an expired attribute cannot be
+# lazily refreshed outside an await
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 def get_db():
@@ -28,3 +62,7 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
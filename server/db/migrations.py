@@ -0,0 +1,178 @@
+import os
+import logging
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from .connection import Base
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# pg_advisory_lock key shared by every server process migrating the same database
+MIGRATION_LOCK_KEY = 0x1C0D1
+
+
+def add_missing_columns(engine: Engine):
+    """
+    `Base.metadata.create_all` never alters tables that already exist, so
+    nullable columns added to a model later are appended here with
+    ALTER TABLE ... ADD COLUMN.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    preparer = engine.dialect.identifier_preparer
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_columns = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                if not column.nullable:
+                    logging.warning(f"Cannot auto-add NOT NULL column {table.name}.{column.name}, skipping")
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                logging.info(f"Adding missing column {table.name}.{column.name} ({column_type})")
+                conn.execute(text(
+                    f"ALTER TABLE {preparer.quote(table.name)} "
+                    f"ADD COLUMN {preparer.quote(column.name)} {column_type}"
+                ))
+
+
+LEGACY_CODING_ARRAYS = ("recently_solved", "recently_visited", "all_questions_solved")
+
+
+def migrate_coding_arrays(engine: Engine):
+    """
+    Moves the legacy `coding` ARRAY columns into the `user_solved_questions`
+    and `user_visited_questions` event tables, recomputes the difficulty
+    counters, then drops the arrays. Runs in one transaction and only while
+    any of the array columns still exist.
+    """
+    inspector = inspect(engine)
+    if "coding" not in inspector.get_table_names():
+        return
+    legacy = [c["name"] for c in inspector.get_columns("coding") if c["name"] in LEGACY_CODING_ARRAYS]
+    if not legacy:
+        return
+
+    now = datetime.now(timezone.utc)
+    with engine.begin() as conn:
+        question_ids = {row.id for row in conn.execute(text("SELECT id FROM questions"))}
+        solved = {(row.user_id, row.question_id) for row in conn.execute(text("SELECT user_id, question_id FROM user_solved_questions"))}
+        visited = {(row.user_id, row.question_id) for row in conn.execute(text("SELECT user_id, question_id FROM user_visited_questions"))}
+
+        select_arrays = ", ".join(legacy)
+        solved_rows, visited_rows = [], []
+        for row in conn.execute(text(f"SELECT user_id, {select_arrays} FROM coding WHERE user_id IS NOT NULL")):
+            arrays = row._mapping
+            # recently_solved is newest first; the remaining solves are older,
+            # in the order they were appended to all_questions_solved
+            ordered = list(arrays.get("recently_solved") or [])
+            ordered += list(reversed(arrays.get("all_questions_solved") or []))
+            for position, question_id in enumerate(dict.fromkeys(ordered)):
+                key = (row.user_id, question_id)
+                if question_id in question_ids and key not in solved:
+                    solved.add(key)
+                    solved_rows.append({"user_id": row.user_id, "question_id": question_id, "at": now - timedelta(seconds=position)})
+            for position, question_id in enumerate(dict.fromkeys(arrays.get("recently_visited") or [])):
+                key = (row.user_id, question_id)
+                if question_id in question_ids and key not in visited:
+                    visited.add(key)
+                    visited_rows.append({"user_id": row.user_id, "question_id": question_id, "at": now - timedelta(seconds=position)})
+
+        logging.info(f"Migrating coding arrays: {len(solved_rows)} solves, {len(visited_rows)} visits")
+        if solved_rows:
+            conn.execute(
+                text("INSERT INTO user_solved_questions (user_id, question_id, solved_at) VALUES (:user_id, :question_id, :at)"),
+                solved_rows
+            )
+        if visited_rows:
+            conn.execute(
+                text("INSERT INTO user_visited_questions (user_id, question_id, visited_at) VALUES (:user_id, :question_id, :at)"),
+                visited_rows
+            )
+        for difficulty in ("easy", "medium", "hard"):
+            conn.execute(
+                text(
+                    f"UPDATE coding SET {difficulty} = ("
+                    "SELECT COUNT(*) FROM user_solved_questions s JOIN questions q ON q.id = s.question_id "
+                    "WHERE s.user_id = coding.user_id AND q.difficulty = :difficulty)"
+                ),
+                {"difficulty": difficulty}
+            )
+        for column in legacy:
+            logging.info(f"Dropping legacy column coding.{column}")
+            conn.execute(text(f"ALTER TABLE coding DROP COLUMN {column}"))
+
+
+def create_missing_indexes(engine: Engine):
+    """Creates model indexes that `create_all` skipped because the table already existed."""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    logging.info(f"Creating missing index {index.name}")
+                    index.create(conn)
+
+
+def backfill_question_keys(engine: Engine):
+    """Fills the normalized category/difficulty columns for rows written before they existed."""
+    with engine.begin() as conn:
+        conn.execute(text(
+            "UPDATE questions SET category_key = lower(trim(category)), difficulty_key = lower(trim(difficulty)) "
+            "WHERE category_key IS NULL OR difficulty_key IS NULL"
+        ))
+
+
+@contextmanager
+def migration_lock(engine: Engine):
+    """
+    Serializes migrations between server processes starting at the same time
+    (e.g. several uvicorn workers). PostgreSQL gets a session advisory lock
+    on a dedicated connection, a SQLite file database an exclusive flock on
+    a `.migrate.lock` file next to it. Every step re-inspects the schema
+    once it holds the lock, so the processes that waited find nothing to do.
+    """
+    backend = engine.url.get_backend_name()
+    if backend == "postgresql":
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+    elif backend == "sqlite" and fcntl is not None and engine.url.database not in (None, "", ":memory:"):
+        with open(os.path.abspath(engine.url.database) + ".migrate.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+    else:
+        yield
+
+
+def run_migrations(engine: Engine):
+    """Creates missing tables, then brings existing ones up to date. Safe to run from several processes at once."""
+    with migration_lock(engine):
+        Base.metadata.create_all(bind=engine)
+        _run_steps(engine)
+
+
+def _run_steps(engine: Engine):
+    add_missing_columns(engine)
+    create_missing_indexes(engine)
+    backfill_question_keys(engine)
+    migrate_coding_arrays(engine)
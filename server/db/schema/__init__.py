@@ -1,5 +1,5 @@
 from .user_schema import User
 from .template_schema import Template
-from .coding_questions_schema import Coding
+from .coding_questions_schema import Coding, UserSolvedQuestion, UserVisitedQuestion
 from .interview_schema import Interview
-from .question_schema import Question
+from .question_schema import Question, QuestionSeedFile
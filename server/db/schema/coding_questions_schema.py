@@ -1,18 +1,41 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, ARRAY
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
-from typing import List
+from sqlalchemy.sql import func
 from ..connection import Base
 
 class Coding(Base):
     __tablename__ = "coding"
 
     id = Column(Integer, primary_key=True, index=True)
-    recently_solved: List[int] = Column(ARRAY(Integer), default=[])
-    recently_visited: List[int] = Column(ARRAY(Integer), default=[])
-    all_questions_solved: List[int] = Column(ARRAY(Integer), default=[])
     easy:int = Column(Integer, default=0)
     medium:int= Column(Integer, default=0)
     hard:int = Column(Integer, default=0)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
 
 
+class UserSolvedQuestion(Base):
+    """One row per (user, question) the user has solved; the unique constraint dedupes solves."""
+    __tablename__ = "user_solved_questions"
+    __table_args__ = (
+        UniqueConstraint("user_id", "question_id", name="uq_user_solved_question"),
+        Index("ix_user_solved_questions_user_solved_at", "user_id", "solved_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), nullable=False)
+    solved_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class UserVisitedQuestion(Base):
+    """Latest visit per (user, question); revisits move `visited_at` forward."""
+    __tablename__ = "user_visited_questions"
+    __table_args__ = (
+        UniqueConstraint("user_id", "question_id", name="uq_user_visited_question"),
+        Index("ix_user_visited_questions_user_visited_at", "user_id", "visited_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), nullable=False)
+    visited_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
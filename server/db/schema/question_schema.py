@@ -1,6 +1,13 @@
-from sqlalchemy import Column, Integer, String, Text, JSON
+from sqlalchemy import Column, Integer, String, Text, JSON, DateTime, event
+from sqlalchemy.sql import func
 from ..connection import Base
 
+
+def normalize_key(value):
+    """Lower-cased, trimmed form used by the indexed filter columns."""
+    return value.strip().lower() if isinstance(value, str) else value
+
+
 class Question(Base):
     __tablename__ = "questions"
 
@@ -17,3 +24,25 @@ class Question(Base):
     solution_code = Column(Text)
     test_cases = Column(JSON)
     function_name = Column(String)
+    time_limit_ms = Column(Integer, nullable=True)
+    memory_limit_mb = Column(Integer, nullable=True)
+    # Normalized copies of category/difficulty so filters can use an index
+    category_key = Column(String, index=True, nullable=True)
+    difficulty_key = Column(String, index=True, nullable=True)
+
+
+class QuestionSeedFile(Base):
+    """Content hash of each seed file last loaded by /fit_questions."""
+    __tablename__ = "question_seed_files"
+
+    name = Column(String, primary_key=True)
+    content_hash = Column(String, nullable=False)
+    questions = Column(Integer, nullable=False, default=0)
+    seeded_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+
+@event.listens_for(Question, "before_insert")
+@event.listens_for(Question, "before_update")
+def _normalize_keys(mapper, connection, target):
+    target.category_key = normalize_key(target.category)
+    target.difficulty_key = normalize_key(target.difficulty)
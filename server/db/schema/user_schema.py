@@ -2,7 +2,6 @@ from sqlalchemy import Column, Integer, String, DateTime, JSON, ForeignKey, Tabl
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from ..connection import Base
-import bcrypt
 import jwt
 import os
 from datetime import datetime, timedelta
@@ -30,18 +29,13 @@ class User(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
-    def set_password(self, password):
-        self.password = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-
-    def check_password(self, password):
-        return bcrypt.checkpw(password.encode('utf-8'), self.password.encode('utf-8'))
-
     def generate_access_token(self):
         payload = {
             "id": self.id,
             "email": self.email,
             "username": self.username,
             "fullName": self.fullName,
+            "iat": datetime.utcnow(),
             "exp": datetime.utcnow() + timedelta(minutes=app_config.access_token_expire_minutes)
         }
         return jwt.encode(payload, app_config.secret_key, algorithm=app_config.algorithm)
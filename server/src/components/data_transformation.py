@@ -15,19 +15,24 @@ class DataTransformation:
         self.retreiver = Retreiver(retreiver_config=retreiver_config)
 
     @asyncHandler
-    async def initiate_data_transformation(self) -> DataTransformationArtifact:
-        logging.info("Initiating data transformation...")
-        
+    async def extract_documents(self):
         elements = await self.retreiver.partition_document(
             self.data_ingestion_artifact.ingested_file_path
         )
         
         chunks = await self.retreiver.create_chunks_by_title(elements)
         
-        documents = await self.retreiver.get_documents(
+        return await self.retreiver.get_documents(
             chunks, 
-            ingested_file_path=self.data_ingestion_artifact.ingested_file_path
+            ingested_file_path=self.data_ingestion_artifact.ingested_file_path,
+            file_name=self.data_transformation_config.file_name
         )
+
+    @asyncHandler
+    async def initiate_data_transformation(self) -> DataTransformationArtifact:
+        logging.info("Initiating data transformation...")
+        
+        documents = await self.extract_documents()
         
         vector_store_path = await self.retreiver.save_to_vector_store(documents)
         
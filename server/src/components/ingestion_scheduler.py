@@ -0,0 +1,86 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, List, Optional
+from config.app_config import app_config
+from src.entity.config_entity import DataIngestionConfig, DataTransformationConfig
+from src.entity.artifact_entity import DataIngestionArtifact
+
+
+def physical_memory_mb() -> Optional[int]:
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES") // (1024 * 1024)
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def ingest_worker_count(files: int) -> int:
+    """Worker processes for `files` files within the configured CPU and memory limits."""
+    workers = app_config.rag_ingest_workers or max(1, (os.cpu_count() or 2) - 1)
+    budget_mb = app_config.rag_ingest_memory_budget_mb
+    if budget_mb is None:
+        total_mb = physical_memory_mb()
+        budget_mb = total_mb // 2 if total_mb else None
+    if budget_mb is not None:
+        workers = min(workers, budget_mb // app_config.rag_ingest_worker_memory_mb)
+    return max(1, min(workers, files))
+
+
+# Run inside the worker processes. The components are async but do blocking
+# work, so each call gets its own short-lived event loop.
+def ingest_file(config: DataIngestionConfig) -> DataIngestionArtifact:
+    from src.components.data_ingestion import DataIngestion
+    return asyncio.run(DataIngestion(data_ingestion_config=config).ingest_data())
+
+
+def extract_file_documents(config: DataTransformationConfig, ingestion_artifact: DataIngestionArtifact) -> list:
+    from src.components.data_transformation import DataTransformation
+    data_transformation = DataTransformation(data_transformation_config=config, data_ingestion_artifact=ingestion_artifact)
+    return asyncio.run(data_transformation.extract_documents())
+
+
+class IngestionScheduler:
+    """
+    Process pool for the CPU-heavy, per-file ingestion steps (office/image to
+    pdf conversion, hi_res partitioning and chunking), so several files are
+    processed at once without blocking the event loop.
+
+    Sized by `ingest_worker_count`. Workers are spawned (forking a process
+    that holds torch and an event loop is unsafe) and only live for one
+    ingest, which hands their partitioning memory back to the OS. A single
+    file gains nothing from a pool, so it is processed inline on a thread
+    instead of paying for a spawned interpreter.
+    """
+
+    def __init__(self, files: int):
+        self.workers = ingest_worker_count(files)
+        self.inline = files <= 1
+        self._executor = None
+
+    async def __aenter__(self) -> "IngestionScheduler":
+        if self.inline:
+            logging.info("Processing a single file inline, without an ingestion pool")
+            return self
+        logging.info(f"Starting ingestion pool with {self.workers} workers")
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        if self._executor is not None:
+            await asyncio.to_thread(self._executor.shutdown, wait=True, cancel_futures=True)
+            self._executor = None
+
+    def submit(self, fn: Callable, *args) -> "asyncio.Future[Any]":
+        if self._executor is None:
+            # Off the event loop: the steps block and run their own loop
+            return asyncio.ensure_future(asyncio.to_thread(fn, *args))
+        return asyncio.wrap_future(self._executor.submit(fn, *args))
+
+    async def map(self, fn: Callable, *iterables) -> List[Any]:
+        """fn(*item) for every item of the zipped iterables, concurrently, in order."""
+        return await asyncio.gather(*(self.submit(fn, *args) for args in zip(*iterables)))
@@ -76,6 +76,8 @@ PUBLIC_TEMP_DIR = os.path.join("public", "temp")
 # ===================== MUlti Rag ==============
 INGESTION_FOLDER_NAME = "ingestion"
 TRANSFORMATION_FOLDER_NAME="transformation"
+SESSION_INDEX_FOLDER_NAME = "session"
+INGESTION_MANIFEST_FILE_NAME = "manifest.json"
 EMBEDDING_MODEL = "sentence-transformers/all-MiniLM-L6-v2"
 LLM_MODEL_ID = "llama-3.3-70b-versatile"
 LLM_REGION = "us-east-1"
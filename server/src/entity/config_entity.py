@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import List
+from typing import List, Optional
 from src.constants import *
 
 import uuid
@@ -106,6 +106,7 @@ class ContentEmbedderConfig:
 @dataclass
 class DataTransformationConfig:
     vector_store_path: str = field(default=None)
+    file_name: str = field(default=None)  # uploaded file name, stored on every chunk for source filtering
 
     def __post_init__(self):
         if self.vector_store_path is None:
@@ -114,6 +115,7 @@ class DataTransformationConfig:
 @dataclass
 class ContentTransformationConfig:
     data_transformation_configs: List[DataTransformationConfig]
+    session_vector_store_path: Optional[str] = None  # set to index every file into this one store
 
 
 @dataclass
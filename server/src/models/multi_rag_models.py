@@ -1,4 +1,4 @@
-from typing import Any, List, Literal
+from typing import Any, List, Literal, Optional
 
 from langgraph.graph.message import MessagesState
 from pydantic import BaseModel
@@ -7,6 +7,8 @@ from pydantic import BaseModel
 class State(MessagesState):
     vector_store_file_paths: List[str]
 
+    sources: Optional[List[str]]
+
     require_db_search: bool
 
     queries: List[str]
@@ -3,6 +3,7 @@ import asyncio
 import logging
 
 from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
 
 from src.llm.llm_loader import llm
 from src.tools import WebSearch
@@ -75,22 +76,23 @@ async def query_generation_node(state: State) -> dict:
 
 
 @asyncHandler
-async def retreiver_node(state: State) -> dict:
+async def retreiver_node(state: State, config: RunnableConfig) -> dict:
     logging.info("Retriever node started")
 
-    config = RetreiverConfig()
-    retriever_obj = Retreiver(retreiver_config=config)
+    retriever_obj = Retreiver(retreiver_config=RetreiverConfig())
+    thread_id = config.get("configurable", {}).get("thread_id")
 
     paths = state.get("vector_store_file_paths", [])
 
     if not paths and state.get("vector_store_file_path"):
         paths = [state["vector_store_file_path"]]
 
-    retriever_chain = await retriever_obj.merge_vector_stores(
-        vector_store_paths=paths
+    hybrid_retriever = await retriever_obj.get_hybrid_retriever(
+        vector_store_paths=paths,
+        thread_id=thread_id
     )
 
-    if not retriever_chain:
+    if not hybrid_retriever:
         logging.warning("No retriever chain available")
         return {"retreived_results": []}
 
@@ -100,12 +102,12 @@ async def retreiver_node(state: State) -> dict:
         logging.warning("No queries available for retrieval")
         return {"retreived_results": []}
 
-    tasks = [
-        retriever_chain.ainvoke(query)
-        for query in queries
-    ]
-
-    results_list = await asyncio.gather(*tasks)
+    # One embedding batch and one FAISS search per store for all queries
+    results_list = await asyncio.to_thread(
+        hybrid_retriever.search,
+        queries,
+        state.get("sources")
+    )
 
     results = []
     seen_contents = set()
@@ -1,36 +1,42 @@
 
 
 
-from src.components.data_transformation import DataTransformation
-from src.entity.config_entity import ContentTransformationConfig
+from src.components.ingestion_scheduler import IngestionScheduler, ingest_file, extract_file_documents
+from src.entity.config_entity import ContentTransformationConfig, RetreiverConfig
+from src.retrievers.create_retreivers import Retreiver, embed_documents
 from src.entity.artifact_entity import ContentTransformedArtifact, ContentEmbedderArtifact, DataTransformationArtifact
 from src.utils.asyncHandler import asyncHandler
 import logging
 
 
-from src.components.data_ingestion import DataIngestion
 from src.entity.config_entity import ContentEmbedderConfig
 from src.entity.artifact_entity import ContentEmbedderArtifact, DataIngestionArtifact
 from src.utils.asyncHandler import asyncHandler
 import logging
+import asyncio
 import os
+import shutil
+from typing import Optional
 
-from src.constants import ARTIFACT_DIR
+from config.app_config import app_config
+
+from src.constants import ARTIFACT_DIR, TRANSFORMATION_FOLDER_NAME, INGESTION_MANIFEST_FILE_NAME
+from src.utils.ingestion_manifest import IngestionManifest, file_hash
 class DataIngestionPipeline:
-    def __init__(self, content_embedder_config: ContentEmbedderConfig):
+    def __init__(self, content_embedder_config: ContentEmbedderConfig, scheduler: Optional[IngestionScheduler] = None):
         self.content_embedder_config = content_embedder_config
+        self.scheduler = scheduler
 
     @asyncHandler
     async def run_pipeline(self) -> ContentEmbedderArtifact:
         logging.info("Starting Data Ingestion Pipeline...")
-        data_ingestion_artifacts = []
+        configs = self.content_embedder_config.data_ingestion_configs
 
-        for config in self.content_embedder_config.data_ingestion_configs:
-            logging.info(f"Processing ingestion for: {config.input_file_path}")
-            data_ingestion = DataIngestion(data_ingestion_config=config)
-            artifact = await data_ingestion.ingest_data()
-            data_ingestion_artifacts.append(artifact)
-            logging.info(f"Ingestion completed for: {config.input_file_path}")
+        if self.scheduler is None:
+            async with IngestionScheduler(len(configs)) as scheduler:
+                data_ingestion_artifacts = await scheduler.map(ingest_file, configs)
+        else:
+            data_ingestion_artifacts = await self.scheduler.map(ingest_file, configs)
 
         logging.info("Data Ingestion Pipeline completed.")
         return ContentEmbedderArtifact(data_ingestion_artifacts=data_ingestion_artifacts)
@@ -38,27 +44,48 @@ class DataIngestionPipeline:
 
 
 class DataTransformationPipeline:
-    def __init__(self, content_transformation_config: ContentTransformationConfig, content_embedder_artifact: ContentEmbedderArtifact):
+    """
+    Partitions and chunks every file in the scheduler's worker processes, then
+    embeds all chunks in one batched pass before writing the vector stores.
+    """
+
+    def __init__(self, content_transformation_config: ContentTransformationConfig, content_embedder_artifact: ContentEmbedderArtifact, scheduler: Optional[IngestionScheduler] = None):
         self.content_transformation_config = content_transformation_config
         self.content_embedder_artifact = content_embedder_artifact
+        self.scheduler = scheduler
 
     @asyncHandler
     async def run_pipeline(self) -> ContentTransformedArtifact:
         logging.info("Starting Data Transformation Pipeline...")
-        data_transformation_artifacts = []
-
-        for config, ingestion_artifact in zip(
-            self.content_transformation_config.data_transformation_configs,
-            self.content_embedder_artifact.data_ingestion_artifacts
-        ):
-            logging.info(f"Transforming artifact: {ingestion_artifact.ingested_file_path}")
-            data_transformation = DataTransformation(
-                data_transformation_config=config,
-                data_ingestion_artifact=ingestion_artifact
-            )
-            artifact = await data_transformation.initiate_data_transformation()
-            data_transformation_artifacts.append(artifact)
-            logging.info(f"Transformation completed for: {ingestion_artifact.ingested_file_path}")
+        if self.scheduler is None:
+            async with IngestionScheduler(len(self.content_transformation_config.data_transformation_configs)) as scheduler:
+                return await self._run(scheduler)
+        return await self._run(self.scheduler)
+
+    async def _run(self, scheduler: IngestionScheduler) -> ContentTransformedArtifact:
+        configs = self.content_transformation_config.data_transformation_configs
+        ingestion_artifacts = self.content_embedder_artifact.data_ingestion_artifacts
+        documents_per_file = await scheduler.map(extract_file_documents, configs, ingestion_artifacts)
+
+        documents = [doc for file_documents in documents_per_file for doc in file_documents]
+        logging.info(f"Embedding {len(documents)} chunks from {len(configs)} files")
+        embeddings = await asyncio.to_thread(embed_documents, documents, app_config.rag_embed_batch_size)
+
+        session_path = self.content_transformation_config.session_vector_store_path
+        if session_path:
+            retreiver = Retreiver(retreiver_config=RetreiverConfig(vector_store_path=session_path))
+            vector_store_path = await retreiver.add_to_vector_store(documents, embeddings)
+            data_transformation_artifacts = [DataTransformationArtifact(vector_store_path=vector_store_path)] if vector_store_path else []
+        else:
+            data_transformation_artifacts = []
+            offset = 0
+            for config, file_documents in zip(configs, documents_per_file):
+                retreiver = Retreiver(retreiver_config=RetreiverConfig(vector_store_path=config.vector_store_path))
+                vector_store_path = await retreiver.save_to_vector_store(
+                    file_documents, embeddings[offset:offset + len(file_documents)]
+                )
+                offset += len(file_documents)
+                data_transformation_artifacts.append(DataTransformationArtifact(vector_store_path=vector_store_path))
 
         logging.info("Data Transformation Pipeline completed.")
         return ContentTransformedArtifact(data_transformation_artifacts=data_transformation_artifacts)
@@ -74,29 +101,81 @@ class VectiorizerPipeline:
 
     @asyncHandler
     async def initiate(self,thread_id:str=None)->ContentTransformedArtifact:
-        """Ingest Files"""
-        if os.path.exists(os.path.join(ARTIFACT_DIR,thread_id)):
-            logging.info(f"Vector store already exists for thread {thread_id} skipping ingestion and transformation")
-            artifacts = []
-            for config in self.content_transformation_config.data_transformation_configs:
-                artifacts.append(DataTransformationArtifact(vector_store_path=config.vector_store_path))
-            return ContentTransformedArtifact(data_transformation_artifacts=artifacts)
-
-        data_ingestion_pipeline=DataIngestionPipeline(self.content_embedder_config)
-
-        logging.info("Running data ingestion pipeline")
-        content_embedder_artifact=await data_ingestion_pipeline.run_pipeline()
-        data_transformation_pipeline=DataTransformationPipeline(self.content_transformation_config,content_embedder_artifact)
-
-        logging.info("Running data transformation pipeline")
-        content_transformed_artifact=await data_transformation_pipeline.run_pipeline()
-        
-        return content_transformed_artifact
-
-
-
-
-
-
+        """
+        Ingests the files that are new or changed since the thread's last
+        ingest and merges them into its index. Chunks of changed or removed
+        files are dropped first, unchanged files are not touched.
+        """
+        manifest_path = os.path.join(ARTIFACT_DIR, thread_id, INGESTION_MANIFEST_FILE_NAME)
+        manifest = IngestionManifest.load(manifest_path)
+        if manifest is None:
+            # First ingest, or one made before manifests existed: start clean
+            shutil.rmtree(os.path.join(ARTIFACT_DIR, thread_id, TRANSFORMATION_FOLDER_NAME), ignore_errors=True)
+            manifest = IngestionManifest(manifest_path)
+
+        session_path = self.content_transformation_config.session_vector_store_path
+        file_names = []
+        pending = []
+        for ingestion_config, transformation_config in zip(
+            self.content_embedder_config.data_ingestion_configs,
+            self.content_transformation_config.data_transformation_configs
+        ):
+            file_name = transformation_config.file_name or os.path.basename(ingestion_config.input_file_path)
+            content_hash = await asyncio.to_thread(file_hash, ingestion_config.input_file_path)
+            target_path = session_path or transformation_config.vector_store_path
+            file_names.append(file_name)
+            entry = manifest.files.get(file_name)
+            # A new target means the index mode changed since the last ingest
+            if not manifest.is_current(file_name, content_hash) or entry["vector_store_path"] != target_path:
+                pending.append((file_name, content_hash, target_path, ingestion_config, transformation_config))
+
+        stale = manifest.removed(file_names) + [file_name for file_name, *_ in pending if file_name in manifest.files]
+        if not pending and not stale:
+            logging.info(f"All files of thread {thread_id} are already ingested, skipping ingestion and transformation")
+            return self.indexed_artifacts(manifest)
+
+        if stale:
+            await self.drop_files(manifest, stale)
+
+        if pending:
+            logging.info(f"Ingesting {len(pending)} new or changed files for thread {thread_id}")
+            async with IngestionScheduler(len(pending)) as scheduler:
+                data_ingestion_pipeline=DataIngestionPipeline(ContentEmbedderConfig(
+                    data_ingestion_configs=[ingestion_config for *_, ingestion_config, _ in pending]
+                ),scheduler)
+
+                logging.info("Running data ingestion pipeline")
+                content_embedder_artifact=await data_ingestion_pipeline.run_pipeline()
+                data_transformation_pipeline=DataTransformationPipeline(ContentTransformationConfig(
+                    data_transformation_configs=[transformation_config for *_, transformation_config in pending],
+                    session_vector_store_path=session_path
+                ),content_embedder_artifact,scheduler)
+
+                logging.info("Running data transformation pipeline")
+                await data_transformation_pipeline.run_pipeline()
+
+            for file_name, content_hash, target_path, ingestion_config, _ in pending:
+                manifest.record(file_name, content_hash, ingestion_config.save_file_path, target_path)
+
+        manifest.save()
+        return self.indexed_artifacts(manifest)
 
-        
\ No newline at end of file
+    @asyncHandler
+    async def drop_files(self, manifest: IngestionManifest, file_names: list):
+        """Removes the chunks of `file_names` from wherever the manifest says they were indexed."""
+        by_store = {}
+        for file_name in file_names:
+            entry = manifest.forget(file_name)
+            if entry:
+                by_store.setdefault(entry["vector_store_path"], []).append(file_name)
+
+        for vector_store_path, names in by_store.items():
+            if vector_store_path:
+                retreiver = Retreiver(retreiver_config=RetreiverConfig(vector_store_path=vector_store_path))
+                await retreiver.remove_from_vector_store(names)
+
+    def indexed_artifacts(self, manifest: IngestionManifest) -> ContentTransformedArtifact:
+        vector_store_paths = dict.fromkeys(entry["vector_store_path"] for entry in manifest.files.values())
+        return ContentTransformedArtifact(data_transformation_artifacts=[
+            DataTransformationArtifact(vector_store_path=path) for path in vector_store_paths if path
+        ])
@@ -1,6 +1,11 @@
 import os
+import shutil
+import asyncio
 import logging
-from typing import List
+from functools import lru_cache
+from typing import List, Optional, Tuple
+import numpy as np
+import faiss
 from langchain_community.vectorstores import FAISS
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_huggingface import HuggingFaceEmbeddings
@@ -14,12 +19,231 @@ from unstructured.partition.pdf import partition_pdf
 from unstructured.chunking.title import chunk_by_title
 from langchain_core.documents import Document
 from src.entity.config_entity import RetreiverConfig
+from src.utils.cache_utils import LRUCache
+from config.app_config import app_config
 
 class CompatibleEmbeddings(HuggingFaceEmbeddings):
     def __call__(self, text: str):
         return self.embed_query(text)
 
-embedding_model = CompatibleEmbeddings(model=EMBEDDING_MODEL)
+@lru_cache(maxsize=None)
+def get_embedding_model() -> CompatibleEmbeddings:
+    # Loaded on first use, so ingestion worker processes that only partition never load it
+    return CompatibleEmbeddings(model=EMBEDDING_MODEL)
+
+FAISS_INDEX_FILES = ("index.faiss", "index.pkl")
+
+# (thread_id, vector store signature, k) -> (HybridRetriever, approximate size in bytes).
+# The signature changes whenever a store is re-saved, so a re-ingested thread
+# never gets a retriever built from the old files.
+retriever_cache = LRUCache(
+    maxsize=app_config.rag_retriever_cache_size,
+    ttl=app_config.rag_retriever_cache_ttl_seconds,
+    max_weight=app_config.rag_retriever_cache_max_mb * 1024 * 1024,
+    weigher=lambda entry: entry[1]
+)
+
+
+def vector_store_signature(vector_store_paths: List[str]) -> tuple:
+    """((path, mtime_ns), ...) of every saved FAISS store among `vector_store_paths`."""
+    signature = []
+    for path in sorted(vector_store_paths):
+        files = [os.path.join(path, name) for name in FAISS_INDEX_FILES]
+        if all(os.path.exists(file) for file in files):
+            signature.append((path, max(os.stat(file).st_mtime_ns for file in files)))
+    return tuple(signature)
+
+
+def invalidate_thread_retrievers(thread_id: str) -> int:
+    return retriever_cache.invalidate(lambda key: key[0] == thread_id)
+
+
+def vector_store_size(vectorstore) -> int:
+    """Rough resident size of a loaded store plus the BM25 index built on it."""
+    size = vectorstore.index.ntotal * vectorstore.index.d * 4
+    for doc in vectorstore.docstore._dict.values():
+        # BM25 keeps its own tokenized copy of the text
+        size += 3 * len(doc.page_content or "")
+        size += sum(len(image) for image in doc.metadata.get("images", []))
+        size += sum(len(table) for table in doc.metadata.get("tables", []))
+    return size
+
+
+@lru_cache(maxsize=None)
+def get_reranker(top_n: int) -> FlashrankRerank:
+    # Loading the ranking model is the slow part; the compressor itself is stateless
+    return FlashrankRerank(top_n=top_n)
+
+
+def load_vector_store(path: str) -> FAISS:
+    return FAISS.load_local(path, get_embedding_model(), allow_dangerous_deserialization=True)
+
+
+def embed_documents(documents: List[Document], batch_size: int) -> List[List[float]]:
+    """Embeds the page content of `documents`, `batch_size` chunks per model call. Blocking."""
+    texts = [doc.page_content for doc in documents]
+    embeddings = []
+    for start in range(0, len(texts), batch_size):
+        embeddings.extend(get_embedding_model().embed_documents(texts[start:start + batch_size]))
+    return embeddings
+
+
+def build_vector_store(documents: List[Document], embeddings: Optional[List[List[float]]] = None, ids: Optional[List[str]] = None) -> FAISS:
+    """New FAISS store of `documents`, reusing precomputed `embeddings` when given."""
+    if embeddings is None:
+        return FAISS.from_documents(documents, get_embedding_model(), ids=ids)
+    return FAISS.from_embeddings(
+        list(zip([doc.page_content for doc in documents], embeddings)),
+        get_embedding_model(),
+        metadatas=[doc.metadata for doc in documents],
+        ids=ids
+    )
+
+
+def document_file_name(doc: Document) -> str:
+    """Uploaded file a chunk came from. Older chunks only carry the ingested pdf path."""
+    file_name = doc.metadata.get("file_name")
+    if file_name:
+        return file_name
+    return os.path.basename(doc.metadata.get("source", "")).removesuffix(".pdf")
+
+
+def chunk_ids(documents: List[Document]) -> List[str]:
+    """Stable "<file_name>#<n>" docstore ids, so one file's chunks can be found in a shared index."""
+    counts = {}
+    ids = []
+    for doc in documents:
+        file_name = document_file_name(doc)
+        ids.append(f"{file_name}#{counts.get(file_name, 0)}")
+        counts[file_name] = counts.get(file_name, 0) + 1
+    return ids
+
+
+RRF_C = 60  # same constant as EnsembleRetriever
+
+
+def weighted_rrf(rankings: List[Tuple[List[Document], float]]) -> List[Document]:
+    """Weighted reciprocal rank fusion, deduplicated by page content like EnsembleRetriever."""
+    scores = {}
+    documents = {}
+    for docs, weight in rankings:
+        for rank, doc in enumerate(docs, start=1):
+            scores[doc.page_content] = scores.get(doc.page_content, 0.0) + weight / (rank + RRF_C)
+            documents.setdefault(doc.page_content, doc)
+    return [documents[content] for content in sorted(scores, key=scores.get, reverse=True)]
+
+
+class HybridRetriever:
+    """
+    FAISS + BM25 retrieval over one or more vector stores, fused with weighted
+    reciprocal rank fusion and reranked with Flashrank.
+
+    `search` answers many queries at once: they are embedded with a single
+    `embed_documents` call and every FAISS index is searched with the whole
+    query matrix, instead of one embedding and one search per query per store.
+    """
+
+    def __init__(self, vectorstores: List[FAISS], retreiver_config: RetreiverConfig):
+        self.vectorstores = vectorstores
+        self.retreiver_config = retreiver_config
+        self.base_k = max(retreiver_config.k * 2, 20)
+        self.bm25_retrievers = [self._build_bm25(vectorstore) for vectorstore in vectorstores]
+        # file name -> FAISS row ids, per store, for filtered searches
+        self.file_rows = [self._file_rows(vectorstore) for vectorstore in vectorstores]
+        self.reranker = get_reranker(retreiver_config.k)
+        self._chain = None
+
+    def _build_bm25(self, vectorstore: FAISS) -> Optional[BM25Retriever]:
+        documents = [doc for doc in vectorstore.docstore._dict.values() if doc.page_content and doc.page_content.strip()]
+        if not documents:
+            logging.info("No documents with text content found in vectorstore docstore. Using vector search only.")
+            return None
+        bm25_retriever = BM25Retriever.from_documents(documents)
+        bm25_retriever.k = self.base_k
+        return bm25_retriever
+
+    @staticmethod
+    def _file_rows(vectorstore: FAISS) -> dict:
+        rows = {}
+        for row, doc_id in vectorstore.index_to_docstore_id.items():
+            file_name = document_file_name(vectorstore.docstore.search(doc_id))
+            rows.setdefault(file_name, []).append(row)
+        return {file_name: np.asarray(ids, dtype=np.int64) for file_name, ids in rows.items()}
+
+    def _vector_hits(self, vectorstore: FAISS, file_rows: dict, vectors: np.ndarray, sources: Optional[List[str]]) -> List[List[Document]]:
+        if vectorstore._normalize_L2:
+            vectors = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        if sources is None:
+            _, indices = vectorstore.index.search(vectors, self.base_k)
+        else:
+            rows = [file_rows[source] for source in sources if source in file_rows]
+            if not rows:
+                return [[] for _ in vectors]
+            # Exact pre-filtering: only the selected files' rows are scored
+            params = faiss.SearchParameters(sel=faiss.IDSelectorBatch(np.concatenate(rows)))
+            _, indices = vectorstore.index.search(vectors, self.base_k, params=params)
+        return [
+            [vectorstore.docstore.search(vectorstore.index_to_docstore_id[i]) for i in row if i != -1]
+            for row in indices
+        ]
+
+    def _bm25_hits(self, bm25_retriever: BM25Retriever, query: str, sources: Optional[List[str]]) -> List[Document]:
+        if sources is None:
+            return bm25_retriever.invoke(query)
+        scores = bm25_retriever.vectorizer.get_scores(bm25_retriever.preprocess_func(query))
+        hits = []
+        for i in np.argsort(scores)[::-1]:
+            if document_file_name(bm25_retriever.docs[i]) in sources:
+                hits.append(bm25_retriever.docs[i])
+                if len(hits) == self.base_k:
+                    break
+        return hits
+
+    def search(self, queries: List[str], sources: Optional[List[str]] = None) -> List[List[Document]]:
+        """
+        Reranked top-k documents for each query, in query order. `sources`
+        restricts retrieval to chunks of those uploaded files. Blocking.
+        """
+        vectors = np.asarray(get_embedding_model().embed_documents(queries), dtype=np.float32)
+        vector_hits = [
+            self._vector_hits(vectorstore, file_rows, vectors, sources)
+            for vectorstore, file_rows in zip(self.vectorstores, self.file_rows)
+        ]
+        vector_weight, bm25_weight = self.retreiver_config.ensemble_weights
+        store_weight = 1.0 / len(self.vectorstores)
+
+        results = []
+        for position, query in enumerate(queries):
+            store_rankings = []
+            for hits, bm25_retriever in zip(vector_hits, self.bm25_retrievers):
+                ranked = hits[position]
+                if bm25_retriever is not None:
+                    bm25_hits = self._bm25_hits(bm25_retriever, query, sources)
+                    ranked = weighted_rrf([(ranked, vector_weight), (bm25_hits, bm25_weight)])
+                store_rankings.append((ranked, store_weight))
+            fused = weighted_rrf(store_rankings)
+            results.append(list(self.reranker.compress_documents(fused, query)) if fused else [])
+        return results
+
+    @property
+    def chain(self) -> ContextualCompressionRetriever:
+        """The same retrieval as a LangChain retriever, for single-query callers."""
+        if self._chain is None:
+            retrievers = []
+            for vectorstore, bm25_retriever in zip(self.vectorstores, self.bm25_retrievers):
+                vector_retriever = vectorstore.as_retriever(search_kwargs={"k": self.base_k})
+                if bm25_retriever is None:
+                    retrievers.append(vector_retriever)
+                else:
+                    retrievers.append(EnsembleRetriever(
+                        retrievers=[vector_retriever, bm25_retriever],
+                        weights=self.retreiver_config.ensemble_weights
+                    ))
+            self._chain = ContextualCompressionRetriever(
+                base_compressor=self.reranker,
+                base_retriever=EnsembleRetriever(retrievers=retrievers, weights=[1.0 / len(retrievers)] * len(retrievers))
+            )
+        return self._chain
 
 class Retreiver:
     def __init__(self, retreiver_config: RetreiverConfig):
@@ -99,7 +323,7 @@ class Retreiver:
         return content_data
 
     @asyncHandler
-    async def get_documents(self, chunks, ingested_file_path: str):
+    async def get_documents(self, chunks, ingested_file_path: str, file_name: Optional[str] = None):
         documents = []
         for chunk in chunks:
             content_data = await self.separate_content_types(chunk)
@@ -110,14 +334,15 @@ class Retreiver:
                     'tables': content_data['tables'],
                     'images': content_data['images'],
                     'has_images': len(content_data['images']) > 0,
-                    'source': ingested_file_path
+                    'source': ingested_file_path,
+                    'file_name': file_name or os.path.basename(ingested_file_path).removesuffix(".pdf")
                 }
             )
             documents.append(doc)
         return documents
     
     @asyncHandler
-    async def save_to_vector_store(self, documents):
+    async def save_to_vector_store(self, documents, embeddings: Optional[List[List[float]]] = None):
         if not documents:
             logging.warning("No documents provided to save to vector store. Skipping FAISS creation.")
             return None
@@ -125,9 +350,69 @@ class Retreiver:
         logging.info(f"Saving {len(documents)} documents to FAISS at {self.retreiver_config.vector_store_path}")
         os.makedirs(os.path.dirname(self.retreiver_config.vector_store_path), exist_ok=True)
         
-        vector_store = FAISS.from_documents(documents, embedding_model)
+        vector_store = build_vector_store(documents, embeddings)
         vector_store.save_local(self.retreiver_config.vector_store_path)
         return self.retreiver_config.vector_store_path
+
+    @asyncHandler
+    async def add_to_vector_store(self, documents, embeddings: Optional[List[List[float]]] = None):
+        """
+        Appends `documents` to the store at `vector_store_path`, creating it on
+        first use, so several files can share one FAISS index. Chunks are added
+        under their chunk_ids; precomputed `embeddings` skip the model.
+        """
+        if not documents:
+            logging.warning("No documents provided to add to vector store. Skipping.")
+            return None
+
+        path = self.retreiver_config.vector_store_path
+        logging.info(f"Adding {len(documents)} documents to FAISS at {path}")
+
+        def write():
+            ids = chunk_ids(documents)
+            if all(os.path.exists(os.path.join(path, name)) for name in FAISS_INDEX_FILES):
+                vector_store = load_vector_store(path)
+                if embeddings is None:
+                    vector_store.add_documents(documents, ids=ids)
+                else:
+                    vector_store.add_embeddings(
+                        list(zip([doc.page_content for doc in documents], embeddings)),
+                        metadatas=[doc.metadata for doc in documents],
+                        ids=ids
+                    )
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                vector_store = build_vector_store(documents, embeddings, ids=ids)
+            vector_store.save_local(path)
+
+        await asyncio.to_thread(write)
+        return path
+
+    @asyncHandler
+    async def remove_from_vector_store(self, file_names: List[str]) -> int:
+        """
+        Deletes every chunk of `file_names` from the store at
+        `vector_store_path`, and the store itself once nothing is left in it.
+        Returns the number of chunks removed.
+        """
+        path = self.retreiver_config.vector_store_path
+        if not all(os.path.exists(os.path.join(path, name)) for name in FAISS_INDEX_FILES):
+            return 0
+
+        def delete():
+            vector_store = load_vector_store(path)
+            names = set(file_names)
+            ids = [doc_id for doc_id, doc in vector_store.docstore._dict.items() if document_file_name(doc) in names]
+            if len(ids) == len(vector_store.docstore._dict):
+                shutil.rmtree(path)
+            elif ids:
+                vector_store.delete(ids)
+                vector_store.save_local(path)
+            return len(ids)
+
+        removed = await asyncio.to_thread(delete)
+        logging.info(f"Removed {removed} chunks of {len(file_names)} files from FAISS at {path}")
+        return removed
     
   
 
@@ -157,7 +442,7 @@ class Retreiver:
             if os.path.exists(path):
                 vectorstore = FAISS.load_local(
                     path, 
-                    embedding_model, 
+                    get_embedding_model(), 
                     allow_dangerous_deserialization=True
                 )
                 for doc in vectorstore.docstore._dict.values():
@@ -168,38 +453,39 @@ class Retreiver:
         return documents
 
     @asyncHandler
-    async def merge_vector_stores(self, vector_store_paths: List[str]):
-        logging.info(f"Merging {len(vector_store_paths)} vector stores")
-        
-        individual_retrievers = []
-        for path in vector_store_paths:
-            if os.path.exists(path):
-                vectorstore = FAISS.load_local(
-                    path, 
-                    embedding_model, 
-                    allow_dangerous_deserialization=True
-                )
-                retriever = await self.create_retreiver(vectorstore)
-                individual_retrievers.append(retriever)
-        
-        if not individual_retrievers:
+    async def get_hybrid_retriever(self, vector_store_paths: List[str], thread_id: Optional[str] = None) -> Optional[HybridRetriever]:
+        """
+        Loads the stores of `vector_store_paths` into a HybridRetriever. With a
+        `thread_id` the result is cached until the thread is deleted or any of
+        its stores is re-saved, so follow-up turns skip loading entirely.
+        """
+        signature = vector_store_signature(vector_store_paths)
+        cache_key = (thread_id, signature, self.retreiver_config.k)
+        if thread_id is not None:
+            cached = retriever_cache.get(cache_key)
+            if cached is not None:
+                logging.info(f"Using cached retriever for thread {thread_id}")
+                return cached[0]
+
+        if not signature:
             logging.warning("No valid vector stores found to merge")
             return None
-            
-        weights = [1.0 / len(individual_retrievers)] * len(individual_retrievers)
-        
-        hybrid_retriever = EnsembleRetriever(
-            retrievers=individual_retrievers,
-            weights=weights
-        )
 
+        logging.info(f"Merging {len(signature)} vector stores")
 
-        compressor = FlashrankRerank(top_n=self.retreiver_config.k)
+        def build():
+            vectorstores = [load_vector_store(path) for path, _ in signature]
+            return HybridRetriever(vectorstores, self.retreiver_config), sum(map(vector_store_size, vectorstores))
 
-        compression_retriever = ContextualCompressionRetriever(
-            base_compressor=compressor,
-            base_retriever=hybrid_retriever
-        )
+        hybrid_retriever, size = await asyncio.to_thread(build)
 
-        return compression_retriever
-        
+        if thread_id is not None:
+            # Older signatures of this thread can never be hit again
+            retriever_cache.invalidate(lambda key: key[0] == thread_id)
+            retriever_cache.set(cache_key, (hybrid_retriever, size))
+        return hybrid_retriever
+
+    @asyncHandler
+    async def merge_vector_stores(self, vector_store_paths: List[str], thread_id: Optional[str] = None):
+        hybrid_retriever = await self.get_hybrid_retriever(vector_store_paths, thread_id=thread_id)
+        return hybrid_retriever.chain if hybrid_retriever else None
@@ -0,0 +1,142 @@
+"""
+test_batch_grader.py — Tests for batch re-grading of coding submissions.
+The sandbox is replaced by the harness running in-process.
+Covers:
+  grade_submissions → mixed accepted / failed / errored batches are graded to the end
+  grade_submissions → progress is recorded for accepted submissions despite failing items
+  grade_submissions → never more than `concurrency` submissions in flight
+  batch_route_concurrency → HTTP batches get a quarter of the pool unless configured
+"""
+import json
+import asyncio
+import importlib
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from config.app_config import app_config
+from api.helper import sandbox_harness
+from api.helper.sandbox_pool import SandboxResult
+
+# `api.helper` re-exports functions under their module's names
+batch_grader = importlib.import_module("api.helper.batch_grader")
+runner = importlib.import_module("api.helper.code_runner")
+
+CORRECT = "class Solution:\n    def double(self, n):\n        return n * 2\n"
+WRONG = "class Solution:\n    def double(self, n):\n        return n\n"
+BROKEN = "class Solution:\n    def double(self, n)\n        return n\n"
+HANGS = "# worker stops responding\n" + CORRECT
+GARBLED = "# worker prints garbage\n" + CORRECT
+
+
+@pytest.fixture
+def db():
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = SimpleNamespace(
+        function_name="double",
+        time_limit_ms=None,
+        memory_limit_mb=None,
+        test_cases=json.dumps([{"test": [n], "expected_output": n * 2} for n in range(1, 4)]),
+    )
+    return db
+
+
+@pytest.fixture
+def sandbox(monkeypatch):
+    async def execute_payload(payload: str) -> SandboxResult:
+        code = json.loads(payload)["code"]
+        if code == HANGS:
+            raise TimeoutError("Sandbox worker did not respond")
+        if code == GARBLED:
+            return SandboxResult(returncode=0, stdout="not json", stderr="")
+        try:
+            return SandboxResult(returncode=0, stdout=sandbox_harness.run_payload(payload), stderr="")
+        except Exception as e:
+            return SandboxResult(returncode=sandbox_harness.exit_code_for(e), stdout="", stderr=repr(e))
+
+    monkeypatch.setattr(runner, "execute_payload", execute_payload)
+    runner.result_cache.clear()
+    yield
+    runner.result_cache.clear()
+
+
+@pytest.fixture
+def progress(monkeypatch):
+    calls = {}
+
+    def mark_questions_solved(db, user_id, question_ids):
+        calls[user_id] = sorted(question_ids)
+        return len(question_ids)
+
+    monkeypatch.setattr(batch_grader, "mark_questions_solved", mark_questions_solved)
+    return calls
+
+
+class TestGradeSubmissions:
+    async def test_mixed_batch_is_graded_to_the_end(self, db, sandbox, progress):
+        submissions = [
+            {"user_id": 1, "question_id": 10, "code": CORRECT},
+            {"user_id": 1, "question_id": 11, "code": HANGS},
+            {"user_id": 2, "question_id": 12, "code": WRONG},
+            {"user_id": 2, "question_id": 13, "code": GARBLED},
+            {"user_id": 2, "question_id": 14, "code": BROKEN},
+            {"user_id": 2, "question_id": 15, "code": CORRECT},
+        ]
+        records = [record async for record in batch_grader.grade_submissions(submissions, db, concurrency=2)]
+
+        results = {r["index"]: r for r in records if r["type"] == "result"}
+        assert sorted(results) == list(range(6))
+        assert results[0]["status"] == "Accepted"
+        assert results[1]["status"] == "Error" and "did not respond" in results[1]["error"]
+        assert results[2]["status"] == "Failed" and results[2]["passed"] == 0
+        assert results[3]["status"] == "Error"
+        assert results[4]["status"] == "Runtime Error" and "SyntaxError" in results[4]["error"]
+        assert results[5]["status"] == "Accepted"
+
+        assert progress == {1: [10], 2: [15]}
+        assert [r for r in records if r["type"] == "progress"] == [
+            {"type": "progress", "user_id": 1, "newly_solved": 1},
+            {"type": "progress", "user_id": 2, "newly_solved": 1},
+        ]
+        assert records[-1] == {"type": "summary", "total": 6, "accepted": 2, "failed": 1, "errors": 3}
+
+    async def test_dry_run_does_not_touch_progress(self, db, sandbox, progress):
+        submissions = [{"user_id": 1, "question_id": 10, "code": CORRECT}]
+        records = [r async for r in batch_grader.grade_submissions(submissions, db, update_progress=False)]
+        assert progress == {}
+        assert [r["type"] for r in records] == ["result", "summary"]
+
+    async def test_concurrency_bounds_submissions_in_flight(self, db, progress, monkeypatch):
+        in_flight = peak = 0
+
+        async def execute_payload(payload: str) -> SandboxResult:
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return SandboxResult(returncode=0, stdout=sandbox_harness.run_payload(payload), stderr="")
+
+        monkeypatch.setattr(runner, "execute_payload", execute_payload)
+        runner.result_cache.clear()
+        # Distinct code per item so none is answered from the result cache
+        submissions = [{"user_id": 1, "question_id": 10, "code": CORRECT + f"# {i}\n"} for i in range(8)]
+        records = [r async for r in batch_grader.grade_submissions(submissions, db, concurrency=2)]
+        runner.result_cache.clear()
+
+        assert records[-1]["accepted"] == 8
+        assert peak == 2
+
+
+class TestRouteConcurrency:
+    @pytest.mark.parametrize("pool_size, configured, expected", [
+        (8, None, 2),
+        (4, None, 1),
+        (2, None, 1),
+        (8, 6, 6),
+    ])
+    def test_quarter_of_the_pool_unless_configured(self, monkeypatch, pool_size, configured, expected):
+        monkeypatch.setattr(app_config, "sandbox_pool_size", pool_size)
+        monkeypatch.setattr(app_config, "sandbox_batch_concurrency", configured)
+        assert batch_grader.batch_route_concurrency() == expected
@@ -0,0 +1,220 @@
+"""
+test_code_runner.py — Tests for the evaluation modes of the code runner.
+The sandbox is replaced by the harness running in-process.
+Covers:
+  CompiledTestSuite.shards → balanced contiguous slices
+  _shard_count             → at least `sandbox_shard_size` cases per shard, at most one per worker
+  code_runner              → "fail_fast" stops early, "sharded" merges every shard in order
+  result_cache             → only deterministic verdicts are reused, keyed by the budgets
+  normalize_code           → only line endings and trailing blank lines are ignored
+"""
+import json
+import importlib
+import traceback
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from api.helper import sandbox_harness
+from api.helper.sandbox_pool import SandboxResult
+from api.models.coding_models import RunCode
+from config.app_config import app_config
+
+# `api.helper` re-exports the code_runner function under the module's name
+runner = importlib.import_module("api.helper.code_runner")
+
+# Returns n * 2, except for n == 7 where it is off by one
+SOLUTION = """
+class Solution:
+    def double(self, n):
+        return n * 2 + (1 if n == 7 else 0)
+"""
+
+
+def _test_cases(count: int) -> list:
+    return [{"test": [n], "expected_output": n * 2} for n in range(count)]
+
+
+def _db(test_cases: list, **question) -> MagicMock:
+    db = MagicMock()
+    db.query.return_value.filter.return_value.first.return_value = SimpleNamespace(
+        function_name=question.get("function_name", "double"),
+        time_limit_ms=question.get("time_limit_ms"),
+        memory_limit_mb=question.get("memory_limit_mb"),
+        test_cases=json.dumps(test_cases),
+    )
+    return db
+
+
+def _body(question_id: int, code: str = SOLUTION) -> RunCode:
+    return RunCode(question_id=question_id, code=code, language="python")
+
+
+def _run_in_process(payload: str) -> SandboxResult:
+    try:
+        return SandboxResult(returncode=0, stdout=sandbox_harness.run_payload(payload), stderr="")
+    except Exception as e:
+        return SandboxResult(returncode=sandbox_harness.exit_code_for(e), stdout="", stderr=traceback.format_exc())
+
+
+@pytest.fixture
+def sandbox(monkeypatch):
+    """Runs payloads in-process and records every payload sent."""
+    payloads = []
+
+    async def execute_payload(payload: str) -> SandboxResult:
+        payloads.append(json.loads(payload))
+        return _run_in_process(payload)
+
+    monkeypatch.setattr(runner, "execute_payload", execute_payload)
+    runner.result_cache.clear()
+    yield payloads
+    runner.result_cache.clear()
+
+
+@pytest.fixture
+def shard_config(monkeypatch):
+    monkeypatch.setattr(app_config, "sandbox_pool_size", 4)
+    monkeypatch.setattr(app_config, "sandbox_shard_size", 3)
+
+
+class TestShards:
+    @pytest.mark.parametrize("count", [3, 7, 12, 13, 50])
+    def test_shards_respect_minimum_size_and_worker_count(self, shard_config, count):
+        suite = runner.compile_test_suite(1000 + count, json.dumps(_test_cases(count)))
+        shards = suite.shards(runner._shard_count(suite))
+        sizes = [len(json.loads(encoded)) for _, encoded in shards]
+
+        assert 1 <= len(shards) <= app_config.sandbox_pool_size
+        assert sum(sizes) == count
+        assert min(sizes) >= min(count, app_config.sandbox_shard_size)
+        assert max(sizes) - min(sizes) <= 1
+
+    def test_shards_are_contiguous(self, shard_config):
+        test_cases = _test_cases(13)
+        suite = runner.compile_test_suite(2000, json.dumps(test_cases))
+        rebuilt = []
+        for offset, encoded in suite.shards(4):
+            assert offset == len(rebuilt)
+            rebuilt.extend(json.loads(encoded))
+        assert rebuilt == test_cases
+
+    def test_small_suite_is_not_sharded(self, shard_config):
+        suite = runner.compile_test_suite(2001, json.dumps(_test_cases(5)))
+        assert runner._shard_count(suite) == 1
+
+
+class TestEvaluationModes:
+    async def test_full_mode_runs_every_case(self, sandbox):
+        status, passed, total, results, _ = await runner.code_runner(_body(1), _db(_test_cases(10)))
+        assert (status, passed, total, len(results)) == ("Failed", 9, 10, 10)
+        assert len(sandbox) == 1
+
+    async def test_fail_fast_stops_at_first_failure(self, sandbox):
+        status, passed, total, results, _ = await runner.code_runner(_body(2), _db(_test_cases(10)), mode="fail_fast")
+        assert status == "Failed"
+        assert total == 10
+        assert [r["test_case"] for r in results] == list(range(1, 9))
+        assert results[-1]["passed"] is False and results[-1]["input"] == [7]
+        assert passed == 7
+
+    async def test_fail_fast_accepts_a_correct_solution(self, sandbox):
+        code = "class Solution:\n    def double(self, n):\n        return n * 2\n"
+        status, passed, total, results, _ = await runner.code_runner(_body(3, code), _db(_test_cases(10)), mode="fail_fast")
+        assert (status, passed, total, len(results)) == ("Accepted", 10, 10, 10)
+
+    async def test_sharded_mode_merges_results_in_order(self, sandbox, shard_config):
+        status, passed, total, results, stats = await runner.code_runner(_body(4), _db(_test_cases(13)), mode="sharded")
+
+        assert len(sandbox) == 4
+        assert [p["offset"] for p in sandbox] == [0, 4, 7, 10]
+        assert (status, passed, total) == ("Failed", 12, 13)
+        assert [r["test_case"] for r in results] == list(range(1, 14))
+        assert [r["test_case"] for r in results if not r["passed"]] == [8]
+        assert set(stats) == {"wall_ms", "cpu_ms", "peak_rss_kb"}
+
+    async def test_sharded_mode_falls_back_to_one_run_for_small_suites(self, sandbox, shard_config):
+        _, passed, total, _, _ = await runner.code_runner(_body(5), _db(_test_cases(5)), mode="sharded")
+        assert (passed, total) == (5, 5)
+        assert len(sandbox) == 1
+
+    async def test_failing_shard_fails_the_run(self, sandbox, shard_config, monkeypatch):
+        async def execute_payload(payload: str) -> SandboxResult:
+            if json.loads(payload)["offset"]:
+                return SandboxResult(returncode=1, stdout="", stderr="Traceback: boom")
+            return SandboxResult(returncode=0, stdout=sandbox_harness.run_payload(payload), stderr="")
+
+        monkeypatch.setattr(runner, "execute_payload", execute_payload)
+        with pytest.raises(RuntimeError, match="boom"):
+            await runner.code_runner(_body(6), _db(_test_cases(13)), mode="sharded")
+
+
+class TestNormalizeCode:
+    def test_line_endings_and_trailing_blank_lines_are_ignored(self):
+        code = "class Solution:\n    def f(self):\n        return 1\n"
+        assert runner.normalize_code(code.replace("\n", "\r\n") + "\r\n   \n") == runner.normalize_code(code)
+
+    @pytest.mark.parametrize("a, b", [
+        # Whitespace inside a triple-quoted string is part of the value
+        ('s = """x  \n"""\n', 's = """x\n"""\n'),
+        # A backslash followed by spaces is a syntax error, without them a continuation
+        ("x = 1 + \\  \n    2\n", "x = 1 + \\\n    2\n"),
+        # Leading blank lines move the line numbers of errors
+        ("\n\nraise ValueError\n", "raise ValueError\n"),
+    ])
+    def test_meaningful_whitespace_is_kept(self, a, b):
+        assert runner.normalize_code(a) != runner.normalize_code(b)
+
+
+class TestResultCache:
+    async def test_deterministic_failure_is_cached(self, sandbox):
+        for _ in range(2):
+            status, *_ = await runner.code_runner(_body(10), _db(_test_cases(10)))
+            assert status == "Failed"
+        assert len(sandbox) == 1
+
+    async def test_submission_error_is_cached(self, sandbox):
+        code = "class Solution:\n    def double(self, n)\n        return n\n"
+        for _ in range(2):
+            with pytest.raises(runner.SubmissionError, match="SyntaxError"):
+                await runner.code_runner(_body(11, code), _db(_test_cases(3)))
+        assert len(sandbox) == 1
+
+    @pytest.mark.parametrize("error", ["Sandbox worker exited unexpectedly", "Sandbox worker failed to start"])
+    async def test_worker_failures_are_not_cached(self, sandbox, monkeypatch, error):
+        async def crashing_payload(payload: str) -> SandboxResult:
+            raise RuntimeError(error)
+
+        in_process = runner.execute_payload
+        monkeypatch.setattr(runner, "execute_payload", crashing_payload)
+        with pytest.raises(RuntimeError, match=error):
+            await runner.code_runner(_body(12), _db(_test_cases(3)))
+
+        monkeypatch.setattr(runner, "execute_payload", in_process)
+        status, passed, total, _, _ = await runner.code_runner(_body(12), _db(_test_cases(3)))
+        assert (status, passed, total) == ("Accepted", 3, 3)
+
+    async def test_crashed_child_is_not_cached(self, sandbox, monkeypatch):
+        async def killed_payload(payload: str) -> SandboxResult:
+            return SandboxResult(returncode=-9, stdout="", stderr="")
+
+        monkeypatch.setattr(runner, "execute_payload", killed_payload)
+        with pytest.raises(RuntimeError):
+            await runner.code_runner(_body(13), _db(_test_cases(3)))
+        assert len(runner.result_cache) == 0
+
+    async def test_verdict_decided_by_a_budget_is_not_cached(self, sandbox):
+        code = "import time\nclass Solution:\n    def double(self, n):\n        time.sleep(0.002)\n        return n * 2\n"
+        db = _db(_test_cases(2), time_limit_ms=1)
+        for _ in range(2):
+            status, passed, _, results, _ = await runner.code_runner(_body(14, code), db)
+            assert (status, passed) == ("Failed", 0)
+            assert all(r["limit_exceeded"] for r in results)
+        assert len(sandbox) == 2
+
+    async def test_budgets_are_part_of_the_key(self, sandbox):
+        await runner.code_runner(_body(15), _db(_test_cases(3), time_limit_ms=1000))
+        await runner.code_runner(_body(15), _db(_test_cases(3), time_limit_ms=2000))
+        await runner.code_runner(_body(15), _db(_test_cases(3), time_limit_ms=2000))
+        assert [p["time_limit_ms"] for p in sandbox] == [1000, 2000]
@@ -5,6 +5,9 @@ Routes covered:
   GET  /api/v1/coding/fetch           → reject unauthenticated
   POST /api/v1/coding/run_code        → missing body returns 422
   POST /api/v1/coding/run_code        → reject unauthenticated
+  POST /api/v1/coding/batch_grade     → reject unauthenticated / empty batch
+  GET  /api/v1/coding/sandbox/metrics → sandbox queue/execution metrics (auth)
+  GET  /api/v1/coding/sandbox/metrics → reject unauthenticated
 """
 import pytest
 from fastapi.testclient import TestClient
@@ -38,6 +41,12 @@ class TestFetchCodingSchema:
         resp = client.get(f"{BASE}/fetch", headers=auth_headers)
         assert isinstance(resp.json(), dict)
 
+    def test_fetch_returns_counters_and_history(self, client: TestClient, auth_headers: dict):
+        resp = client.get(f"{BASE}/fetch", headers=auth_headers)
+        record = resp.json()["data"][0]
+        for key in ("easy", "medium", "hard", "recently_solved", "recently_visited", "all_questions_solved"):
+            assert key in record
+
 
 class TestRunCode:
     def test_run_code_missing_fields_returns_422(
@@ -57,3 +66,34 @@ class TestRunCode:
         resp = client.post(f"{BASE}/run_code", json=payload, headers=auth_headers)
         # 404 (question not found) or 500 if internal, but NOT 200
         assert resp.status_code in (400, 404, 500), resp.text
+
+
+class TestBatchGrade:
+    def test_batch_grade_without_token_returns_401(self):
+        from api.app import app
+        with TestClient(app) as local_client:
+            resp = local_client.post(f"{BASE}/batch_grade", json={"submissions": []})
+            assert resp.status_code == 401
+
+    def test_batch_grade_empty_batch_returns_422(
+        self, client: TestClient, auth_headers: dict
+    ):
+        resp = client.post(f"{BASE}/batch_grade", json={"submissions": []}, headers=auth_headers)
+        assert resp.status_code == 422
+
+
+class TestSandboxMetrics:
+    def test_metrics_without_token_returns_401(self):
+        from api.app import app
+        with TestClient(app) as local_client:
+            resp = local_client.get(f"{BASE}/sandbox/metrics")
+            assert resp.status_code == 401
+
+    def test_metrics_returns_200(self, client: TestClient, auth_headers: dict):
+        resp = client.get(f"{BASE}/sandbox/metrics", headers=auth_headers)
+        assert resp.status_code == 200
+
+    def test_metrics_has_latency_summaries(self, client: TestClient, auth_headers: dict):
+        data = client.get(f"{BASE}/sandbox/metrics", headers=auth_headers).json()["data"]
+        assert "queue_wait_ms" in data
+        assert "execution_ms" in data
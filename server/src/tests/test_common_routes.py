@@ -3,6 +3,8 @@ test_common_routes.py — Tests for public/health-check endpoints.
 Routes covered:
   GET  /          → root welcome
   GET  /health    → health check
+  GET  /fit_questions → seeding is skipped when problems.json is unchanged
+  GET  /db/metrics    → per-route query metrics (auth), reject unauthenticated
 """
 import pytest
 from fastapi.testclient import TestClient
@@ -30,3 +32,31 @@ class TestHealthCheck:
     def test_health_has_message(self, client: TestClient):
         resp = client.get("/health")
         assert "message" in resp.json()
+
+
+class TestFitQuestions:
+    def test_second_seed_of_unchanged_file_is_skipped(self, client: TestClient):
+        first = client.get("/fit_questions")
+        assert first.status_code == 200
+        second = client.get("/fit_questions")
+        assert second.json()["status"] == "ok"
+        assert "unchanged" in second.json()["message"]
+
+
+class TestDbMetrics:
+    def test_responses_carry_query_count_header(self, client: TestClient):
+        resp = client.get("/api/v1/question/categories")
+        assert "x-db-queries" in resp.headers
+
+    def test_metrics_without_token_returns_401(self):
+        from api.app import app
+        with TestClient(app) as local_client:
+            resp = local_client.get("/db/metrics")
+            assert resp.status_code == 401
+
+    def test_metrics_list_instrumented_routes(self, client: TestClient, auth_headers: dict):
+        client.get("/fit_questions")
+        resp = client.get("/db/metrics", headers=auth_headers)
+        assert resp.status_code == 200
+        routes = [entry["route"] for entry in resp.json()["data"]["routes"]]
+        assert "GET /fit_questions" in routes
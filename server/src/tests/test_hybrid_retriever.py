@@ -0,0 +1,259 @@
+"""
+test_hybrid_retriever.py — Tests for batched multi-query retrieval.
+FAISS and BM25 are real; the embedding model and the Flashrank reranker are
+replaced by fakes, so the fused order is visible in the results.
+Covers:
+  weighted_rrf             → weighted fusion, duplicates merged by page content
+  HybridRetriever.search   → results come back in query order
+  HybridRetriever.search   → one embed_documents call for all queries and stores
+  HybridRetriever.search   → ensemble weights decide between FAISS and BM25 rankings
+  Retreiver.add_to_vector_store / remove_from_vector_store → files share one store under chunk_ids
+  HybridRetriever.search   → `sources` restricts FAISS and BM25 hits, row ids stay right after a delete
+"""
+import importlib
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.entity.config_entity import RetreiverConfig
+
+retrievers = importlib.import_module("src.retrievers.create_retreivers")
+
+VOCABULARY = ("apples", "bananas", "cherries", "grapes", "limes", "red", "yellow", "green", "dark", "bunches")
+
+
+class FakeEmbeddings(Embeddings):
+    """Bag of words over VOCABULARY. `steer` maps a text to the text whose vector it gets."""
+
+    def __init__(self, steer: dict = None):
+        self.steer = steer or {}
+        self.calls = []
+
+    def _vector(self, text: str) -> list:
+        words = self.steer.get(text, text).lower().split()
+        return [float(word in words) for word in VOCABULARY] + [0.01]
+
+    def embed_documents(self, texts):
+        self.calls.append(("embed_documents", list(texts)))
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text):
+        self.calls.append(("embed_query", text))
+        return self._vector(text)
+
+
+class FakeReranker:
+    """Keeps the fused order, so tests see what the reranker was given."""
+
+    def __init__(self, top_n: int):
+        self.top_n = top_n
+
+    def compress_documents(self, documents, query):
+        return documents[:self.top_n]
+
+
+@pytest.fixture
+def embeddings(monkeypatch):
+    embeddings = FakeEmbeddings()
+    monkeypatch.setattr(retrievers, "get_embedding_model", lambda: embeddings)
+    monkeypatch.setattr(retrievers, "get_reranker", FakeReranker)
+    return embeddings
+
+
+def _docs(file_name: str, *texts: str) -> list:
+    return [Document(page_content=text, metadata={"file_name": file_name}) for text in texts]
+
+
+FRUIT = _docs("fruit.pdf", "apples are red", "bananas are yellow", "cherries are dark red")
+CITRUS = _docs("citrus.pdf", "limes are green", "grapes grow in bunches")
+
+
+def _retriever(*stores, k: int = 3, weights=(0.7, 0.3)) -> "retrievers.HybridRetriever":
+    vectorstores = [retrievers.build_vector_store(documents) for documents in stores]
+    return retrievers.HybridRetriever(vectorstores, RetreiverConfig(k=k, ensemble_weights=list(weights)))
+
+
+def _contents(documents) -> list:
+    return [doc.page_content for doc in documents]
+
+
+# ─────────────────────────────────────────────────────────────
+#  weighted_rrf
+# ─────────────────────────────────────────────────────────────
+
+class TestWeightedRrf:
+    def test_heavier_ranking_wins(self):
+        a, b = _docs("x.pdf", "a", "b")
+        assert _contents(retrievers.weighted_rrf([([a], 0.9), ([b], 0.1)])) == ["a", "b"]
+        assert _contents(retrievers.weighted_rrf([([a], 0.1), ([b], 0.9)])) == ["b", "a"]
+
+    def test_scores_are_summed_across_rankings(self):
+        a, b, c = _docs("x.pdf", "a", "b", "c")
+        # b is second in both rankings, which beats first in only one
+        fused = retrievers.weighted_rrf([([a, b], 1.0), ([c, b], 1.0)])
+        assert _contents(fused)[0] == "b"
+        assert sorted(_contents(fused)) == ["a", "b", "c"]
+
+    def test_duplicates_are_merged_by_page_content(self):
+        first = Document(page_content="same", metadata={"file_name": "one.pdf"})
+        second = Document(page_content="same", metadata={"file_name": "two.pdf"})
+        fused = retrievers.weighted_rrf([([first], 0.5), ([second], 0.5)])
+        assert fused == [first]
+
+    def test_empty_rankings(self):
+        assert retrievers.weighted_rrf([([], 0.5), ([], 0.5)]) == []
+
+
+# ─────────────────────────────────────────────────────────────
+#  HybridRetriever.search
+# ─────────────────────────────────────────────────────────────
+
+class TestSearch:
+    def test_results_are_in_query_order(self, embeddings):
+        # One store: across stores, each store's best hit ties in the fusion
+        retriever = _retriever(FRUIT + CITRUS)
+        queries = ["limes", "apples", "grapes", "bananas"]
+        results = retriever.search(queries)
+
+        assert len(results) == len(queries)
+        for query, documents in zip(queries, results):
+            assert query in documents[0].page_content
+            assert len(documents) == 3
+
+    def test_queries_are_embedded_in_one_batch(self, embeddings):
+        retriever = _retriever(FRUIT, CITRUS)
+        embeddings.calls.clear()
+        retriever.search(["limes", "apples", "grapes"])
+
+        assert embeddings.calls == [("embed_documents", ["limes", "apples", "grapes"])]
+
+    def test_faiss_searches_every_query_at_once(self, embeddings, monkeypatch):
+        retriever = _retriever(FRUIT, CITRUS)
+        batches = []
+        for vectorstore in retriever.vectorstores:
+            index_search = vectorstore.index.search
+
+            def search(vectors, k, *args, index_search=index_search, **kwargs):
+                batches.append(np.asarray(vectors).shape[0])
+                return index_search(vectors, k, *args, **kwargs)
+
+            monkeypatch.setattr(vectorstore.index, "search", search)
+        retriever.search(["limes", "apples", "grapes"])
+
+        assert batches == [3, 3]
+
+    @pytest.mark.parametrize("weights, expected", [
+        ((1.0, 0.0), "bananas are yellow"),
+        ((0.0, 1.0), "apples are red"),
+    ])
+    def test_weights_pick_between_vector_and_bm25(self, embeddings, weights, expected):
+        # FAISS ranks bananas first for "red", BM25 ranks the red fruit first
+        embeddings.steer = {"red": "bananas yellow"}
+        retriever = _retriever(FRUIT, k=1, weights=weights)
+        assert _contents(retriever.search(["red"])[0]) == [expected]
+
+    def test_empty_store_is_vector_only(self, embeddings):
+        retriever = _retriever(_docs("blank.pdf", " ", "  "))
+        assert retriever.bm25_retrievers == [None]
+        assert [len(documents) for documents in retriever.search(["apples"])] == [2]
+
+
+# ─────────────────────────────────────────────────────────────
+#  Session store: several files in one index
+# ─────────────────────────────────────────────────────────────
+
+SALAD = _docs("salad.pdf", "green limes and green grapes", "dark cherries")
+
+
+@pytest.fixture
+def session_store(tmp_path, embeddings):
+    """Retreiver on one store path, holding fruit.pdf, salad.pdf and citrus.pdf in that order."""
+    retreiver = retrievers.Retreiver(RetreiverConfig(vector_store_path=str(tmp_path / "session")))
+
+    async def fill():
+        # Not in name order, so rows and sorted docstore ids disagree
+        for documents in (FRUIT, SALAD, CITRUS):
+            await retreiver.add_to_vector_store(documents, embeddings.embed_documents(_contents(documents)))
+        return retreiver
+
+    return fill
+
+
+async def _load(retreiver) -> "retrievers.HybridRetriever":
+    return await retreiver.get_hybrid_retriever([retreiver.retreiver_config.vector_store_path])
+
+
+class TestSessionStore:
+    def test_chunk_ids_number_chunks_per_file(self):
+        assert retrievers.chunk_ids(FRUIT[:2] + CITRUS + FRUIT[2:]) == [
+            "fruit.pdf#0", "fruit.pdf#1", "citrus.pdf#0", "citrus.pdf#1", "fruit.pdf#2"
+        ]
+
+    async def test_files_are_appended_under_their_chunk_ids(self, session_store):
+        retriever = await _load(await session_store())
+        vectorstore, = retriever.vectorstores
+
+        assert vectorstore.index.ntotal == 7
+        assert sorted(vectorstore.docstore._dict) == sorted(
+            retrievers.chunk_ids(FRUIT) + retrievers.chunk_ids(CITRUS) + retrievers.chunk_ids(SALAD)
+        )
+
+    async def test_remove_deletes_one_file_and_then_the_store(self, session_store, tmp_path):
+        retreiver = await session_store()
+        assert await retreiver.remove_from_vector_store(["fruit.pdf"]) == 3
+        assert await retreiver.remove_from_vector_store(["fruit.pdf"]) == 0
+        retriever = await _load(retreiver)
+        assert set(retriever.file_rows[0]) == {"citrus.pdf", "salad.pdf"}
+
+        assert await retreiver.remove_from_vector_store(["citrus.pdf", "salad.pdf"]) == 4
+        assert not (tmp_path / "session").exists()
+
+    async def test_row_ids_follow_the_renumbering_after_a_delete(self, session_store):
+        retreiver = await session_store()
+        await retreiver.remove_from_vector_store(["fruit.pdf"])
+        retriever = await _load(retreiver)
+        vectorstore, = retriever.vectorstores
+
+        # FAISS.delete renumbered the remaining rows from 0
+        assert sorted(vectorstore.index_to_docstore_id) == list(range(4))
+        for file_name, rows in retriever.file_rows[0].items():
+            for row in rows:
+                doc = vectorstore.docstore.search(vectorstore.index_to_docstore_id[int(row)])
+                assert doc.metadata["file_name"] == file_name
+
+    async def test_sources_restrict_faiss_hits(self, session_store, embeddings):
+        retriever = await _load(await session_store())
+        vectorstore, = retriever.vectorstores
+        vectors = np.asarray(embeddings.embed_documents(["green limes", "cherries"]), dtype=np.float32)
+
+        hits = retriever._vector_hits(vectorstore, retriever.file_rows[0], vectors, ["salad.pdf"])
+        assert [_contents(row) for row in hits] == [
+            ["green limes and green grapes", "dark cherries"],
+            ["dark cherries", "green limes and green grapes"],
+        ]
+        unknown = retriever._vector_hits(vectorstore, retriever.file_rows[0], vectors, ["missing.pdf"])
+        assert unknown == [[], []]
+
+    async def test_sources_restrict_bm25_hits(self, session_store):
+        retriever = await _load(await session_store())
+        bm25_retriever, = retriever.bm25_retrievers
+
+        hits = retriever._bm25_hits(bm25_retriever, "cherries", ["salad.pdf", "citrus.pdf"])
+        assert _contents(hits)[0] == "dark cherries"
+        assert {doc.metadata["file_name"] for doc in hits} == {"salad.pdf", "citrus.pdf"}
+
+    async def test_search_with_sources_after_a_delete(self, session_store):
+        retreiver = await session_store()
+        await retreiver.remove_from_vector_store(["fruit.pdf"])
+        retriever = await _load(retreiver)
+
+        everywhere, = retriever.search(["cherries"])
+        only_salad, = retriever.search(["cherries"], sources=["salad.pdf"])
+        only_citrus, = retriever.search(["cherries"], sources=["citrus.pdf"])
+
+        assert _contents(everywhere)[0] == "dark cherries"
+        assert {doc.metadata["file_name"] for doc in everywhere} == {"citrus.pdf", "salad.pdf"}
+        assert _contents(only_salad) == ["dark cherries", "green limes and green grapes"]
+        assert {doc.metadata["file_name"] for doc in only_citrus} == {"citrus.pdf"}
@@ -0,0 +1,259 @@
+"""
+test_ingestion_manifest.py — Tests for incremental ingestion into a thread's index.
+Conversion, partitioning, embedding and the FAISS stores are replaced by
+in-memory fakes; the scheduler runs every step inline.
+Covers:
+  IngestionManifest               → load / save round trip, unreadable manifests, change detection
+  VectiorizerPipeline.initiate    → unchanged files are skipped
+  VectiorizerPipeline.initiate    → changed and removed files are dropped from their store
+  VectiorizerPipeline.initiate    → files move store after an index mode switch
+  VectiorizerPipeline.initiate    → a thread ingested without a manifest is rebuilt once
+"""
+import os
+import importlib
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils.ingestion_manifest import IngestionManifest, file_hash
+from src.entity.config_entity import (
+    DataIngestionConfig,
+    ContentEmbedderConfig,
+    DataTransformationConfig,
+    ContentTransformationConfig,
+)
+from src.entity.artifact_entity import DataIngestionArtifact
+from src.constants import TRANSFORMATION_FOLDER_NAME, INGESTION_MANIFEST_FILE_NAME
+
+pipeline = importlib.import_module("src.pipelines.Vectiorizer_pipeline")
+
+THREAD_ID = "thread-1"
+
+
+# ─────────────────────────────────────────────────────────────
+#  IngestionManifest
+# ─────────────────────────────────────────────────────────────
+
+class TestIngestionManifest:
+    def test_round_trip(self, tmp_path):
+        path = str(tmp_path / "thread" / INGESTION_MANIFEST_FILE_NAME)
+        manifest = IngestionManifest(path)
+        manifest.record("a.pdf", "hash-a", "ingested/a.pdf", "stores/a.pdf")
+        manifest.save()
+
+        loaded = IngestionManifest.load(path)
+        assert loaded.files == manifest.files
+        assert not os.path.exists(f"{path}.tmp")
+
+    def test_missing_or_unreadable_manifest_loads_as_none(self, tmp_path):
+        path = tmp_path / INGESTION_MANIFEST_FILE_NAME
+        assert IngestionManifest.load(str(path)) is None
+        path.write_text("{not json")
+        assert IngestionManifest.load(str(path)) is None
+        path.write_text("{}")
+        assert IngestionManifest.load(str(path)) is None
+
+    def test_change_detection(self, tmp_path):
+        manifest = IngestionManifest(str(tmp_path / INGESTION_MANIFEST_FILE_NAME))
+        manifest.record("a.pdf", "hash-a", "ingested/a.pdf", "stores/a.pdf")
+        manifest.record("b.pdf", "hash-b", "ingested/b.pdf", "stores/b.pdf")
+
+        assert manifest.is_current("a.pdf", "hash-a")
+        assert not manifest.is_current("a.pdf", "hash-other")
+        assert not manifest.is_current("c.pdf", "hash-c")
+        assert manifest.removed(["a.pdf", "c.pdf"]) == ["b.pdf"]
+        assert manifest.forget("b.pdf")["hash"] == "hash-b"
+        assert manifest.forget("b.pdf") is None
+
+    def test_file_hash_follows_content(self, tmp_path):
+        path = tmp_path / "a.pdf"
+        path.write_bytes(b"one")
+        first = file_hash(str(path))
+        path.write_bytes(b"two")
+        assert file_hash(str(path)) != first
+
+
+# ─────────────────────────────────────────────────────────────
+#  VectiorizerPipeline.initiate
+# ─────────────────────────────────────────────────────────────
+
+class InlineScheduler:
+    """Runs every step in the test process, in order."""
+
+    def __init__(self, files: int):
+        self.workers = 1
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    async def map(self, fn, *iterables):
+        return [fn(*args) for args in zip(*iterables)]
+
+
+class FakeRetreiver:
+    """Vector stores as {path: {file_name: chunk count}}."""
+
+    stores = {}
+
+    def __init__(self, retreiver_config):
+        self.path = retreiver_config.vector_store_path
+
+    async def save_to_vector_store(self, documents, embeddings=None):
+        self.stores[self.path] = {}
+        return await self.add_to_vector_store(documents, embeddings)
+
+    async def add_to_vector_store(self, documents, embeddings=None):
+        if not documents:
+            return self.path if self.path in self.stores else None
+        assert len(embeddings) == len(documents)
+        store = self.stores.setdefault(self.path, {})
+        for doc in documents:
+            name = doc.metadata["file_name"]
+            store[name] = store.get(name, 0) + 1
+        return self.path
+
+    async def remove_from_vector_store(self, file_names):
+        store = self.stores.get(self.path, {})
+        removed = sum(store.pop(name, 0) for name in file_names)
+        if not store:
+            self.stores.pop(self.path, None)
+        return removed
+
+
+@pytest.fixture
+def fakes(tmp_path, monkeypatch):
+    partitioned = []
+
+    def ingest_file(config):
+        with open(config.input_file_path, "rb") as src, open(config.save_file_path, "wb") as dst:
+            dst.write(src.read())
+        return DataIngestionArtifact(ingested_file_path=config.save_file_path)
+
+    def extract_file_documents(config, ingestion_artifact):
+        partitioned.append(config.file_name)
+        return [SimpleNamespace(page_content="chunk", metadata={"file_name": config.file_name})] * 2
+
+    FakeRetreiver.stores = {}
+    monkeypatch.setattr(pipeline, "ARTIFACT_DIR", str(tmp_path / "artifacts"))
+    monkeypatch.setattr(pipeline, "IngestionScheduler", InlineScheduler)
+    monkeypatch.setattr(pipeline, "ingest_file", ingest_file)
+    monkeypatch.setattr(pipeline, "extract_file_documents", extract_file_documents)
+    monkeypatch.setattr(pipeline, "embed_documents", lambda documents, batch_size: [[0.0]] * len(documents))
+    monkeypatch.setattr(pipeline, "Retreiver", FakeRetreiver)
+    return SimpleNamespace(partitioned=partitioned, stores=FakeRetreiver.stores, root=tmp_path)
+
+
+def _upload(fakes, files: dict):
+    """Replaces the thread's uploads with `files` ({name: content})."""
+    uploads = fakes.root / "uploads"
+    if uploads.exists():
+        for path in uploads.iterdir():
+            path.unlink()
+    uploads.mkdir(exist_ok=True)
+    for name, content in files.items():
+        (uploads / name).write_text(content)
+
+
+def _store_path(fakes, name: str) -> str:
+    return str(fakes.root / "artifacts" / THREAD_ID / TRANSFORMATION_FOLDER_NAME / name)
+
+
+async def _ingest(fakes, mode: str = "per_file"):
+    """Mirrors how /multi_rag/ingest builds the pipeline for the uploads folder."""
+    uploads = fakes.root / "uploads"
+    ingested = fakes.root / "artifacts" / THREAD_ID / "ingested"
+    ingested.mkdir(parents=True, exist_ok=True)
+    files = sorted(os.listdir(uploads))
+    fakes.partitioned.clear()
+    return await pipeline.VectiorizerPipeline(
+        content_embedder_config=ContentEmbedderConfig(data_ingestion_configs=[
+            DataIngestionConfig(input_file_path=str(uploads / name), save_file_path=str(ingested / f"{name}.pdf"))
+            for name in files
+        ]),
+        content_transformation_config=ContentTransformationConfig(
+            data_transformation_configs=[
+                DataTransformationConfig(vector_store_path=_store_path(fakes, name), file_name=name)
+                for name in files
+            ],
+            session_vector_store_path=_store_path(fakes, "session") if mode == "session" else None
+        )
+    ).initiate(thread_id=THREAD_ID)
+
+
+def _paths(artifact) -> list:
+    return sorted(a.vector_store_path for a in artifact.data_transformation_artifacts)
+
+
+class TestIncrementalIngest:
+    async def test_unchanged_files_are_skipped(self, fakes):
+        _upload(fakes, {"a.pdf": "a", "b.pdf": "b"})
+        first = await _ingest(fakes)
+        assert fakes.partitioned == ["a.pdf", "b.pdf"]
+
+        second = await _ingest(fakes)
+        assert fakes.partitioned == []
+        assert _paths(second) == _paths(first) == [_store_path(fakes, "a.pdf"), _store_path(fakes, "b.pdf")]
+
+    async def test_only_new_files_are_added_to_the_session_index(self, fakes):
+        _upload(fakes, {"a.pdf": "a"})
+        await _ingest(fakes, mode="session")
+        _upload(fakes, {"a.pdf": "a", "b.pdf": "b"})
+        artifact = await _ingest(fakes, mode="session")
+
+        assert fakes.partitioned == ["b.pdf"]
+        assert fakes.stores == {_store_path(fakes, "session"): {"a.pdf": 2, "b.pdf": 2}}
+        assert _paths(artifact) == [_store_path(fakes, "session")]
+
+    async def test_changed_file_chunks_are_replaced(self, fakes):
+        _upload(fakes, {"a.pdf": "a", "b.pdf": "b"})
+        await _ingest(fakes, mode="session")
+        _upload(fakes, {"a.pdf": "a, edited", "b.pdf": "b"})
+        await _ingest(fakes, mode="session")
+
+        assert fakes.partitioned == ["a.pdf"]
+        # Old chunks of a.pdf were dropped before the new ones were added
+        assert fakes.stores == {_store_path(fakes, "session"): {"a.pdf": 2, "b.pdf": 2}}
+
+    async def test_removed_files_are_dropped(self, fakes):
+        _upload(fakes, {"a.pdf": "a", "b.pdf": "b"})
+        await _ingest(fakes)
+        _upload(fakes, {"a.pdf": "a"})
+        artifact = await _ingest(fakes)
+
+        assert fakes.partitioned == []
+        assert fakes.stores == {_store_path(fakes, "a.pdf"): {"a.pdf": 2}}
+        assert _paths(artifact) == [_store_path(fakes, "a.pdf")]
+        manifest = IngestionManifest.load(str(fakes.root / "artifacts" / THREAD_ID / INGESTION_MANIFEST_FILE_NAME))
+        assert list(manifest.files) == ["a.pdf"]
+
+    async def test_index_mode_switch_moves_files(self, fakes):
+        _upload(fakes, {"a.pdf": "a", "b.pdf": "b"})
+        await _ingest(fakes)
+        artifact = await _ingest(fakes, mode="session")
+
+        assert fakes.partitioned == ["a.pdf", "b.pdf"]
+        assert fakes.stores == {_store_path(fakes, "session"): {"a.pdf": 2, "b.pdf": 2}}
+        assert _paths(artifact) == [_store_path(fakes, "session")]
+
+        await _ingest(fakes)
+        assert fakes.stores == {
+            _store_path(fakes, "a.pdf"): {"a.pdf": 2},
+            _store_path(fakes, "b.pdf"): {"b.pdf": 2},
+        }
+
+    async def test_thread_without_manifest_is_rebuilt_once(self, fakes):
+        # Left behind by an ingest made before manifests existed
+        legacy_store = fakes.root / "artifacts" / THREAD_ID / TRANSFORMATION_FOLDER_NAME / "old.pdf"
+        legacy_store.mkdir(parents=True)
+        (legacy_store / "index.faiss").write_bytes(b"")
+
+        _upload(fakes, {"a.pdf": "a"})
+        await _ingest(fakes)
+        assert fakes.partitioned == ["a.pdf"]
+        assert not legacy_store.exists()
+
+        await _ingest(fakes)
+        assert fakes.partitioned == []
@@ -0,0 +1,104 @@
+"""
+test_ingestion_scheduler.py — Tests for the RAG ingestion process pool.
+Covers:
+  ingest_worker_count → bounded by CPUs, memory budget and number of files, never 0
+  IngestionScheduler  → results in order, errors raised in a worker reach the caller
+  IngestionScheduler  → a single file runs inline on a thread, without spawning a pool
+"""
+import threading
+
+import pytest
+
+from config.app_config import app_config
+from src.components import ingestion_scheduler
+from src.components.ingestion_scheduler import IngestionScheduler, ingest_worker_count
+
+
+@pytest.fixture
+def machine(monkeypatch):
+    """Sets the CPU count, physical memory and ingest config seen by the sizing."""
+    def configure(cpus=8, memory_mb=64 * 1024, workers=None, budget_mb=None, worker_mb=2048):
+        monkeypatch.setattr(ingestion_scheduler.os, "cpu_count", lambda: cpus)
+        monkeypatch.setattr(ingestion_scheduler, "physical_memory_mb", lambda: memory_mb)
+        monkeypatch.setattr(app_config, "rag_ingest_workers", workers)
+        monkeypatch.setattr(app_config, "rag_ingest_memory_budget_mb", budget_mb)
+        monkeypatch.setattr(app_config, "rag_ingest_worker_memory_mb", worker_mb)
+    return configure
+
+
+class TestWorkerCount:
+    def test_cpu_bound(self, machine):
+        machine(cpus=4)
+        assert ingest_worker_count(files=10) == 3
+
+    def test_configured_workers_override_cpus(self, machine):
+        machine(cpus=4, workers=6)
+        assert ingest_worker_count(files=10) == 6
+
+    def test_memory_bound_by_half_of_physical_memory(self, machine):
+        # 16 GB machine: 8 GB budget fits 4 workers of 2 GB
+        machine(cpus=32, memory_mb=16 * 1024)
+        assert ingest_worker_count(files=10) == 4
+
+    def test_memory_bound_by_configured_budget(self, machine):
+        machine(cpus=32, budget_mb=5000, worker_mb=1000)
+        assert ingest_worker_count(files=10) == 5
+
+    def test_unknown_memory_is_cpu_bound(self, machine):
+        machine(cpus=4, memory_mb=None)
+        assert ingest_worker_count(files=10) == 3
+
+    def test_bounded_by_files(self, machine):
+        machine(cpus=32)
+        assert ingest_worker_count(files=2) == 2
+
+    @pytest.mark.parametrize("settings, files", [
+        ({"cpus": 1}, 10),
+        ({"cpus": None}, 10),
+        ({"budget_mb": 100, "worker_mb": 2048}, 10),
+        ({"memory_mb": 1024}, 10),
+        ({}, 0),
+    ])
+    def test_never_zero(self, machine, settings, files):
+        machine(**settings)
+        assert ingest_worker_count(files=files) == 1
+
+
+def _fail_on_negative(value: int) -> int:
+    if value < 0:
+        raise ValueError(f"negative value {value}")
+    return value * 2
+
+
+class TestScheduler:
+    async def test_pool_returns_results_in_order(self, machine):
+        machine(cpus=3)
+        async with IngestionScheduler(files=4) as scheduler:
+            assert scheduler.workers == 2
+            assert await scheduler.map(abs, [-3, 2, -1, 0]) == [3, 2, 1, 0]
+
+    async def test_worker_error_reaches_the_caller(self, machine):
+        machine(cpus=3)
+        async with IngestionScheduler(files=3) as scheduler:
+            with pytest.raises(ValueError, match="invalid literal"):
+                await scheduler.map(int, ["1", "not a number", "3"])
+
+    async def test_pool_is_shut_down_after_an_error(self, machine):
+        machine(cpus=3)
+        scheduler = IngestionScheduler(files=2)
+        with pytest.raises(ValueError):
+            async with scheduler:
+                await scheduler.map(int, ["1", "x"])
+        assert scheduler._executor is None
+
+    async def test_single_file_runs_inline(self, monkeypatch):
+        def no_pool(*args, **kwargs):
+            raise AssertionError("a pool was started for a single file")
+
+        monkeypatch.setattr(ingestion_scheduler, "ProcessPoolExecutor", no_pool)
+        async with IngestionScheduler(files=1) as scheduler:
+            thread = await scheduler.map(lambda _: threading.current_thread(), [None])
+            assert thread != [threading.current_thread()]
+            assert await scheduler.map(_fail_on_negative, [21]) == [42]
+            with pytest.raises(ValueError, match="negative value"):
+                await scheduler.map(_fail_on_negative, [-1])
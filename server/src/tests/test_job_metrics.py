@@ -0,0 +1,62 @@
+"""
+test_job_metrics.py — Tests for the shared job pool metrics.
+Covers:
+  JobMetrics     → counters and latency windows for started / finished / rejected jobs
+  SandboxMetrics → additionally counts timeouts
+  PasswordHasher → hashing jobs are recorded in its own metrics
+"""
+from api.helper.job_metrics import JobMetrics
+from api.helper.sandbox_metrics import SandboxMetrics
+from api.helper.password_hasher import PasswordHasher
+
+
+class TestJobMetrics:
+    def test_counters_and_windows(self):
+        metrics = JobMetrics()
+        metrics.job_started(0.002)
+        metrics.job_started(0.004)
+        metrics.job_finished(0.010)
+        metrics.job_finished(0.030, failed=True)
+        metrics.job_rejected()
+
+        snapshot = metrics.snapshot()
+        assert snapshot["jobs"] == 2
+        assert snapshot["in_flight"] == 0
+        assert snapshot["errors"] == 1
+        assert snapshot["rejected"] == 1
+        assert snapshot["queue_wait_ms"]["max"] == 4.0
+        assert snapshot["execution_ms"]["avg"] == 20.0
+        assert "timeouts" not in snapshot
+
+    def test_window_keeps_the_latest_samples(self):
+        metrics = JobMetrics(window=2)
+        for seconds in (1.0, 0.001, 0.002):
+            metrics.job_started(0)
+            metrics.job_finished(seconds)
+        assert metrics.snapshot()["execution_ms"]["max"] == 2.0
+
+    def test_empty_summary(self):
+        assert JobMetrics().snapshot()["execution_ms"] == {"avg": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+
+
+class TestSandboxMetrics:
+    def test_timeouts_are_counted(self):
+        metrics = SandboxMetrics()
+        metrics.job_started(0)
+        metrics.job_finished(5.0, timed_out=True, failed=True)
+        snapshot = metrics.snapshot()
+        assert (snapshot["jobs"], snapshot["timeouts"], snapshot["errors"]) == (1, 1, 1)
+
+
+class TestPasswordHasherMetrics:
+    async def test_hash_and_verify_are_recorded(self):
+        hasher = PasswordHasher(rounds=4, workers=1, queue_limit=1)
+        try:
+            hashed = await hasher.hash("secret")
+            assert await hasher.verify("secret", hashed)
+            stats = hasher.stats()
+        finally:
+            hasher.close()
+        assert stats["jobs"] == 2
+        assert stats["in_flight"] == 0
+        assert stats["rounds"] == 4
@@ -265,6 +265,32 @@ class TestIngestRouter:
         assert "message" in resp.json()
         assert mock_instance.initiate.called
 
+    @patch("api.routes.multi_rag_routes.app_config")
+    @patch("api.routes.multi_rag_routes.VectiorizerPipeline")
+    def test_ingest_in_session_mode_targets_one_index(self, mock_pipeline_cls, mock_app_config, client, thread_id, auth_cookies):
+        """Session index mode sends every file's chunks to the same vector store."""
+        mock_app_config.rag_index_mode = "session"
+        user_folder = os.path.join(PUBLIC_FOLDER_FILE_PATH, thread_id)
+        os.makedirs(user_folder, exist_ok=True)
+        for name in ("a.txt", "b.txt"):
+            with open(os.path.join(user_folder, name), "w") as fh:
+                fh.write("fake content")
+
+        fake_result = MagicMock()
+        fake_result.data_transformation_artifacts = []
+        mock_instance = MagicMock()
+        mock_instance.initiate = AsyncMock(return_value=fake_result)
+        mock_pipeline_cls.return_value = mock_instance
+
+        with patch("api.routes.multi_rag_routes.Retreiver") as mock_retreiver_cls:
+            mock_retreiver_cls.return_value.get_all_documents = AsyncMock(return_value=[])
+            resp = client.get("/api/v1/multi_rag/ingest", cookies=auth_cookies)
+
+        assert resp.status_code == 200
+        transformation_config = mock_pipeline_cls.call_args.kwargs["content_transformation_config"]
+        assert transformation_config.session_vector_store_path.endswith(f"{thread_id}/transformation/session")
+        assert sorted(c.file_name for c in transformation_config.data_transformation_configs) == ["a.txt", "b.txt"]
+
 
 # ─────────────────────────────────────────────────────────────
 #  5. Chat Router Tests  (graph mocked — zero token usage)
@@ -404,3 +430,24 @@ class TestLoadConversationRouter:
         assert "data" in body and "messages" in body["data"]
         assert isinstance(body["data"]["messages"], list)
         assert mock_loader.called
+
+
+# ─────────────────────────────────────────────────────────────
+#  Retriever cache
+# ─────────────────────────────────────────────────────────────
+
+class TestRetrieverCache:
+
+    @patch("api.helper.multi_rag_helper.GraphThreadDeletor")
+    def test_delete_thread_evicts_cached_retriever(self, mock_deletor, thread_id):
+        """Deleting a thread drops its cached retriever so the memory is released."""
+        import asyncio
+        from api.helper.multi_rag_helper import delete_thread
+        from src.retrievers.create_retreivers import retriever_cache
+
+        key = (thread_id, (), 5)
+        retriever_cache.set(key, (MagicMock(), 0))
+        asyncio.run(delete_thread(thread_id=thread_id, delay_seconds=0))
+
+        assert key not in retriever_cache
+        assert mock_deletor.called
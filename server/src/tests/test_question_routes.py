@@ -5,7 +5,11 @@ Routes covered:
   GET /api/v1/question?question_id=<id>       → single question (auth)
   GET /api/v1/question?category=<cat>         → filter by category (auth)
   GET /api/v1/question?difficulty=<diff>      → filter by difficulty (auth)
+  GET /api/v1/question?limit=<n>&cursor=<c>   → paginated list projection (auth)
+  GET /api/v1/question + If-None-Match        → 304 when the ETag is current (auth)
   GET /api/v1/question/categories             → list categories (auth)
+  GET /api/v1/question/search?q=<text>        → ranked full-text search (auth)
+  GET /api/v1/question/facets                 → category × difficulty counts (auth)
   GET /api/v1/question                        → reject unauthenticated
   POST /api/v1/question/add                   → add question (auth)
   POST /api/v1/question/add                   → missing fields → 422
@@ -54,6 +58,45 @@ class TestGetQuestions:
         assert resp.status_code == 404
 
 
+class TestQuestionCatalogue:
+    def test_list_is_a_lightweight_projection(self, client: TestClient, auth_headers: dict):
+        resp = client.get(f"{BASE}?limit=5", headers=auth_headers)
+        assert resp.status_code == 200
+        for question in resp.json()["data"]:
+            assert set(question) == {"id", "title", "difficulty", "category"}
+
+    def test_cursor_pages_do_not_overlap(self, client: TestClient, auth_headers: dict):
+        first = client.get(f"{BASE}?limit=1", headers=auth_headers).json()
+        if not first["next_cursor"]:
+            pytest.skip("needs at least two questions")
+        second = client.get(f"{BASE}?limit=1&cursor={first['next_cursor']}", headers=auth_headers).json()
+        assert second["data"][0]["id"] > first["data"][0]["id"]
+
+    def test_invalid_cursor_returns_400(self, client: TestClient, auth_headers: dict):
+        resp = client.get(f"{BASE}?limit=1&cursor=not-a-cursor", headers=auth_headers)
+        assert resp.status_code == 400
+
+    def test_matching_etag_returns_304(self, client: TestClient, auth_headers: dict):
+        resp = client.get(BASE, headers=auth_headers)
+        etag = resp.headers["etag"]
+        cached = client.get(BASE, headers={**auth_headers, "If-None-Match": etag})
+        assert cached.status_code == 304
+
+
+class TestSearchQuestions:
+    def test_search_returns_ranked_list(self, client: TestClient, auth_headers: dict):
+        resp = client.get(f"{BASE}/search?q=matrix", headers=auth_headers)
+        assert resp.status_code == 200
+        results = resp.json()["data"]
+        assert isinstance(results, list)
+        scores = [r["score"] for r in results]
+        assert scores == sorted(scores, reverse=True)
+
+    def test_search_without_query_returns_422(self, client: TestClient, auth_headers: dict):
+        resp = client.get(f"{BASE}/search", headers=auth_headers)
+        assert resp.status_code == 422
+
+
 class TestGetCategories:
     def test_categories_returns_200(self, client: TestClient, auth_headers: dict):
         resp = client.get(f"{BASE}/categories", headers=auth_headers)
@@ -64,6 +107,20 @@ class TestGetCategories:
         assert isinstance(resp.json().get("data"), list)
 
 
+class TestQuestionFacets:
+    def test_facets_returns_counts(self, client: TestClient, auth_headers: dict):
+        resp = client.get(f"{BASE}/facets", headers=auth_headers)
+        assert resp.status_code == 200
+        facets = resp.json()["data"]
+        assert facets["total"] == sum(entry["count"] for entry in facets["categories"])
+        assert facets["total"] == sum(facets["difficulties"].values())
+
+    def test_categories_match_facets(self, client: TestClient, auth_headers: dict):
+        facets = client.get(f"{BASE}/facets", headers=auth_headers).json()["data"]
+        categories = client.get(f"{BASE}/categories", headers=auth_headers).json()["data"]
+        assert categories == [entry["category"] for entry in facets["categories"]]
+
+
 class TestAddQuestion:
     VALID_QUESTION = {
         "title": "Two Sum",
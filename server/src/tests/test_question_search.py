@@ -0,0 +1,166 @@
+"""
+test_question_search.py — Tests for the question full-text search index.
+Runs the fts5 backend against a scratch SQLite database.
+Covers:
+  QuestionSearch.start → builds once, skips the rebuild while the questions are unchanged
+  QuestionSearch.start → rebuilds when the questions changed behind its back
+  QuestionSearch.reindex / remove → keep the fingerprint current without rehashing every question
+  Session commit hook  → indexes inline off the loop, in the background thread on it
+"""
+import asyncio
+import importlib
+import threading
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from db import Base, Question
+from config.app_config import app_config
+
+# `api.helper` re-exports `question_search` under the module's name
+search_module = importlib.import_module("api.helper.question_search")
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setattr(app_config, "question_search_backend", "fts5")
+    engine = create_engine(f"sqlite:///{tmp_path / 'search.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO questions (id, title, difficulty, category) VALUES "
+            "(1, 'Two Sum', 'easy', 'Arrays'), (2, 'Graph Coloring', 'hard', 'Graphs')"
+        ))
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def rebuilds(monkeypatch):
+    calls = []
+    original = search_module.Fts5SearchBackend.rebuild
+
+    def rebuild(self):
+        calls.append(self.name)
+        original(self)
+
+    monkeypatch.setattr(search_module.Fts5SearchBackend, "rebuild", rebuild)
+    return calls
+
+
+def _titles(search, query):
+    return [r["title"] for r in search.search(query)]
+
+
+class TestStartup:
+    def test_unchanged_index_is_not_rebuilt(self, engine, rebuilds):
+        search_module.QuestionSearch(engine).start()
+        restarted = search_module.QuestionSearch(engine)
+        restarted.start()
+
+        assert rebuilds == ["fts5"]
+        assert restarted.backend_name == "fts5"
+        assert _titles(restarted, "graph") == ["Graph Coloring"]
+
+    def test_changed_questions_are_rebuilt(self, engine, rebuilds):
+        search_module.QuestionSearch(engine).start()
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE questions SET title = 'Three Sum' WHERE id = 1"))
+        restarted = search_module.QuestionSearch(engine)
+        restarted.start()
+
+        assert rebuilds == ["fts5", "fts5"]
+        assert _titles(restarted, "three") == ["Three Sum"]
+
+    def test_incremental_updates_keep_the_index_current(self, engine, rebuilds):
+        search = search_module.QuestionSearch(engine)
+        search.start()
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO questions (id, title, difficulty, category) VALUES (3, 'Word Ladder', 'hard', 'Graphs')"))
+        search.reindex([3])
+        search_module.QuestionSearch(engine).start()
+
+        assert rebuilds == ["fts5"]
+
+    def test_incremental_updates_only_read_the_questions_they_touch(self, engine):
+        search = search_module.QuestionSearch(engine)
+        search.start()
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE questions SET title = 'Three Sum' WHERE id = 1"))
+            conn.execute(text("DELETE FROM questions WHERE id = 2"))
+
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(" ".join(statement.split()))
+
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            search.reindex([1])
+            search.remove([2])
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+        reads = [s for s in statements if s.startswith("SELECT") and ("FROM questions" in s or "FROM question_search_fts" in s)]
+        assert reads and all("WHERE" in s for s in reads)
+        assert _titles(search, "three") == ["Three Sum"]
+        assert _titles(search, "graph") == []
+        with engine.connect() as conn:
+            stored = search_module._stored_fingerprint(conn, "fts5")
+            assert stored == search_module._fingerprint(search_module._load_documents(conn))
+
+    def test_changes_after_an_incremental_update_are_rebuilt(self, engine, rebuilds):
+        search = search_module.QuestionSearch(engine)
+        search.start()
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE questions SET title = 'Three Sum' WHERE id = 1"))
+        search.reindex([1])
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE questions SET title = 'Graph Walk' WHERE id = 2"))
+        restarted = search_module.QuestionSearch(engine)
+        restarted.start()
+
+        assert rebuilds == ["fts5", "fts5"]
+        assert _titles(restarted, "walk") == ["Graph Walk"]
+
+
+@pytest.fixture
+def live_search(engine, monkeypatch):
+    search = search_module.QuestionSearch(engine)
+    search.start()
+    monkeypatch.setattr(search_module, "question_search", search)
+    threads = []
+    original = search.reindex
+
+    def reindex(question_ids=None):
+        threads.append(threading.current_thread().name)
+        original(question_ids)
+
+    monkeypatch.setattr(search, "reindex", reindex)
+    search.threads = threads
+    return search
+
+
+def _add_question(engine):
+    session = sessionmaker(bind=engine)()
+    try:
+        session.add(Question(id=3, title="Word Ladder", difficulty="hard", category="Graphs"))
+        session.commit()
+    finally:
+        session.close()
+
+
+class TestCommitHook:
+    def test_commit_off_the_loop_indexes_inline(self, engine, live_search):
+        _add_question(engine)
+        assert live_search.threads == [threading.current_thread().name]
+        assert _titles(live_search, "ladder") == ["Word Ladder"]
+
+    async def test_commit_on_the_loop_indexes_in_the_background(self, engine, live_search):
+        _add_question(engine)
+        await asyncio.wrap_future(search_module._sync_executor.submit(lambda: None))
+
+        assert len(live_search.threads) == 1
+        assert live_search.threads[0].startswith("question-search")
+        assert await asyncio.to_thread(_titles, live_search, "ladder") == ["Word Ladder"]
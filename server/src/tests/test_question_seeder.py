@@ -0,0 +1,69 @@
+"""
+test_question_seeder.py — Tests for bulk seeding of problems.json.
+Runs against a scratch SQLite database.
+Covers:
+  seed_questions → inserts new problems and updates existing ones
+  seed_questions → fields missing from the file keep their stored value, on
+                   the ON CONFLICT path and on the portable fallback
+  seed_questions → an unchanged file is skipped
+"""
+import json
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from db import Base, Question
+from api.helper.question_seeder import seed_questions
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'seed.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _write(tmp_path, problems) -> str:
+    path = tmp_path / "problems.json"
+    path.write_text(json.dumps(problems))
+    return str(path)
+
+
+FIRST = [
+    {"id": 1, "title": "Two Sum", "difficulty": "Easy", "category": "Arrays", "function_name": "two_sum",
+     "test_cases": [{"input": [[2, 7], 9], "output": [0, 1]}]},
+    {"id": 2, "title": "Word Ladder", "difficulty": "Hard", "category": "Graphs", "function_name": "ladder"},
+]
+# Problem 1 drops its function_name and test cases, problem 2 only renames
+SECOND = [
+    {"id": 1, "title": "Two Sum II", "difficulty": "Medium", "category": "Arrays"},
+    {"id": 2, "title": "Word Ladder II", "difficulty": "Hard", "category": "Graphs", "function_name": "ladder"},
+    {"id": 3, "title": "Coin Change", "difficulty": "Medium", "category": "DP"},
+]
+
+
+@pytest.mark.parametrize("fallback", [False, True], ids=["on_conflict", "fallback"])
+def test_missing_fields_keep_stored_values(db, tmp_path, monkeypatch, fallback):
+    if fallback:
+        # Any dialect without INSERT ... ON CONFLICT takes the portable path
+        monkeypatch.setattr(db.get_bind().dialect, "name", "mssql")
+
+    assert seed_questions(db, _write(tmp_path, FIRST)) == {"skipped": False, "inserted": 2, "updated": 0}
+    assert seed_questions(db, _write(tmp_path, SECOND)) == {"skipped": False, "inserted": 1, "updated": 2}
+
+    db.expire_all()
+    first = db.get(Question, 1)
+    assert (first.title, first.difficulty_key) == ("Two Sum II", "medium")
+    assert (first.function_name, first.test_cases) == ("two_sum", FIRST[0]["test_cases"])
+    assert db.get(Question, 2).title == "Word Ladder II"
+    assert db.get(Question, 3).category_key == "dp"
+
+
+def test_unchanged_file_is_skipped(db, tmp_path):
+    path = _write(tmp_path, FIRST)
+    seed_questions(db, path)
+    assert seed_questions(db, path)["skipped"]
@@ -0,0 +1,184 @@
+"""
+test_sandbox_harness.py — Tests for the fixed coding sandbox harness.
+Covers:
+  run_payload         → pass / fail / exception per test case
+  run_payload         → missing Solution class or entry point, malformed payloads
+  run_payload         → per-case and run stats, time / memory budgets
+  sandbox_harness.py  → script entry point reads stdin and exits non-zero on errors
+  sandbox_harness.py  → the verdict goes to the result fd with the nonce, never to stdout
+"""
+import os
+import sys
+import json
+import subprocess
+
+import pytest
+
+from api.helper import sandbox_harness
+from api.helper.sandbox_pool import HARNESS_SCRIPT
+
+SOLUTION = """
+class Solution:
+    def add(self, a, b):
+        if a < 0:
+            raise ValueError("negative input")
+        return a + b
+"""
+
+
+def _payload(code: str = SOLUTION, function_name: str = "add", test_cases: list = None, **extra) -> str:
+    payload = {"code": code, "function_name": function_name, "test_cases": test_cases or []}
+    payload.update(extra)
+    return json.dumps(payload)
+
+
+def _run(**kwargs) -> dict:
+    return json.loads(sandbox_harness.run_payload(_payload(**kwargs)))
+
+
+class TestRunPayload:
+    def test_passing_failing_and_raising_cases(self):
+        output = _run(test_cases=[
+            {"test": [1, 2], "expected_output": 3},
+            {"test": [1, 2], "expected_output": 4},
+            {"test": [-1, 2], "expected_output": 1},
+        ])
+        first, second, third = output["results"]
+
+        assert first["passed"] is True and first["got"] == 3
+        assert second["passed"] is False and second["got"] == 3 and second["expected"] == 4
+        assert third["passed"] is False and third["error"] == "negative input"
+        assert [r["test_case"] for r in output["results"]] == [1, 2, 3]
+
+    def test_tuples_are_compared_as_lists(self):
+        code = "class Solution:\n    def pair(self, a):\n        return (a, a)\n"
+        output = _run(code=code, function_name="pair", test_cases=[{"test": [1], "expected_output": [1, 1]}])
+        assert output["results"][0]["passed"] is True
+
+    def test_prints_do_not_corrupt_results(self, capsys):
+        code = "class Solution:\n    def add(self, a, b):\n        print('noise')\n        return a + b\n"
+        output = _run(code=code, test_cases=[{"test": [1, 2], "expected_output": 3}])
+        assert output["results"][0]["passed"] is True
+        assert "noise" not in capsys.readouterr().out
+
+    def test_empty_test_cases(self):
+        assert _run(test_cases=None)["results"] == []
+
+
+class TestRunPayloadErrors:
+    def test_missing_entry_point_raises(self):
+        with pytest.raises(AttributeError):
+            _run(function_name="does_not_exist", test_cases=[{"test": [1, 2], "expected_output": 3}])
+
+    def test_missing_solution_class_raises(self):
+        with pytest.raises(NameError):
+            _run(code="def add(a, b):\n    return a + b\n")
+
+    def test_syntax_error_raises(self):
+        with pytest.raises(SyntaxError):
+            _run(code="class Solution:\n    def add(self, a, b)\n        return a + b\n")
+
+    def test_malformed_json_raises(self):
+        with pytest.raises(json.JSONDecodeError):
+            sandbox_harness.run_payload("{not json")
+
+    def test_payload_without_code_raises(self):
+        with pytest.raises(KeyError):
+            sandbox_harness.run_payload(json.dumps({"function_name": "add", "test_cases": []}))
+
+
+SLOW_SOLUTION = """
+import time
+
+class Solution:
+    def add(self, a, b):
+        time.sleep(0.005)
+        return a + b
+"""
+
+
+class TestStatsAndBudgets:
+    def test_stats_are_reported_per_case_and_per_run(self):
+        output = _run(test_cases=[{"test": [1, 2], "expected_output": 3}, {"test": [2, 2], "expected_output": 4}])
+        for stats in [*output["results"], output["stats"]]:
+            assert stats["wall_ms"] >= 0
+            assert stats["cpu_ms"] >= 0
+            assert stats["peak_rss_kb"] > 0
+
+    def test_within_budget_passes(self):
+        output = _run(test_cases=[{"test": [1, 2], "expected_output": 3}], time_limit_ms=10_000, memory_limit_mb=100_000)
+        result = output["results"][0]
+        assert result["passed"] is True
+        assert "limit_exceeded" not in result
+
+    def test_passing_case_over_time_budget_fails(self):
+        output = _run(code=SLOW_SOLUTION, test_cases=[{"test": [1, 2], "expected_output": 3}], time_limit_ms=1)
+        result = output["results"][0]
+        assert result["passed"] is False
+        assert result["got"] == 3
+        assert result["error"].startswith("Time limit exceeded")
+        assert result["limit_exceeded"] is True
+
+    def test_passing_case_over_memory_budget_fails(self):
+        # The peak RSS of any interpreter is well above 1 MB
+        output = _run(test_cases=[{"test": [1, 2], "expected_output": 3}], memory_limit_mb=1)
+        result = output["results"][0]
+        assert result["passed"] is False
+        assert result["error"].startswith("Memory limit exceeded")
+        assert result["limit_exceeded"] is True
+
+    def test_budget_does_not_mask_a_wrong_answer(self):
+        output = _run(code=SLOW_SOLUTION, test_cases=[{"test": [1, 2], "expected_output": 4}], time_limit_ms=1)
+        result = output["results"][0]
+        assert result["passed"] is False
+        assert "error" not in result
+        assert "limit_exceeded" not in result
+
+    def test_fail_fast_stops_on_budget_failure(self):
+        test_cases = [{"test": [1, 2], "expected_output": 3}] * 3
+        output = _run(code=SLOW_SOLUTION, test_cases=test_cases, time_limit_ms=1, fail_fast=True)
+        assert len(output["results"]) == 1
+
+
+NONCE = "0123456789abcdef"
+
+
+class TestHarnessScript:
+    def _exec(self, payload: str):
+        """Runs the script like SubprocessSandbox; returns (process, raw result fd output)."""
+        result_r, result_w = os.pipe()
+        try:
+            proc = subprocess.run(
+                [sys.executable, HARNESS_SCRIPT, "--result-fd", str(result_w)],
+                input=f"{NONCE}\n{payload}", capture_output=True, text=True, timeout=30, pass_fds=(result_w,)
+            )
+        finally:
+            os.close(result_w)
+        with os.fdopen(result_r, "r", encoding="utf-8") as f:
+            return proc, f.read()
+
+    def test_script_writes_results_with_the_nonce(self):
+        proc, raw = self._exec(_payload(test_cases=[{"test": [2, 2], "expected_output": 4}]))
+        assert proc.returncode == 0, proc.stderr
+        assert proc.stdout == ""
+        verdict = sandbox_harness.read_result(raw, NONCE)
+        assert json.loads(verdict)["results"][0]["passed"] is True
+
+    def test_script_exits_non_zero_on_malformed_payload(self):
+        proc, raw = self._exec("{not json")
+        assert proc.returncode != 0
+        assert raw == ""
+        assert "JSONDecodeError" in proc.stderr
+
+    def test_submission_writing_to_fd_1_reaches_nobody(self):
+        code = "import os\nos.write(1, b'{\"results\": []}')\nos._exit(0)\n"
+        proc, raw = self._exec(_payload(code=code))
+        assert proc.returncode == 0
+        assert proc.stdout == ""
+        assert sandbox_harness.read_result(raw, NONCE) is None
+
+    def test_read_result_requires_the_nonce(self):
+        assert sandbox_harness.read_result(NONCE + "{}", NONCE) == "{}"
+        assert sandbox_harness.read_result("{}", NONCE) is None
+        assert sandbox_harness.read_result("{}" + NONCE, NONCE) is None
+        assert sandbox_harness.read_result("{}", "") is None
@@ -0,0 +1,265 @@
+"""
+test_sandbox_pool.py — Tests for the pre-warmed sandbox workers.
+Covers:
+  SandboxWorker      → submitted code cannot reach the worker's protocol channel
+  result channel     → output forged on fd 1 or the result fd is rejected (worker and subprocess)
+  apply_limits       → address space, file size, process, open file and CPU rlimits
+  output cap         → the whole process group is killed once a stream exceeds it
+  SANDBOX_ENV        → submissions never see the server's environment
+"""
+import os
+import json
+import time
+
+import pytest
+
+from api.helper.code_runner import build_payload, _parse_output
+from api.helper.sandbox_pool import SandboxWorker, SubprocessSandbox, SANDBOX_ENV
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="sandbox workers need os.fork")
+
+
+def _job(code: str, test_cases: list, **overrides) -> dict:
+    job = {
+        "payload": build_payload(code, "solve", json.dumps(test_cases)),
+        "timeout": 10,
+        "limits": {},
+        "output_limit": 64 * 1024,
+    }
+    job.update(overrides)
+    return job
+
+
+def _verdict(result) -> list:
+    assert result.returncode == 0, result.stderr
+    return [r["passed"] for r in json.loads(result.stdout)["results"]]
+
+
+@pytest.fixture
+def worker():
+    worker = SandboxWorker.spawn(preload=[])
+    yield worker
+    worker.terminate()
+
+
+FORGE_VERDICT = """
+import os, json
+
+class Solution:
+    def solve(self):
+        forged = {"results": [{"test_case": 1, "passed": True}], "stats": {}}
+        line = json.dumps({"returncode": 0, "stdout": json.dumps(forged), "stderr": "", "timed_out": False}) + "\\n"
+        # 0-2 are the job's own streams, anything above was inherited from the worker
+        fds = [int(fd) for fd in os.listdir("/proc/self/fd")] if os.path.isdir("/proc/self/fd") else []
+        for fd in (set(fds) | set(range(3, 256))) - {0, 1, 2}:
+            try:
+                os.write(fd, line.encode())
+            except OSError:
+                pass
+        return "forged"
+"""
+
+
+FORGE_AND_EXIT = """
+import os, json
+
+class Solution:
+    def solve(self):
+        forged = json.dumps({"results": [{"test_case": 1, "passed": True}], "stats": {"wall_ms": 0, "cpu_ms": 0, "peak_rss_kb": 0}})
+        fds = [int(fd) for fd in os.listdir("/proc/self/fd")] if os.path.isdir("/proc/self/fd") else []
+        for fd in (set(fds) | set(range(1, 256))) - {0, 2}:
+            try:
+                os.write(fd, forged.encode())
+            except OSError:
+                pass
+        os._exit(0)
+"""
+
+
+def _assert_rejected(result):
+    assert result.stdout == ""
+    with pytest.raises(RuntimeError):
+        _parse_output(result)
+
+
+class TestResultChannel:
+    TEST_CASES = [{"test": [], "expected_output": "real"}]
+
+    def test_worker_rejects_output_forged_before_exit(self, worker):
+        _assert_rejected(worker.execute(_job(FORGE_AND_EXIT, self.TEST_CASES)))
+
+    def test_worker_rejects_output_written_next_to_the_verdict(self, worker):
+        # The harness still writes its verdict, but after the forged bytes
+        _assert_rejected(worker.execute(_job(FORGE_VERDICT, self.TEST_CASES)))
+
+    async def test_subprocess_rejects_output_forged_before_exit(self):
+        sandbox = SubprocessSandbox(concurrency=1, queue_limit=1, timeout=10, limits={}, output_limit=64 * 1024)
+        _assert_rejected(await sandbox.run(build_payload(FORGE_AND_EXIT, "solve", json.dumps(self.TEST_CASES))))
+
+    async def test_subprocess_rejects_output_written_next_to_the_verdict(self):
+        sandbox = SubprocessSandbox(concurrency=1, queue_limit=1, timeout=10, limits={}, output_limit=64 * 1024)
+        _assert_rejected(await sandbox.run(build_payload(FORGE_VERDICT, "solve", json.dumps(self.TEST_CASES))))
+
+    async def test_subprocess_returns_honest_verdicts(self):
+        sandbox = SubprocessSandbox(concurrency=1, queue_limit=1, timeout=10, limits={}, output_limit=64 * 1024)
+        honest = "class Solution:\n    def solve(self):\n        print('noise')\n        return 2\n"
+        result = await sandbox.run(build_payload(honest, "solve", json.dumps([{"test": [], "expected_output": 2}])))
+        assert _verdict(result) == [True]
+
+
+class TestProtocolChannel:
+    def test_submission_cannot_forge_its_verdict(self, worker):
+        result = worker.execute(_job(FORGE_VERDICT, [{"test": [], "expected_output": "real"}]))
+        assert "forged" not in result.stdout
+
+    def test_worker_stays_in_step_after_forgery_attempt(self, worker):
+        worker.execute(_job(FORGE_VERDICT, [{"test": [], "expected_output": "real"}]))
+        honest = "class Solution:\n    def solve(self):\n        return 2\n"
+        result = worker.execute(_job(honest, [{"test": [], "expected_output": 2}, {"test": [], "expected_output": 3}]))
+        assert _verdict(result) == [True, False]
+
+
+def _results(result) -> list:
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout)["results"]
+
+
+def _solution(body: str) -> str:
+    """A Solution whose `solve(arg)` runs `body`, indented by the caller's convention of four spaces."""
+    return "import os, json, time, resource\n\nclass Solution:\n    def solve(self, arg):\n" + "".join(
+        f"        {line}\n" for line in body.strip().splitlines()
+    )
+
+
+def _process_gone(pid: int) -> bool:
+    """True once `pid` has exited (a zombie nobody reaped counts as exited)."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] == "Z"
+    except FileNotFoundError:
+        return True
+
+
+class TestResourceLimits:
+    def test_memory_limit_raises_memory_error(self, worker):
+        code = _solution("return len(bytearray(512 * 1024 * 1024))")
+        result = worker.execute(_job(code, [{"test": [None], "expected_output": 0}], limits={"memory_mb": 256}))
+        [case] = _results(result)
+        assert case["passed"] is False
+        assert case["error"] == "MemoryError"
+        assert case["limit_exceeded"] is True
+
+    def test_file_size_limit(self, worker, tmp_path):
+        code = _solution("""
+with open(arg, "wb") as f:
+    f.write(b"x" * (2 * 1024 * 1024))
+return "written"
+""")
+        target = str(tmp_path / "big.bin")
+        result = worker.execute(_job(code, [{"test": [target], "expected_output": "written"}], limits={"file_size_mb": 1}))
+        [case] = _results(result)
+        assert case["passed"] is False
+        assert "File too large" in case["error"]
+        assert os.path.getsize(target) <= 1024 * 1024
+
+    def test_limits_are_applied_to_the_child(self, worker):
+        code = _solution("""
+names = ["RLIMIT_AS", "RLIMIT_NOFILE", "RLIMIT_NPROC", "RLIMIT_FSIZE", "RLIMIT_CPU", "RLIMIT_CORE"]
+return {name: list(resource.getrlimit(getattr(resource, name))) for name in names}
+""")
+        limits = {"memory_mb": 1024, "open_files": 32, "processes": 64, "file_size_mb": 1, "cpu_seconds": 5}
+        result = worker.execute(_job(code, [{"test": [None], "expected_output": None}], limits=limits))
+        [case] = _results(result)
+        mb = 1024 * 1024
+        assert case["got"] == {
+            "RLIMIT_AS": [1024 * mb, 1024 * mb],
+            "RLIMIT_NOFILE": [32, 32],
+            "RLIMIT_NPROC": [64, 64],
+            "RLIMIT_FSIZE": [mb, mb],
+            "RLIMIT_CPU": [5, 6],
+            "RLIMIT_CORE": [0, 0],
+        }
+
+    @pytest.mark.skipif(os.geteuid() == 0, reason="root is exempt from RLIMIT_NPROC")
+    def test_process_limit_blocks_fork(self, worker):
+        code = _solution("""
+try:
+    pid = os.fork()
+except OSError:
+    return "blocked"
+if pid == 0:
+    os._exit(0)
+os.waitpid(pid, 0)
+return "forked"
+""")
+        result = worker.execute(_job(code, [{"test": [None], "expected_output": "blocked"}], limits={"processes": 1}))
+        assert _results(result)[0]["passed"] is True
+
+    def test_cpu_limit_is_reported_as_timeout(self, worker):
+        code = _solution("""
+while True:
+    pass
+""")
+        result = worker.execute(_job(code, [{"test": [None], "expected_output": None}], limits={"cpu_seconds": 1}))
+        assert result.timed_out is True
+
+
+class TestOutputCap:
+    FLOOD = _solution("""
+pid = os.fork()
+if pid == 0:
+    while True:
+        os.write(2, b"x" * 65536)
+with open(arg, "w") as f:
+    f.write(str(pid))
+os.waitpid(pid, 0)
+""")
+
+    def test_worker_kills_process_group_over_output_cap(self, worker, tmp_path):
+        pid_file = tmp_path / "flooder.pid"
+        result = worker.execute(_job(self.FLOOD, [{"test": [str(pid_file)], "expected_output": None}]))
+
+        assert result.output_exceeded is True
+        assert len(result.stderr) <= 64 * 1024
+        flooder = int(pid_file.read_text())
+        deadline = time.monotonic() + 5
+        while not _process_gone(flooder) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert _process_gone(flooder)
+
+    async def test_subprocess_sandbox_kills_process_group_over_output_cap(self, tmp_path):
+        sandbox = SubprocessSandbox(concurrency=1, queue_limit=1, timeout=10, limits={}, output_limit=64 * 1024)
+        pid_file = tmp_path / "flooder.pid"
+        payload = build_payload(self.FLOOD, "solve", json.dumps([{"test": [str(pid_file)], "expected_output": None}]))
+        result = await sandbox.run(payload)
+
+        assert result.output_exceeded is True
+        flooder = int(pid_file.read_text())
+        deadline = time.monotonic() + 5
+        while not _process_gone(flooder) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert _process_gone(flooder)
+
+
+class TestEnvironment:
+    ENV_DUMP = _solution("return sorted(os.environ)")
+
+    def _check(self, names: list):
+        assert "SANDBOX_TEST_SECRET" not in names
+        # Python may coerce the C locale through LC_CTYPE on its own
+        assert set(names) <= set(SANDBOX_ENV) | {"LC_CTYPE"}
+
+    def test_worker_environment_is_stripped(self, monkeypatch):
+        monkeypatch.setenv("SANDBOX_TEST_SECRET", "hunter2")
+        worker = SandboxWorker.spawn(preload=[])
+        try:
+            result = worker.execute(_job(self.ENV_DUMP, [{"test": [None], "expected_output": None}]))
+        finally:
+            worker.terminate()
+        self._check(_results(result)[0]["got"])
+
+    async def test_subprocess_environment_is_stripped(self, monkeypatch):
+        monkeypatch.setenv("SANDBOX_TEST_SECRET", "hunter2")
+        sandbox = SubprocessSandbox(concurrency=1, queue_limit=1, timeout=10, limits={}, output_limit=64 * 1024)
+        result = await sandbox.run(build_payload(self.ENV_DUMP, "solve", json.dumps([{"test": [None], "expected_output": None}])))
+        self._check(_results(result)[0]["got"])
@@ -7,6 +7,7 @@ Routes covered:
   GET  /api/v1/user/profile   → reject unauthenticated request
   POST /api/v1/user/login     → wrong password returns 4xx
   POST /api/v1/user/create    → duplicate email returns 4xx
+  GET  /api/v1/user/password_hash/metrics → bcrypt pool metrics (auth), reject unauthenticated
 """
 import uuid
 import pytest
@@ -87,3 +88,29 @@ class TestUserProfile:
         resp = client.get("/api/v1/user/itself", headers=auth_headers)
         body = resp.json()
         assert "data" in body or "email" in str(body)
+
+    def test_repeated_profile_requests_serve_same_user(
+        self, client: TestClient, auth_headers: dict
+    ):
+        first = client.get("/api/v1/user/itself", headers=auth_headers)
+        second = client.get("/api/v1/user/itself", headers=auth_headers)
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert first.json()["data"] == second.json()["data"]
+
+
+class TestPasswordHashing:
+    def test_hash_metrics_without_token_returns_401(self):
+        from api.app import app
+        with TestClient(app) as local_client:
+            resp = local_client.get("/api/v1/user/password_hash/metrics")
+            assert resp.status_code == 401
+
+    def test_login_is_counted_in_hash_metrics(
+        self, client: TestClient, auth_headers: dict
+    ):
+        resp = client.get("/api/v1/user/password_hash/metrics", headers=auth_headers)
+        assert resp.status_code == 200
+        data = resp.json()["data"]
+        assert data["jobs"] >= 1
+        assert "execution_ms" in data
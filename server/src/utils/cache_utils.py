@@ -0,0 +1,100 @@
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    Thread-safe in-process LRU cache with an optional time-to-live.
+
+    Entries older than `ttl` seconds are treated as missing and dropped on
+    access. When more than `maxsize` entries are stored, or their combined
+    `weigher(value)` exceeds `max_weight`, the least recently used ones are
+    evicted first. A single entry heavier than `max_weight` is not stored.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 128,
+        ttl: Optional[float] = None,
+        max_weight: Optional[float] = None,
+        weigher: Optional[Callable[[Any], float]] = None
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_weight = max_weight
+        self.weigher = weigher
+        self.hits = 0
+        self.misses = 0
+        self.weight = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            value, expires_at, _ = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        weight = self.weigher(value) if self.weigher else 0
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            if self.max_weight is not None and weight > self.max_weight:
+                return
+            self._data[key] = (value, expires_at, weight)
+            self.weight += weight
+            while len(self._data) > self.maxsize or (self.max_weight is not None and self.weight > self.max_weight):
+                self._remove(next(iter(self._data)))
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._remove(key)
+        return default if entry is None else entry[0]
+
+    def invalidate(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Drops every entry whose key matches `predicate`. Returns the count."""
+        with self._lock:
+            stale = [key for key in self._data if predicate(key)]
+            for key in stale:
+                self._remove(key)
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.weight = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {"size": len(self._data), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+            if self.max_weight is not None:
+                stats.update(weight=self.weight, max_weight=self.max_weight)
+            return stats
+
+    def _remove(self, key: Hashable) -> Optional[tuple]:
+        # Caller holds the lock
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self.weight -= entry[2]
+        return entry
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
@@ -0,0 +1,65 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, List, Optional
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class IngestionManifest:
+    """
+    Content hash and outputs of every file ingested into a chat thread, so a
+    later ingest only has to process files that are new or changed.
+
+    `files` maps the uploaded file name to
+    {"hash", "ingested_file_path", "vector_store_path"}.
+    """
+
+    def __init__(self, path: str, files: Optional[Dict[str, dict]] = None):
+        self.path = path
+        self.files = files or {}
+
+    @classmethod
+    def load(cls, path: str) -> Optional["IngestionManifest"]:
+        """Returns None when the thread has no (readable) manifest yet."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls(path, json.load(f)["files"])
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Ignoring unreadable ingestion manifest {path}: {e}")
+            return None
+
+    def is_current(self, file_name: str, content_hash: str) -> bool:
+        entry = self.files.get(file_name)
+        return entry is not None and entry["hash"] == content_hash
+
+    def removed(self, file_names: List[str]) -> List[str]:
+        """Files recorded in the manifest that are no longer in `file_names`."""
+        present = set(file_names)
+        return [file_name for file_name in self.files if file_name not in present]
+
+    def record(self, file_name: str, content_hash: str, ingested_file_path: str, vector_store_path: str):
+        self.files[file_name] = {
+            "hash": content_hash,
+            "ingested_file_path": ingested_file_path,
+            "vector_store_path": vector_store_path,
+        }
+
+    def forget(self, file_name: str) -> Optional[dict]:
+        return self.files.pop(file_name, None)
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"files": self.files}, f, indent=2)
+        os.replace(tmp_path, self.path)